@@ -0,0 +1,201 @@
+import contextlib
+import glob
+import json
+import os
+import time
+import cache
+import registry
+import tracing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from scheduler import MemoryScheduler, estimate_memory
+
+def parse_params(pairs):
+    """Turn a list of key=value strings into a dictionary of operation parameters."""
+    params = {}
+    for pair in pairs or []:
+        if "=" not in pair:
+            raise ValueError(f"Invalid parameter (expected key=value): {pair}")
+        key, value = pair.split("=", 1)
+        params[key.strip()] = value
+    return params
+
+def collect_files(inputs, file_list=None, recursive=False):
+    """Expand files, directories and glob patterns into a sorted list of file paths."""
+    candidates = list(inputs)
+    if file_list:
+        with open(file_list, "r", encoding="utf-8") as list_file:
+            candidates.extend(line.strip() for line in list_file if line.strip())
+
+    files = set()
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            if recursive:
+                for root, _, names in os.walk(candidate):
+                    files.update(os.path.join(root, name) for name in names)
+            else:
+                files.update(entry.path for entry in os.scandir(candidate) if entry.is_file())
+        elif os.path.isfile(candidate):
+            files.add(candidate)
+        else:
+            files.update(path for path in glob.glob(candidate, recursive=True) if os.path.isfile(path))
+    return sorted(files)
+
+def run_job(module_name, operation, file_path, params, cache_options=None, trace=False, profile_path=None):
+    """Run a single operation on one file and report its outcome.
+
+    ``cache_options`` is a ``(cache_dir, max_bytes)`` tuple, or None to bypass the result cache.
+    With ``trace`` the job's trace events are returned under ``"trace"``, and
+    with ``profile_path`` a cProfile dump of the job is written there.
+    """
+    start = time.perf_counter()
+    result = None
+    hit = False
+    if trace:
+        tracing.start()
+    # Workers are reused, so measure this job's peak from a fresh baseline.
+    tracing.reset_peak_memory()
+    try:
+        if registry.OPERATIONS.get(operation, module_name) != module_name:
+            raise ValueError(f"Operation {operation} does not apply to {registry.file_extension(file_path)} files")
+        with tracing.profiled(profile_path) if profile_path else contextlib.nullcontext():
+            if cache_options:
+                result, hit = cache.get_cache(*cache_options).run(operation, file_path, params)
+            else:
+                result = registry.call_operation(operation, file_path, **params)
+        ok = True
+        message = result.message
+    except Exception as e:
+        ok = False
+        message = f"Error: {e}"
+    tracer = tracing.stop() if trace else None
+    return {
+        "file": file_path,
+        "ok": ok,
+        "message": message,
+        "output_paths": result.output_paths if result else [],
+        "data": result.data if result else {},
+        "cached": hit,
+        "seconds": time.perf_counter() - start,
+        "peak_rss": tracing.peak_memory(),
+        "trace": tracer.events if tracer else [],
+    }
+
+def run_batch(args):
+    """Run one operation over many files on a process pool."""
+    try:
+        params = parse_params(args.param)
+        registry.check_single_input(args.op)
+        files = collect_files(args.inputs, args.file_list, args.recursive)
+    except Exception as e:
+        print(f"Error preparing batch: {e}")
+        return 1
+
+    extensions = {"." + ext.lower().lstrip(".") for ext in args.ext or []}
+    jobs = []
+    for file_path in files:
+        if extensions and registry.file_extension(file_path) not in extensions:
+            continue
+        module_name = registry.get_module_name(file_path)
+        if module_name is None:
+            print(f"Skipping unsupported file: {file_path}")
+            continue
+        jobs.append((module_name, file_path))
+
+    if not jobs:
+        print("No files to process.")
+        return 1
+
+    cache_options = None
+    if not args.no_cache and args.op in cache.CACHEABLE_OPERATIONS:
+        cache_options = (args.cache_dir or cache.default_cache_dir(), cache.parse_size(args.cache_size))
+
+    profile_paths = [f"{args.profile}.{index}" if args.profile else None for index in range(len(jobs))]
+    tracer = tracing.Tracer() if args.trace else None
+    scheduler = MemoryScheduler(cache.parse_size(args.max_memory)) if args.max_memory else None
+    workers = args.workers or os.cpu_count() or 1
+    estimate = bool(scheduler or args.memory_log)
+    queue = [
+        (estimate_memory(args.op, file_path) if estimate else 0, (module_name, file_path, profile_path))
+        for (module_name, file_path), profile_path in zip(jobs, profile_paths)
+    ]
+    sizes = {file_path: os.path.getsize(file_path) for _, file_path in jobs}
+    memory_log = open(args.memory_log, "a", encoding="utf-8") if args.memory_log else None
+    succeeded = failed = hits = 0
+    peak_in_use = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while queue or running:
+            if scheduler:
+                admitted = scheduler.admit(queue, len(running), workers - len(running))
+                peak_in_use = max(peak_in_use, scheduler.in_use)
+            else:
+                admitted, queue = queue, []
+            for estimate, (module_name, file_path, profile_path) in admitted:
+                future = executor.submit(run_job, module_name, args.op, file_path, params, cache_options,
+                                         bool(args.trace), profile_path)
+                running[future] = estimate
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job_estimate = running.pop(future)
+                if scheduler:
+                    scheduler.release(job_estimate)
+                result = future.result()
+                status = "OK" if result["ok"] else "FAILED"
+                cached = ", cached" if result["cached"] else ""
+                memory = ""
+                if scheduler:
+                    memory = f", est {job_estimate / (1024 * 1024):.0f} MB, peak {result['peak_rss'] / (1024 * 1024):.0f} MB"
+                if memory_log:
+                    memory_log.write(json.dumps({
+                        "file": result["file"], "operation": args.op,
+                        "extension": registry.file_extension(result["file"]), "size": sizes[result["file"]],
+                        "estimated_bytes": job_estimate, "peak_rss_bytes": result["peak_rss"], "ok": result["ok"],
+                    }) + "\n")
+                print(f"[{status}] {result['file']} ({result['seconds']:.3f}s{cached}{memory})")
+                if result["message"]:
+                    for line in result["message"].splitlines():
+                        print(f"    {line}")
+                hits += result["cached"]
+                if tracer:
+                    tracer.events.extend(result["trace"])
+                if result["ok"]:
+                    succeeded += 1
+                else:
+                    failed += 1
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(sizes.values())
+    if memory_log:
+        memory_log.close()
+
+    print(f"Processed {len(jobs)} files in {elapsed:.2f}s: {succeeded} succeeded, {failed} failed.")
+    if elapsed > 0:
+        print(f"Throughput: {len(jobs) / elapsed:.2f} files/s, {total_bytes / elapsed / (1024 * 1024):.2f} MB/s")
+    if cache_options:
+        print(f"Cache: {hits} hits, {len(jobs) - hits} misses.")
+    if scheduler:
+        print(f"Memory: peak estimated use {peak_in_use / (1024 * 1024):.0f} MB "
+              f"of a {scheduler.budget / (1024 * 1024):.0f} MB budget.")
+    if tracer:
+        tracing.print_summary(tracer)
+        tracing.save_trace(args.trace, tracer.events)
+        print(f"Trace written to {args.trace}")
+    if args.profile:
+        tracing.merge_profiles(profile_paths, args.profile)
+        print(f"Profile written to {args.profile}")
+    return 0 if failed == 0 else 1
+
+def add_batch_arguments(parser):
+    """Register the batch subcommand options on an argument parser."""
+    parser.add_argument("inputs", nargs="*", help="Files, directories or glob patterns to process")
+    parser.add_argument("--op", required=True, help="Operation to run, e.g. resize_image or count_lines")
+    parser.add_argument("--param", action="append", metavar="KEY=VALUE", help="Operation parameter (repeatable)")
+    parser.add_argument("--file-list", help="File containing one input path per line")
+    parser.add_argument("--recursive", action="store_true", help="Descend into subdirectories")
+    parser.add_argument("--ext", action="append", help="Only process files with this extension (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    cache.add_cache_arguments(parser)
+    parser.add_argument("--max-memory", help="Only start jobs while their estimated peak memory fits, e.g. 8G")
+    parser.add_argument("--memory-log", metavar="FILE",
+                        help="Append estimated and measured peak memory per job to FILE (JSON lines)")
+    tracing.add_trace_arguments(parser)
@@ -0,0 +1,129 @@
+"""Measure the decode cost that the raw-bytes text operations avoid.
+
+Counting and splitting only look for newlines and whitespace, so they read
+raw bytes and never decode. Each is timed against the same work done on
+decoded text (open in text mode, iterate over ``str`` lines), on a UTF-8 input
+generated from a fixed seed. The same input in Windows-1252 shows that
+ASCII-compatible encodings take the raw path as they are; in UTF-16 it shows
+counting from incrementally decoded blocks, which encodings without ASCII
+bytes need. Each variant reports the best of ``--repeat`` runs and the share
+of the decoded variant's time it saves:
+
+    python benchmarks/decoding.py --mb 256
+    python benchmarks/decoding.py --mb 64 --repeat 5 --json decoding.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import decoding
+import text_handler
+
+LINES_PER_PART = 100000
+
+def decoded_count_lines(file_path, encoding):
+    with decoding.open_text(file_path, encoding) as file:
+        return sum(1 for _ in file)
+
+def decoded_count_words(file_path, encoding):
+    with decoding.open_text(file_path, encoding) as file:
+        return sum(len(line.split()) for line in file)
+
+def decoded_split_file(file_path, encoding, output_dir):
+    part = None
+    with decoding.open_text(file_path, encoding) as file:
+        for number, line in enumerate(file):
+            if number % LINES_PER_PART == 0:
+                if part:
+                    part.close()
+                part = open(os.path.join(output_dir, f"part{number // LINES_PER_PART}.txt"), "w", encoding=encoding)
+            part.write(line)
+    if part:
+        part.close()
+
+def write_text(path, size, rng):
+    words = ["lorem", "ipsum", "dolor", "café", "über", "request", "timeout", "naïve", "worker", "cache"]
+    with open(path, "w", encoding="utf-8") as file:
+        written = 0
+        while written < size:
+            lines = "".join(" ".join(rng.choice(words) for _ in range(10)) + f" {rng.randrange(10 ** 6)}\n"
+                            for _ in range(10000))
+            file.write(lines)
+            written += len(lines.encode("utf-8"))
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare decoded and raw-bytes text operations")
+    parser.add_argument("--mb", type=float, default=64, help="Size of the UTF-8 input in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--work-dir", help="Directory for inputs and outputs (default: system temp)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix="uft-decoding-bench-", dir=args.work_dir)
+    results = []
+    try:
+        inputs = {"utf-8": os.path.join(work_dir, "input-utf8.txt")}
+        write_text(inputs["utf-8"], int(args.mb * 1024 * 1024), rng)
+        for encoding, name in (("cp1252", "input-cp1252.txt"), ("utf-16", "input-utf16.txt")):
+            inputs[encoding] = os.path.join(work_dir, name)
+            with open(inputs[encoding], "wb") as output:
+                decoding.transcode(inputs["utf-8"], output, "utf-8", encoding)
+        parts_dir = os.path.join(work_dir, "parts")
+        os.mkdir(parts_dir)
+        path = inputs["utf-8"]
+        variants = [
+            ("count_lines", "utf-8", "decoded", lambda: decoded_count_lines(path, "utf-8")),
+            ("count_lines", "utf-8", "raw bytes", lambda: text_handler.count_lines(path)),
+            ("count_words", "utf-8", "decoded", lambda: decoded_count_words(path, "utf-8")),
+            ("count_words", "utf-8", "raw bytes", lambda: text_handler.count_words(path)),
+            ("split_file", "utf-8", "decoded", lambda: decoded_split_file(path, "utf-8", parts_dir)),
+            ("split_file", "utf-8", "raw bytes",
+             lambda: text_handler.split_file(path, LINES_PER_PART, output_dir=parts_dir)),
+            ("count_lines", "cp1252", "decoded", lambda: decoded_count_lines(inputs["cp1252"], "cp1252")),
+            ("count_lines", "cp1252", "raw bytes", lambda: text_handler.count_lines(inputs["cp1252"])),
+            ("count_lines", "utf-16", "decoded", lambda: decoded_count_lines(inputs["utf-16"], "utf-16")),
+            ("count_lines", "utf-16", "blocks", lambda: text_handler.count_lines(inputs["utf-16"])),
+            ("count_words", "utf-16", "decoded", lambda: decoded_count_words(inputs["utf-16"], "utf-16")),
+            ("count_words", "utf-16", "blocks", lambda: text_handler.count_words(inputs["utf-16"])),
+        ]
+
+        print(f"{'operation':<18} {'encoding':<8} {'variant':<11} {'seconds':>9} {'MB/s':>8} {'saved':>7}")
+        decoded_seconds = {}
+        for operation, encoding, variant, function in variants:
+            input_bytes = os.path.getsize(inputs[encoding])
+            seconds = best_time(function, args.repeat)
+            if variant == "decoded":
+                decoded_seconds[operation, encoding] = seconds
+            saved = 1 - seconds / decoded_seconds[operation, encoding] if variant != "decoded" else None
+            results.append({"operation": operation, "encoding": encoding, "variant": variant, "seconds": seconds,
+                            "input_bytes": input_bytes, "mb_per_s": input_bytes / seconds / 1024 ** 2,
+                            "saved": saved})
+            print(f"{operation:<18} {encoding:<8} {variant:<11} {seconds:>9.3f} {input_bytes / seconds / 1024 ** 2:>8.1f} "
+                  f"{'' if saved is None else f'{saved:.0%}':>7}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as json_file:
+            json.dump({"mb": args.mb, "results": results}, json_file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare file-merge throughput of the read-and-write and zero-copy implementations.
+
+Text files are merged with the previous ``merge_files`` implementation (read
+each file into a string and write it back) and with the current one, which
+copies inside the kernel; JSON arrays are merged with ``json.load`` and
+``json.dump`` (``zero_copy=False``) and by copying their items byte for byte.
+Inputs are generated from a fixed seed, and each variant reports the best of
+``--repeat`` runs in GB/s of input:
+
+    python benchmarks/merge.py --files 8 --mb 256
+    python benchmarks/merge.py --files 8 --mb 64 --json-mb 16 --repeat 5 --json merge.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import json_handler
+import text_handler
+
+def legacy_merge_files(file_paths, output_path):
+    """``merge_files`` as it was before zero-copy concatenation."""
+    with open(output_path, "w") as merged_file:
+        for file_path in file_paths:
+            with open(file_path, "r") as file:
+                merged_file.write(file.read() + "\n")
+
+def write_text(path, size, rng):
+    words = [b"lorem", b"ipsum", b"dolor", b"error", b"request", b"timeout", b"worker", b"cache"]
+    line = b" ".join(rng.choice(words) for _ in range(12)) + b"\n"
+    block = line * (1024 * 1024 // len(line) + 1)
+    with open(path, "wb") as file:
+        written = 0
+        while written < size:
+            chunk = block[:size - written]
+            file.write(chunk)
+            written += len(chunk)
+
+def write_json(path, size, rng):
+    items = []
+    length = 2
+    while length < size:
+        item = {"id": len(items), "name": f"item-{rng.randrange(10 ** 6)}", "tags": ["a", "b"], "score": rng.random()}
+        items.append(item)
+        length += len(json.dumps(item)) + 2
+    with open(path, "w") as file:
+        json.dump(items, file)
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare merge_files and merge_json_files throughput")
+    parser.add_argument("--files", type=int, default=8, help="Number of input files")
+    parser.add_argument("--mb", type=float, default=64, help="Size of each text input in MB")
+    parser.add_argument("--json-mb", type=float, default=8, help="Size of each JSON input in MB (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--work-dir", help="Directory for inputs and outputs (default: system temp)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix="uft-merge-bench-", dir=args.work_dir)
+    results = []
+    try:
+        text_paths = [os.path.join(work_dir, f"part{index}.txt") for index in range(args.files)]
+        for path in text_paths:
+            write_text(path, int(args.mb * 1024 * 1024), rng)
+        output_path = os.path.join(work_dir, "merged.txt")
+        variants = [
+            ("merge_files", "read/write", lambda: legacy_merge_files(text_paths, output_path)),
+            ("merge_files", "zero-copy", lambda: text_handler.merge_files(text_paths, output_path)),
+        ]
+        json_paths = []
+        if args.json_mb > 0:
+            json_paths = [os.path.join(work_dir, f"part{index}.json") for index in range(args.files)]
+            for path in json_paths:
+                write_json(path, int(args.json_mb * 1024 * 1024), rng)
+            json_output = os.path.join(work_dir, "merged.json")
+            variants += [
+                ("merge_json_files", "json.load/dump",
+                 lambda: json_handler.merge_json_files(json_paths, json_output, zero_copy=False)),
+                ("merge_json_files", "zero-copy",
+                 lambda: json_handler.merge_json_files(json_paths, json_output, zero_copy=True)),
+            ]
+
+        print(f"{'operation':<18} {'variant':<16} {'seconds':>9} {'GB/s':>8}")
+        for operation, variant, function in variants:
+            input_bytes = sum(os.path.getsize(path) for path in (text_paths if operation == "merge_files" else json_paths))
+            seconds = best_time(function, args.repeat)
+            gb_per_s = input_bytes / seconds / 1024 ** 3
+            results.append({"operation": operation, "variant": variant, "seconds": seconds,
+                            "input_bytes": input_bytes, "gb_per_s": gb_per_s})
+            print(f"{operation:<18} {variant:<16} {seconds:>9.3f} {gb_per_s:>8.2f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as json_file:
+            json.dump({"files": args.files, "mb": args.mb, "json_mb": args.json_mb, "results": results}, json_file,
+                      indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Measure CLI cold-start cost for each file type.
+
+Every handler is loaded in a fresh interpreter started with ``-X importtime``,
+the same way ``main.py`` loads it through the lazy registry, and the total
+import time plus the heaviest top-level imports are reported.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeat 5 --max-ms 150 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import registry
+
+LOAD_SNIPPET = "import sys; sys.path.insert(0, {root!r}); import registry; registry.load_handler({path!r})"
+
+def parse_importtime(stderr):
+    """Return total import time in microseconds and the top-level imports sorted by cost."""
+    total_us = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        total_us += int(self_us)
+        # Nested imports are indented below the module that pulled them in.
+        if not name[1:].startswith(" "):
+            top_level.append((name.strip(), int(cumulative_us)))
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return total_us, top_level
+
+def measure(extension, repeat):
+    """Load the handler for one extension in fresh interpreters and keep the fastest run."""
+    code = LOAD_SNIPPET.format(root=ROOT, path="sample" + extension)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            return {"extension": extension, "error": error}
+        total_us, top_level = parse_importtime(result.stderr)
+        if best is None or wall_ms < best["wall_ms"]:
+            best = {
+                "extension": extension,
+                "module": registry.HANDLER_MODULES[extension][0],
+                "wall_ms": round(wall_ms, 2),
+                "import_ms": round(total_us / 1000, 2),
+                "heaviest_imports": [{"module": name, "ms": round(us / 1000, 2)} for name, us in top_level[:5]],
+            }
+    return best
+
+def measure_baseline(repeat):
+    """Wall time of an interpreter that imports nothing but the registry."""
+    code = f"import sys; sys.path.insert(0, {ROOT!r}); import registry"
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time per file type")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per file type; the fastest is reported")
+    parser.add_argument("--max-ms", type=float, help="Fail if any file type imports slower than this")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    # One representative extension per handler module.
+    extensions = {}
+    for extension, (module_name, _) in registry.HANDLER_MODULES.items():
+        extensions.setdefault(module_name, extension)
+
+    baseline = measure_baseline(args.repeat)
+    results = [measure(extension, args.repeat) for extension in extensions.values()]
+
+    print(f"Interpreter baseline: {baseline:.2f} ms")
+    print(f"{'type':<8}{'module':<20}{'wall ms':>10}{'import ms':>12}  heaviest imports")
+    failed = False
+    for result in results:
+        if "error" in result:
+            print(f"{result['extension']:<8}failed to load: {result['error']}")
+            failed = True
+            continue
+        heaviest = ", ".join(f"{item['module']} {item['ms']:.1f}" for item in result["heaviest_imports"][:3])
+        print(f"{result['extension']:<8}{result['module']:<20}{result['wall_ms']:>10.2f}{result['import_ms']:>12.2f}  {heaviest}")
+        if args.max_ms is not None and result["import_ms"] > args.max_ms:
+            print(f"    regression: {result['import_ms']:.2f} ms exceeds the {args.max_ms:.2f} ms budget")
+            failed = True
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump({"baseline_ms": baseline, "results": results}, json_file, indent=4)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""Benchmark every handler operation on deterministic synthetic inputs.
+
+Fixtures are generated from a fixed seed, so two runs with the same options
+see byte-identical inputs. Each operation runs in a fresh interpreter through
+the library API, and wall time, CPU time and peak RSS are recorded:
+
+    python benchmarks/suite.py --text-mb 2048 --json results.json
+    python benchmarks/suite.py --only text --only csv --repeat 3
+    python benchmarks/suite.py --compare before.json after.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+    "et dolore magna aliqua error warning info debug request response timeout retry cache worker"
+).split()
+
+# (group, fixture, operation, params). In-place operations get a fresh copy of their fixture.
+CASES = [
+    ("text", "text", "count_words", {}),
+    ("text", "text", "count_lines", {}),
+    ("text", "text", "calculate_hash", {"algorithm": "sha256"}),
+    ("text", "text", "find_and_replace", {"find_text": "error", "replace_text": "ERROR"}),
+    ("text", "text", "convert_case", {"case": "upper"}),
+    ("text", "text", "sort_lines", {}),
+    ("text", "text", "remove_duplicates", {}),
+    ("text", "text", "extract_sections_by_keyword", {"keyword": "timeout"}),
+    ("text", "text", "split_file", {"lines_per_file": 100000}),
+    ("text", "text", "reverse_content", {}),
+    ("text", "text", "text_to_pdf", {}),
+    ("csv", "csv", "convert_csv_to_json", {}),
+    ("csv", "csv", "filter_csv", {"column_name": "col_1", "value": "lorem"}),
+    ("json", "json", "convert_json_to_csv", {}),
+    ("json", "json", "pretty_print_json", {}),
+    ("markdown", "markdown", "convert_markdown_to_html", {}),
+    ("markdown", "markdown", "count_words_in_markdown", {}),
+    ("pdf", "pdf", "pdf_to_text", {}),
+    ("pdf", "pdf", "split_pdf", {}),
+    ("pdf", "pdf", "compress_pdf", {}),
+    ("pdf", "pdf", "convert_pdf_to_image", {}),
+    ("image", "png", "resize_image", {"width": 800, "height": 600}),
+    ("image", "png", "create_thumbnail", {}),
+    ("image", "png", "grayscale_image", {}),
+    ("image", "jpeg", "compress_image", {"quality": 60}),
+    ("image", "jpeg", "apply_pipeline", {"spec": "resize:1600x1200,rotate:90,flip:horizontal,grayscale,contrast:1.2"}),
+    ("video", "video", "get_video_duration", {}),
+    ("video", "video", "resize_video", {"width": 320, "height": 240}),
+]
+
+def generate_text(path, size_bytes, rng):
+    """Log-like lines of random words, written in large blocks."""
+    with open(path, "w", encoding="utf-8") as out:
+        written = 0
+        line_no = 0
+        while written < size_bytes:
+            lines = []
+            for _ in range(10000):
+                line_no += 1
+                words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+                lines.append(f"{line_no % 5000:05d} {words}\n")
+            block = "".join(lines)
+            out.write(block)
+            written += len(block)
+
+def generate_csv(path, rows, columns, rng):
+    """A wide CSV with a header row and short word cells."""
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        out.write(",".join(f"col_{i}" for i in range(columns)) + "\n")
+        for _ in range(rows):
+            out.write(",".join(rng.choice(WORDS) for _ in range(columns)) + "\n")
+
+def nested_object(depth, rng):
+    node = {"value": rng.random(), "name": rng.choice(WORDS)}
+    for _ in range(depth):
+        node = {"name": rng.choice(WORDS), "count": rng.randint(0, 1000), "child": node}
+    return node
+
+def generate_json(path, items, depth, rng):
+    """A list of deeply nested objects."""
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump([nested_object(depth, rng) for _ in range(items)], out)
+
+def generate_markdown(path, sections, rng):
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(sections):
+            out.write(f"# Section {i}\n\n")
+            out.write(" ".join(rng.choice(WORDS) for _ in range(80)) + "\n\n")
+            out.write("".join(f"- {rng.choice(WORDS)} **{rng.choice(WORDS)}**\n" for _ in range(5)) + "\n")
+
+def generate_pdf(path, pages, rng):
+    """A text PDF with one short paragraph per line, drawn with reportlab."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+
+    c = canvas.Canvas(path, pagesize=letter)
+    for page in range(pages):
+        y = 740
+        c.drawString(72, y + 20, f"Page {page + 1}")
+        while y > 60:
+            c.drawString(72, y, " ".join(rng.choice(WORDS) for _ in range(12)))
+            y -= 14
+        c.showPage()
+    c.save()
+
+def generate_image(path, width, height, rng, image_format):
+    """Noise with a gradient, so encoders cannot cheat on a flat image."""
+    from PIL import Image
+
+    noise = Image.frombytes("RGB", (width, height), rng.randbytes(width * height * 3))
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    Image.blend(noise, gradient, 0.7).save(path, image_format, **({"quality": 90} if image_format == "JPEG" else {}))
+
+def generate_video(path, seconds, fps=24):
+    """A short colour-bar clip encoded locally with ffmpeg through moviepy."""
+    from moviepy.editor import ColorClip, concatenate_videoclips
+
+    colours = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+    clips = [ColorClip((640, 480), colour, duration=seconds / len(colours)) for colour in colours]
+    concatenate_videoclips(clips).write_videofile(path, fps=fps, logger=None, audio=False)
+
+def build_fixtures(directory, args):
+    """Generate (or reuse) every fixture and return a name -> path map."""
+    os.makedirs(directory, exist_ok=True)
+    config = {key: getattr(args, key) for key in
+              ("seed", "text_mb", "csv_rows", "csv_cols", "json_items", "json_depth", "md_sections",
+               "pdf_pages", "image_px", "video_seconds")}
+    meta_path = os.path.join(directory, "fixtures.json")
+    paths = {
+        "text": os.path.join(directory, "text.txt"),
+        "csv": os.path.join(directory, "wide.csv"),
+        "json": os.path.join(directory, "nested.json"),
+        "markdown": os.path.join(directory, "doc.md"),
+        "pdf": os.path.join(directory, "pages.pdf"),
+        "png": os.path.join(directory, "large.png"),
+        "jpeg": os.path.join(directory, "large.jpeg"),
+        "video": os.path.join(directory, "clip.mp4"),
+    }
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as meta_file:
+            if json.load(meta_file) == config and all(os.path.exists(p) for p in paths.values()):
+                return paths
+
+    generators = {
+        "text": lambda rng: generate_text(paths["text"], int(args.text_mb * 1024 * 1024), rng),
+        "csv": lambda rng: generate_csv(paths["csv"], args.csv_rows, args.csv_cols, rng),
+        "json": lambda rng: generate_json(paths["json"], args.json_items, args.json_depth, rng),
+        "markdown": lambda rng: generate_markdown(paths["markdown"], args.md_sections, rng),
+        "pdf": lambda rng: generate_pdf(paths["pdf"], args.pdf_pages, rng),
+        "png": lambda rng: generate_image(paths["png"], args.image_px, args.image_px * 3 // 4, rng, "PNG"),
+        "jpeg": lambda rng: generate_image(paths["jpeg"], args.image_px, args.image_px * 3 // 4, rng, "JPEG"),
+        "video": lambda rng: generate_video(paths["video"], args.video_seconds),
+    }
+    for name, generate in generators.items():
+        start = time.perf_counter()
+        try:
+            generate(random.Random(f"{args.seed}-{name}"))
+            print(f"Generated {name} fixture in {time.perf_counter() - start:.1f}s: {paths[name]}")
+        except Exception as e:
+            print(f"Warning: could not generate {name} fixture: {e}")
+            if os.path.exists(paths[name]):
+                os.unlink(paths[name])
+    with open(meta_path, "w", encoding="utf-8") as meta_file:
+        json.dump(config, meta_file)
+    return paths
+
+def peak_rss_bytes():
+    """Peak resident set size of this process.
+
+    On Linux ru_maxrss survives fork and exec, so a spawned child would report
+    the parent's peak; VmHWM belongs to the child's own address space.
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def run_case(operation, file_path, params, queue):
+    """Child-process body: import the handler, then time one operation."""
+    sys.path.insert(0, ROOT)
+    import registry
+
+    try:
+        function = registry.get_operation(operation)
+        baseline_rss = peak_rss_bytes()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        function(file_path, **params)
+        wall = time.perf_counter() - start
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        queue.put({
+            "ok": True,
+            "wall_s": wall,
+            "cpu_s": time.process_time() - cpu_start + children.ru_utime + children.ru_stime,
+            "peak_rss_mb": peak_rss_bytes() / (1024 * 1024),
+            "baseline_rss_mb": baseline_rss / (1024 * 1024),
+        })
+    except Exception as e:
+        queue.put({"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+def measure(operation, file_path, params):
+    """Run one case in a fresh spawned interpreter so RSS and imports are not shared."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=run_case, args=(operation, file_path, params, queue))
+    process.start()
+    process.join()
+    if queue.empty():
+        return {"ok": False, "error": f"worker exited with code {process.exitcode}"}
+    return queue.get()
+
+def run_suite(args):
+    fixtures_dir = args.fixtures or os.path.join(tempfile.gettempdir(), "uft-bench-fixtures")
+    fixtures = build_fixtures(fixtures_dir, args)
+    results = []
+    for group, fixture, operation, params in CASES:
+        if args.only and group not in args.only and operation not in args.only:
+            continue
+        source = fixtures[fixture]
+        if not os.path.exists(source):
+            results.append({"group": group, "operation": operation, "ok": False, "error": "fixture missing"})
+            continue
+        runs = []
+        for _ in range(args.repeat):
+            # Every run works on its own copy, so in-place operations see the same input.
+            with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+                work_path = os.path.join(work_dir, os.path.basename(source))
+                shutil.copyfile(source, work_path)
+                runs.append(measure(operation, work_path, params))
+        entry = {
+            "group": group,
+            "operation": operation,
+            "params": params,
+            "input_bytes": os.path.getsize(source),
+            "ok": all(run["ok"] for run in runs),
+        }
+        if entry["ok"]:
+            best = min(runs, key=lambda run: run["wall_s"])
+            entry.update({key: round(best[key], 4) for key in ("wall_s", "cpu_s", "peak_rss_mb", "baseline_rss_mb")})
+            entry["mb_per_s"] = round(entry["input_bytes"] / (1024 * 1024) / best["wall_s"], 2) if best["wall_s"] else None
+            print(f"{group:<9}{operation:<30}{entry['wall_s']:>9.3f}s wall{entry['cpu_s']:>9.3f}s cpu"
+                  f"{entry['peak_rss_mb']:>9.1f} MB peak")
+        else:
+            entry["error"] = next(run["error"] for run in runs if not run["ok"])
+            print(f"{group:<9}{operation:<30} failed: {entry['error']}")
+        results.append(entry)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("compare", "json_path")},
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(report, json_file, indent=4)
+        print(f"Results written to {args.json_path}")
+    return 0 if all(entry["ok"] for entry in results) else 1
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", ROOT, "describe", "--always", "--dirty"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(before_path, after_path):
+    """Print per-operation wall time and peak RSS ratios between two result files."""
+    with open(before_path, encoding="utf-8") as before_file, open(after_path, encoding="utf-8") as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    previous = {(entry["group"], entry["operation"]): entry for entry in before["results"] if entry["ok"]}
+    print(f"{before.get('revision')} -> {after.get('revision')}")
+    print(f"{'operation':<40}{'wall before':>12}{'wall after':>12}{'speedup':>9}{'rss before':>12}{'rss after':>11}")
+    for entry in after["results"]:
+        old = previous.get((entry["group"], entry["operation"]))
+        if not entry["ok"] or old is None:
+            continue
+        speedup = old["wall_s"] / entry["wall_s"] if entry["wall_s"] else float("inf")
+        print(f"{entry['group'] + '.' + entry['operation']:<40}{old['wall_s']:>12.3f}{entry['wall_s']:>12.3f}"
+              f"{speedup:>8.2f}x{old['peak_rss_mb']:>12.1f}{entry['peak_rss_mb']:>11.1f}")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark handler operations on synthetic inputs")
+    parser.add_argument("--fixtures", help="Directory for generated fixtures (reused while options match)")
+    parser.add_argument("--work-dir", help="Directory for per-run copies of the fixtures (default: system temp)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--only", action="append", help="Only run this group or operation (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per operation; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--text-mb", type=float, default=64, help="Size of the text fixture in MB")
+    parser.add_argument("--csv-rows", type=int, default=200000)
+    parser.add_argument("--csv-cols", type=int, default=50)
+    parser.add_argument("--json-items", type=int, default=20000)
+    parser.add_argument("--json-depth", type=int, default=40)
+    parser.add_argument("--md-sections", type=int, default=5000)
+    parser.add_argument("--pdf-pages", type=int, default=200)
+    parser.add_argument("--image-px", type=int, default=4000, help="Width of the image fixtures (4:3)")
+    parser.add_argument("--video-seconds", type=float, default=4)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        return compare(*args.compare)
+    return run_suite(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+import registry
+import tracing
+from results import OperationResult
+
+# Bump when the cache layout or key derivation changes.
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Linux ioctl that clones a file's extents (reflink) on btrfs, XFS and friends.
+FICLONE = 0x40049409
+
+# Operations that are deterministic and never modify their input. Only these
+# are ever served from the cache.
+CACHEABLE_OPERATIONS = {
+    "get_image_info", "convert_image", "create_thumbnail", "apply_pipeline",
+    "pdf_to_text", "split_pdf", "extract_pages", "rotate_pages", "compress_pdf", "search_text_in_pdf",
+    "extract_images_from_pdf", "convert_pdf_to_image",
+    "count_words", "count_lines", "count_text", "calculate_hash", "extract_sections_by_keyword",
+    "convert_markdown_to_html", "extract_text_from_markdown", "count_words_in_markdown",
+    "list_headings_in_markdown",
+    "convert_csv_to_json", "convert_json_to_csv",
+    "get_video_duration", "extract_audio",
+}
+
+def default_cache_dir():
+    """Return the cache directory used when none is given."""
+    return os.environ.get("UFT_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "uft")
+
+def materialise(source, destination):
+    """Place a cached file at ``destination`` via hard link, reflink or copy, in that order."""
+    directory = os.path.dirname(os.path.abspath(destination))
+    temp_path = os.path.join(directory, f".{os.path.basename(destination)}.uft-{os.getpid()}")
+    try:
+        os.link(source, temp_path)
+        method = "link"
+    except OSError:
+        try:
+            with open(source, "rb") as src, open(temp_path, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            method = "reflink"
+        except OSError:
+            shutil.copyfile(source, temp_path)
+            method = "copy"
+    os.replace(temp_path, destination)
+    return method
+
+class ResultCache:
+    """On-disk cache of operation results keyed by input content, operation and parameters.
+
+    Metadata lives in a SQLite database so that many worker processes can share
+    one cache safely. Output files are kept under ``objects/`` and handed back
+    by hard link (or reflink/copy) on a hit; entries are evicted least recently
+    used first once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(self.cache_dir, "cache.db"), timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, operation TEXT, result TEXT, outputs TEXT,
+                size INTEGER, created REAL, last_used REAL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS input_hashes (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER);
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    def input_hash(self, file_path):
+        """Content hash of an input file, re-using the last hash while size and mtime are unchanged."""
+        import text_handler
+
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        row = self.db.execute("SELECT size, mtime_ns, hash FROM input_hashes WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        digest = text_handler.calculate_hash(path, "sha256").data["hash"]
+        self.db.execute("INSERT OR REPLACE INTO input_hashes VALUES (?, ?, ?, ?)",
+                        (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def param_file_hashes(self, params):
+        """Content hashes of the existing files named by parameters, such as a keywords file or replacement table.
+
+        Output parameters are left out: they name what the operation writes, not what it reads.
+        """
+        hashes = {}
+        for name, value in params.items():
+            if name.startswith("output"):
+                continue
+            for item in value if isinstance(value, (list, tuple)) else [value]:
+                if isinstance(item, str) and item and os.path.isfile(item):
+                    hashes[f"{name}:{item}"] = self.input_hash(item)
+        return hashes
+
+    def key(self, operation, file_path, params):
+        """Cache key for running ``operation`` on the current content of ``file_path`` and of files named in ``params``."""
+        canonical = json.dumps(params, sort_keys=True, default=str)
+        files = json.dumps(self.param_file_hashes(params), sort_keys=True)
+        material = f"{CACHE_VERSION}\0{self.input_hash(file_path)}\0{operation}\0{canonical}\0{files}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def lookup(self, key, file_path):
+        """Return the cached result for ``key`` with its outputs materialised, or None on a miss."""
+        row = self.db.execute("SELECT result, outputs FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        result = OperationResult(**json.loads(row[0]))
+        outputs = json.loads(row[1])
+        stem = os.path.splitext(file_path)[0]
+        paths = []
+        for output in outputs:
+            object_path = os.path.join(self.objects_dir, output["object"])
+            try:
+                stat = os.stat(object_path)
+            except FileNotFoundError:
+                stat = None
+            # Hard-linked outputs share the object's inode, so an in-place edit of
+            # an output shows up here and invalidates the entry.
+            if stat is None or stat.st_size != output["size"] or stat.st_mtime_ns != output["mtime_ns"]:
+                self.remove(key)
+                return None
+            paths.append((object_path, stem + output["suffix"] if "suffix" in output else output["path"]))
+        for object_path, destination in paths:
+            materialise(object_path, destination)
+        # The stored message names the files of the run that filled the cache.
+        message = result.message
+        for old_path, (_, new_path) in zip(result.output_paths, paths):
+            message = message.replace(old_path, new_path)
+        result.message = message.replace(result.input_path, file_path)
+        result.input_path = file_path
+        result.output_paths = [destination for _, destination in paths]
+        self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return result
+
+    def store(self, key, file_path, result):
+        """Add a freshly computed result and its output files to the cache."""
+        if os.path.abspath(file_path) in map(os.path.abspath, result.output_paths):
+            return  # In-place edits cannot be replayed from the cache.
+        stem = os.path.splitext(file_path)[0]
+        outputs = []
+        total_size = 0
+        for index, output_path in enumerate(result.output_paths):
+            object_name = f"{key}.{index}{os.path.splitext(output_path)[1]}"
+            object_path = os.path.join(self.objects_dir, object_name)
+            materialise(output_path, object_path)
+            stat = os.stat(object_path)
+            output = {"object": object_name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            # Outputs named after the input are re-derived from the new input's name on a hit.
+            if output_path.startswith(stem):
+                output["suffix"] = output_path[len(stem):]
+            else:
+                output["path"] = output_path
+            outputs.append(output)
+            total_size += stat.st_size
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, result.operation, json.dumps(result.to_dict()), json.dumps(outputs),
+                         total_size, now, now))
+        self.evict()
+
+    def remove(self, key):
+        """Drop one entry and its objects."""
+        row = self.db.execute("SELECT outputs FROM entries WHERE key = ?", (key,)).fetchone()
+        self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        for output in json.loads(row[0]) if row else []:
+            try:
+                os.unlink(os.path.join(self.objects_dir, output["object"]))
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        """Evict least recently used entries until the cache fits in ``max_bytes``."""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        evicted = 0
+        while total > self.max_bytes:
+            row = self.db.execute("SELECT key, size FROM entries ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                break
+            self.remove(row[0])
+            total -= row[1]
+            evicted += 1
+        if evicted:
+            self.count("evictions", evicted)
+        return evicted
+
+    def count(self, name, amount=1):
+        self.db.execute("INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                        (name, amount, amount))
+
+    def stats(self):
+        """Return lifetime counters plus the current number and size of entries."""
+        counters = dict(self.db.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        self.db.execute("DELETE FROM entries")
+        shutil.rmtree(self.objects_dir, ignore_errors=True)
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def run(self, operation, file_path, params):
+        """Run an operation through the cache and return ``(result, hit)``."""
+        function = registry.get_operation(operation)
+        params = registry.coerce_params(function, params)
+        if operation not in CACHEABLE_OPERATIONS:
+            return function(file_path, **params), False
+        with tracing.phase("cache_lookup"):
+            key = self.key(operation, file_path, params)
+            result = self.lookup(key, file_path)
+        if result is not None:
+            self.hits += 1
+            self.count("hits")
+            return result, True
+        self.misses += 1
+        self.count("misses")
+        result = function(file_path, **params)
+        with tracing.phase("cache_store"):
+            self.store(key, file_path, result)
+        return result, False
+
+_caches = {}
+
+def get_cache(cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Return a per-process ResultCache, opening it on first use."""
+    cache_dir = cache_dir or default_cache_dir()
+    if cache_dir not in _caches:
+        _caches[cache_dir] = ResultCache(cache_dir, max_bytes)
+    _caches[cache_dir].max_bytes = max_bytes
+    return _caches[cache_dir]
+
+def parse_size(value):
+    """Parse a size such as 512M or 2G into bytes."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+def run_cache(args):
+    """Show statistics for, or clear, the result cache."""
+    cache = ResultCache(args.cache_dir, parse_size(args.cache_size))
+    if args.clear:
+        cache.clear()
+        print(f"Cache cleared: {cache.cache_dir}")
+    stats = cache.stats()
+    print(f"Cache directory: {cache.cache_dir}")
+    print(f"Entries: {stats['entries']} ({stats['size_bytes'] / (1024 * 1024):.2f} MB of "
+          f"{stats['max_bytes'] / (1024 * 1024):.0f} MB)")
+    print(f"Hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']}")
+    return 0
+
+def add_cache_arguments(parser, include_toggle=True):
+    """Register the shared cache options on an argument parser."""
+    if include_toggle:
+        parser.add_argument("--no-cache", action="store_true", help="Always recompute instead of using the result cache")
+    parser.add_argument("--cache-dir", help="Result cache directory (default: $UFT_CACHE_DIR or ~/.cache/uft)")
+    parser.add_argument("--cache-size", default="1G", help="Maximum cache size before LRU eviction, e.g. 512M or 4G")
@@ -0,0 +1,163 @@
+"""Concatenation of files without passing their data through Python.
+
+Byte ranges are copied with ``os.copy_file_range``, which lets the kernel
+(or the filesystem, as a reflink) do the copy; where that is unavailable or
+refused, for example across filesystems on older kernels, ``os.sendfile`` is
+tried, and finally a plain loop over one large reused buffer. Only the few
+bytes needed to decide on separators and newlines are ever read.
+"""
+import errno
+import os
+
+BUFFER_SIZE = 8 * 1024 * 1024
+# copy_file_range and sendfile copy at most this much per call on Linux.
+MAX_CHUNK = 0x7FFFF000
+# Errors that mean "this copy method is not available here", not a real failure.
+UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+WHITESPACE = b" \t\r\n"
+
+class Copier:
+    """Copies byte ranges between file descriptors with the fastest method that works.
+
+    A method that fails as unsupported is not tried again for later ranges.
+    """
+
+    def __init__(self):
+        self.methods = [name for name in ("copy_file_range", "sendfile") if hasattr(os, name)] + ["buffer"]
+        self.used = set()
+        self.buffer = None
+
+    def copy(self, source_fd, dest_fd, offset, count):
+        """Copy ``count`` bytes from ``offset`` in ``source_fd`` to the current position of ``dest_fd``."""
+        while count > 0:
+            method = self.methods[0]
+            try:
+                if method == "copy_file_range":
+                    copied = os.copy_file_range(source_fd, dest_fd, min(count, MAX_CHUNK), offset)
+                elif method == "sendfile":
+                    copied = os.sendfile(dest_fd, source_fd, offset, min(count, MAX_CHUNK))
+                else:
+                    copied = self.copy_buffered(source_fd, dest_fd, offset, count)
+            except OSError as e:
+                if method == "buffer" or e.errno not in UNSUPPORTED:
+                    raise
+                self.methods.pop(0)
+                continue
+            if copied == 0:
+                raise EOFError(f"Unexpected end of file while copying ({count} bytes left).")
+            self.used.add(method)
+            offset += copied
+            count -= copied
+
+    def copy_buffered(self, source_fd, dest_fd, offset, count):
+        if self.buffer is None:
+            self.buffer = bytearray(BUFFER_SIZE)
+        view = memoryview(self.buffer)[:min(count, BUFFER_SIZE)]
+        read = os.preadv(source_fd, [view], offset) if hasattr(os, "preadv") else self.pread_into(source_fd, view, offset)
+        written = 0
+        while written < read:
+            written += os.write(dest_fd, view[written:read])
+        return read
+
+    @staticmethod
+    def pread_into(source_fd, view, offset):
+        data = os.pread(source_fd, len(view), offset)
+        view[:len(data)] = data
+        return len(data)
+
+def write_all(dest_fd, data):
+    while data:
+        data = data[os.write(dest_fd, data):]
+
+def check_output(file_paths, output_path):
+    if os.path.exists(output_path) and any(os.path.exists(path) and os.path.samefile(path, output_path)
+                                           for path in file_paths):
+        raise ValueError(f"The output file {output_path} is also one of the inputs.")
+
+def concatenate(file_paths, output_path, separator=b"\n", ensure_newline=False):
+    """Write the files one after another to ``output_path``, each followed by ``separator``.
+
+    With ``ensure_newline``, a file that does not end with a newline gets one
+    before its separator. Returns ``(bytes written, copy methods used)``.
+    """
+    check_output(file_paths, output_path)
+    copier = Copier()
+    total = 0
+    with open(output_path, "wb") as output:
+        dest_fd = output.fileno()
+        for file_path in file_paths:
+            with open(file_path, "rb") as source:
+                size = os.fstat(source.fileno()).st_size
+                copier.copy(source.fileno(), dest_fd, 0, size)
+                total += size
+                if ensure_newline and size and os.pread(source.fileno(), 1, size - 1) != b"\n":
+                    write_all(dest_fd, b"\n")
+                    total += 1
+            write_all(dest_fd, separator)
+            total += len(separator)
+    return total, sorted(copier.used)
+
+def array_bounds(fd, size):
+    """Return ``(start, end)`` of the items inside a top-level JSON array, or None if it is not one.
+
+    Only the brackets and the bytes next to them are checked; the items are not parsed.
+    ``start == end`` means the array is empty. Raises ``ValueError`` for a comma
+    directly inside either bracket, which would make the merged array invalid.
+    """
+    head = os.pread(fd, 4096, 0)
+    first = len(head) - len(head.lstrip(WHITESPACE))
+    if first >= len(head) or head[first:first + 1] != b"[":
+        return None
+    tail_start = max(0, size - 4096)
+    tail = os.pread(fd, size - tail_start, tail_start).rstrip(WHITESPACE)
+    if not tail.endswith(b"]") or tail_start + len(tail) - 1 <= first:
+        return None
+    start, end = first + 1, tail_start + len(tail) - 1
+    if tail[:-1].rstrip(WHITESPACE).endswith(b",") and tail_start + len(tail[:-1].rstrip(WHITESPACE)) > start:
+        raise ValueError("Invalid JSON array: trailing comma before ']'.")
+    # The array is empty if only whitespace, however much, lies before the closing bracket.
+    position, step = start, 4096
+    while position < end:
+        block = os.pread(fd, min(step, end - position), position)
+        inner = block.lstrip(WHITESPACE)
+        if inner.startswith(b","):
+            raise ValueError("Invalid JSON array: comma after '['.")
+        if not block or inner:
+            return start, end
+        position += len(block)
+        step = min(step * 2, BUFFER_SIZE)
+    return start, start
+
+def concatenate_json_arrays(file_paths, output_path):
+    """Merge the items of top-level JSON arrays into one array by copying their bytes.
+
+    Returns ``(merged file count, skipped paths, copy methods used)``. Files
+    that are not arrays are skipped; empty arrays add nothing.
+    """
+    check_output(file_paths, output_path)
+    copier = Copier()
+    merged = 0
+    skipped = []
+    try:
+        with open(output_path, "wb") as output:
+            dest_fd = output.fileno()
+            write_all(dest_fd, b"[")
+            for file_path in file_paths:
+                with open(file_path, "rb") as source:
+                    size = os.fstat(source.fileno()).st_size
+                    bounds = array_bounds(source.fileno(), size)
+                    if bounds is None:
+                        skipped.append(file_path)
+                        continue
+                    start, end = bounds
+                    if start == end:
+                        continue
+                    write_all(dest_fd, b",\n" if merged else b"\n")
+                    copier.copy(source.fileno(), dest_fd, start, end - start)
+                    merged += 1
+            write_all(dest_fd, b"\n]\n")
+    except BaseException:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    return merged, skipped, sorted(copier.used)
@@ -0,0 +1,381 @@
+"""Constant-memory streaming conversion of CSV files to JSON and NDJSON.
+
+Rows are parsed with the csv module and written one by one, as a JSON array
+(formatted exactly like ``json.dump(rows, indent=4)`` of ``csv.DictReader``
+rows, or compactly) or as newline-delimited JSON, so memory use does not
+grow with the file. Each row is assembled from per-column key prefixes and
+C-escaped values instead of building a dict and running the JSON encoder.
+
+Type inference looks at a sample of the first rows and gives each column
+the narrowest type all of its sampled values fit: integer, float, boolean or
+string; empty cells (and ``null``) become JSON null. Numbers are only
+recognised in JSON syntax, so they are written as they appear in the file.
+A later value that does not fit its column's type is written as a string.
+
+Large files are converted in parallel: the file is cut at record ends
+into byte ranges, workers convert each range into its own part file, and
+the parts are joined in order by the kernel. A newline ends a record
+when the quotes before it are balanced, which holds for RFC 4180 quoting
+(quote characters only inside quoted fields, doubled there).
+"""
+import csv
+import io
+import operator
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from json.encoder import encode_basestring_ascii
+import concatenating
+import decoding
+import transforming
+
+BLOCK_SIZE = 4 * 1024 * 1024
+# Files smaller than this are converted in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MIN_RANGE_SIZE = 32 * 1024 * 1024
+SAMPLE_ROWS = 1000
+FORMATS = ("json", "ndjson")
+INDENT = 4
+# Rows are encoded in batches of this many and written with one call.
+WRITE_ROWS = 4096
+INTEGER = re.compile(r"-?(?:0|[1-9][0-9]*)")
+FLOAT = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?")
+BOOLEANS = {"true": "true", "false": "false"}
+NULLS = ("", "null", "NULL")
+
+def parse_renames(value):
+    """Parse column renames: a dict, a JSON object or ``"old=new,old2=new2"``."""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(old): str(new) for old, new in value.items()}
+    if isinstance(value, (list, tuple)):
+        value = ",".join(value)
+    renames = {}
+    for item in value.split(","):
+        old, separator, new = item.partition("=")
+        if not separator or not old.strip():
+            raise ValueError(f"Invalid rename {item!r}; expected old=new")
+        renames[old.strip()] = new.strip()
+    return renames
+
+class RangeReader(io.RawIOBase):
+    """A read-only raw stream over ``[start, end)`` of a file."""
+
+    def __init__(self, file_path, start, end):
+        self.file = open(file_path, "rb", buffering=0)
+        self.position = start
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.end - self.position)
+        if size <= 0:
+            return 0
+        data = os.pread(self.file.fileno(), size, self.position)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+def open_range(file_path, start, end, encoding):
+    """Open ``[start, end)`` of a file as text for ``csv.reader``."""
+    return io.TextIOWrapper(io.BufferedReader(RangeReader(file_path, start, end), BLOCK_SIZE), encoding=encoding,
+                            errors="replace", newline="")
+
+def read_record(file):
+    """Read the lines of one record from a binary file positioned at a record start."""
+    record = b""
+    while True:
+        line = file.readline(BLOCK_SIZE)
+        record += line
+        if not line or (line.endswith(b"\n") and record.count(b'"') % 2 == 0):
+            return record
+
+def read_header(file_path, start, encoding, delimiter):
+    """Return ``(column names, offset of the first data record)``; blank lines before the header are skipped."""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        while True:
+            record = read_record(file)
+            if not record:
+                return [], file.tell()
+            row = next(csv.reader(io.StringIO(record.decode(encoding, "replace"), newline=""), delimiter=delimiter),
+                       [])
+            if row:
+                return row, file.tell()
+
+def record_boundaries(file_path, start, end, parts):
+    """Split ``[start, end)`` into up to ``parts`` ranges that each start at a record."""
+    bounds = [start]
+    quotes = 0
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        position = start
+        for index in range(1, parts):
+            target = start + (end - start) * index // parts
+            while position < target:
+                block = file.read(min(BLOCK_SIZE, target - position))
+                if not block:
+                    break
+                quotes += block.count(b'"')
+                position += len(block)
+            # Continue to the first newline after the target with the quotes before it balanced.
+            while position < end:
+                line = file.readline(BLOCK_SIZE)
+                if not line:
+                    position = end
+                    break
+                quotes += line.count(b'"')
+                position += len(line)
+                if line.endswith(b"\n") and quotes % 2 == 0:
+                    break
+            if bounds[-1] < position < end:
+                bounds.append(position)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+def infer_column_types(rows, width):
+    """The narrowest of ``int``, ``float``, ``bool`` and ``str`` that fits every non-null sampled value of each column."""
+    candidates = [{"int", "float", "bool"} for _ in range(width)]
+    for row in rows:
+        for index, value in enumerate(row[:width]):
+            possible = candidates[index]
+            if not possible or value in NULLS:
+                continue
+            if "int" in possible and not INTEGER.fullmatch(value):
+                possible.discard("int")
+            if "float" in possible and not FLOAT.fullmatch(value):
+                possible.discard("float")
+            if "bool" in possible and value.lower() not in BOOLEANS:
+                possible.discard("bool")
+    types = []
+    for index, possible in enumerate(candidates):
+        seen = any(index < len(row) and row[index] not in NULLS for row in rows)
+        types.append(next((name for name in ("int", "float", "bool") if name in possible), "str") if seen else "str")
+    return types
+
+class Conversion:
+    """What to write for each row: columns, their output names and types, and the output format.
+
+    Plain attributes only, so it can be sent to worker processes, which build
+    the row encoder themselves.
+    """
+
+    def __init__(self, header, columns=None, renames=None, types=None, output_format="json", compact=False,
+                 delimiter=","):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format} (expected 'json' or 'ndjson')")
+        # As with csv.DictReader, a repeated column name keeps its last value in its first position.
+        positions = {}
+        for index, name in enumerate(header):
+            positions[name] = index
+        if columns:
+            missing = [name for name in columns if name not in positions]
+            if missing:
+                raise ValueError(f"Unknown column(s): {', '.join(missing)} (available: {', '.join(positions)})")
+        else:
+            columns = list(positions)
+        renames = renames or {}
+        unknown = [name for name in renames if name not in positions]
+        if unknown:
+            raise ValueError(f"Cannot rename unknown column(s): {', '.join(unknown)}")
+        self.width = len(header)
+        self.indices = [positions[name] for name in columns]
+        self.names = [renames.get(name, name) for name in columns]
+        self.types = [types[index] for index in self.indices] if types else None
+        self.output_format = output_format
+        self.compact = compact or output_format == "ndjson"
+        self.delimiter = delimiter
+        # Without a projection, surplus fields go under a null key, as with csv.DictReader.
+        self.keep_extra = not columns or columns == list(positions)
+
+    def delimiters(self):
+        """Return ``(opening, separator between rows, closing, whole output when there are no rows)``."""
+        if self.output_format == "ndjson":
+            return "", "\n", "\n", ""
+        return ("[", ", ", "]", "[]") if self.compact else ("[\n", ",\n", "\n]", "[]")
+
+    def value_encoders(self, fallbacks):
+        """One function per output column turning a cell into JSON text; ``fallbacks[0]`` counts misfits."""
+        if self.types is None:
+            return [encode_basestring_ascii] * len(self.indices)
+
+        def null_or_string(value):
+            return "null" if value in NULLS else encode_basestring_ascii(value)
+
+        def misfit(value):
+            if value in NULLS:
+                return "null"
+            fallbacks[0] += 1
+            return encode_basestring_ascii(value)
+
+        def integer(value):
+            return value if INTEGER.fullmatch(value) else misfit(value)
+
+        def number(value):
+            return value if FLOAT.fullmatch(value) else misfit(value)
+
+        def boolean(value):
+            return BOOLEANS.get(value.lower()) or misfit(value)
+
+        by_type = {"str": null_or_string, "int": integer, "float": number, "bool": boolean}
+        return [by_type[name] for name in self.types]
+
+    def row_encoder(self, fallbacks):
+        """A function turning a parsed CSV row into the text of one JSON object."""
+        keys = [encode_basestring_ascii(name) + ": " for name in self.names]
+        if self.compact:
+            inner = ""
+            opening, closing, joiner, empty = "{", "}", ", ", "{}"
+            extra_opening, extra_separator, extra_closing = "[", ", ", "]"
+        else:
+            # The layout of json.dump(rows, indent=4): each row one level deep, its fields two.
+            inner = "\n" + " " * (2 * INDENT)
+            item = inner + " " * INDENT
+            opening, closing, joiner, empty = " " * INDENT + "{", "\n" + " " * INDENT + "}", ",", " " * INDENT + "{}"
+            extra_opening, extra_separator, extra_closing = "[" + item, "," + item, inner + "]"
+        prefixes = [inner + key for key in keys]
+        extra_prefix = inner + '"null": '
+        encoders = self.value_encoders(fallbacks)
+        width = self.width
+        count = len(self.indices)
+        getter = operator.itemgetter(*self.indices) if count > 1 else (
+            (lambda row: (row[self.indices[0]],)) if count else (lambda row: ()))
+        same_encoder = len(set(encoders)) <= 1
+        first_encoder = encoders[0] if encoders else None
+        add = operator.add
+        keep_extra = self.keep_extra
+
+        def encode(row):
+            if len(row) == width:
+                values = getter(row)
+                encoded = map(first_encoder, values) if same_encoder else map(
+                    lambda encoder, value: encoder(value), encoders, values)
+                return opening + joiner.join(map(add, prefixes, encoded)) + closing if count else empty
+            # Short rows are padded with nulls; long rows keep their surplus fields under a null key.
+            fields = [row[index] if index < len(row) else None for index in self.indices]
+            parts = [prefix + ("null" if value is None else encoder(value))
+                     for prefix, encoder, value in zip(prefixes, encoders, fields)]
+            if keep_extra and len(row) > width:
+                parts.append(extra_prefix + extra_opening + extra_separator.join(
+                    map(encode_basestring_ascii, row[width:])) + extra_closing)
+            return opening + joiner.join(parts) + closing if parts else empty
+
+        return encode
+
+def convert_range(file_path, start, end, output, encoding, conversion, prefix=""):
+    """Convert the records in ``[start, end)`` of a CSV file and write them to an open binary file.
+
+    ``prefix`` is written before the first row. Returns ``(rows, values written as strings instead of their
+    inferred type)``.
+    """
+    _, separator, _, _ = conversion.delimiters()
+    fallbacks = [0]
+    encode = conversion.row_encoder(fallbacks)
+    rows = 0
+    pending = []
+    with open_range(file_path, start, end, encoding) as text:
+        for row in csv.reader(text, delimiter=conversion.delimiter):
+            if not row:
+                continue
+            pending.append(encode(row))
+            if len(pending) == WRITE_ROWS:
+                output.write(((separator if rows else prefix) + separator.join(pending)).encode("ascii"))
+                rows += len(pending)
+                pending = []
+    if pending:
+        output.write(((separator if rows else prefix) + separator.join(pending)).encode("ascii"))
+        rows += len(pending)
+    return rows, fallbacks[0]
+
+def convert_range_to_file(file_path, start, end, part_path, encoding, conversion):
+    with open(part_path, "wb") as part:
+        return convert_range(file_path, start, end, part, encoding, conversion)
+
+def sample_rows(file_path, start, end, encoding, delimiter, count=SAMPLE_ROWS):
+    rows = []
+    with open_range(file_path, start, end, encoding) as text:
+        for row in csv.reader(text, delimiter=delimiter):
+            if row:
+                rows.append(row)
+                if len(rows) == count:
+                    break
+    return rows
+
+def convert_file(file_path, output_path, output_format="json", infer_types=False, columns=None, renames=None,
+                 compact=False, delimiter=",", encoding=None, workers=None, sample_size=SAMPLE_ROWS):
+    """Convert a CSV file (with a header row) to a JSON array or NDJSON, streaming it row by row.
+
+    Returns statistics: rows, columns, the inferred types, values that did not fit them, workers, seconds, MB/s
+    and rows per second.
+    """
+    start_time = time.perf_counter()
+    encoding, bom = decoding.resolve_encoding(file_path, encoding)
+    if not decoding.ascii_compatible(encoding):
+        # Record boundaries are found in raw bytes, so files such as UTF-16 are converted from a UTF-8 copy.
+        with decoding.TextSource(file_path, encoding, raw=True) as source:
+            stats = convert_file(source.path, output_path, output_format, infer_types, columns, renames, compact,
+                                 delimiter, "utf-8", workers, sample_size)
+        stats["seconds"] = time.perf_counter() - start_time
+        return stats
+    size = os.path.getsize(file_path)
+    header, data_start = read_header(file_path, bom, encoding, delimiter)
+    types = infer_column_types(sample_rows(file_path, data_start, size, encoding, delimiter, sample_size),
+                               len(header)) if infer_types else None
+    conversion = Conversion(header, columns, parse_renames(renames), types, output_format, compact, delimiter)
+    opening, separator, closing, empty = conversion.delimiters()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    body = size - data_start
+    parts = max(1, min(workers, body // MIN_RANGE_SIZE)) if body >= PARALLEL_THRESHOLD else 1
+    ranges = record_boundaries(file_path, data_start, size, parts) if parts > 1 else [(data_start, size)]
+
+    def write(output):
+        if len(ranges) == 1:
+            rows, fallbacks = convert_range(file_path, data_start, size, output, encoding, conversion, opening)
+            output.write((closing if rows else empty).encode("ascii"))
+            return rows, fallbacks
+        part_dir = tempfile.mkdtemp(prefix=".uft-csv-", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            part_paths = [os.path.join(part_dir, f"part{index}") for index in range(len(ranges))]
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(convert_range_to_file, file_path, start, end, part_path, encoding,
+                                           conversion) for (start, end), part_path in zip(ranges, part_paths)]
+                results = [future.result() for future in futures]
+            rows = sum(part_rows for part_rows, _ in results)
+            if not rows:
+                output.write(empty.encode("ascii"))
+                return 0, 0
+            copier = concatenating.Copier()
+            output.write(opening.encode("ascii"))
+            written = 0
+            for part_path, (part_rows, _) in zip(part_paths, results):
+                if not part_rows:
+                    continue
+                if written:
+                    output.write(separator.encode("ascii"))
+                output.flush()
+                with open(part_path, "rb") as part:
+                    copier.copy(part.fileno(), output.fileno(), 0, os.fstat(part.fileno()).st_size)
+                written += part_rows
+            output.write(closing.encode("ascii"))
+            return rows, sum(fallbacks for _, fallbacks in results)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    rows, fallbacks = transforming.write_atomically(file_path, output_path, write)
+    elapsed = time.perf_counter() - start_time
+    return {"rows": rows, "columns": conversion.names,
+            "types": dict(zip(conversion.names, conversion.types)) if conversion.types else None,
+            "fallbacks": fallbacks, "workers": len(ranges), "bytes": size, "seconds": elapsed,
+            "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+            "rows_per_s": rows / elapsed if elapsed > 0 else 0.0}
@@ -0,0 +1,150 @@
+"""One-pass line, word, character and byte counting on raw bytes.
+
+Files are read in large blocks into a reused buffer and never decoded, so
+memory use is constant regardless of file size. Large files are split into
+chunks that are counted on several cores; a word cut in two by a chunk (or
+block) boundary is counted once by checking the bytes on either side of the
+cut.
+
+Words are runs of bytes other than ASCII whitespace, as in ``wc``.
+Characters are counted as UTF-8 code points (every byte that is not a
+continuation byte), which is also correct for ASCII. Counting only lines
+skips the byte classes and just counts newline bytes.
+
+Other ASCII-compatible encodings are counted from their raw bytes too; only
+their characters need decoding, unless every character is one byte. Files in
+encodings such as UTF-16 are decoded incrementally and counted from their
+UTF-8 encoding in memory.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import decoding
+
+BLOCK_SIZE = 4 * 1024 * 1024
+# Files smaller than this are counted in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MIN_CHUNK_SIZE = 32 * 1024 * 1024
+
+WHITESPACE = b" \t\n\r\x0b\x0c"
+# Maps whitespace to " ", UTF-8 continuation bytes to "c" and everything else to
+# "a", so word starts and characters can be counted with C-speed bytes.count
+# calls instead of building a list of words.
+CLASS_TABLE = bytes(
+    0x20 if byte in WHITESPACE else ord("c") if 0x80 <= byte < 0xC0 else ord("a") for byte in range(256)
+)
+
+def count_block(block):
+    """Return ``(lines, words, chars)`` for one block of bytes, counted in isolation."""
+    classes = block.translate(CLASS_TABLE)
+    words = classes.count(b" a") + classes.count(b" c") + (classes[0] != 0x20 if classes else 0)
+    return block.count(b"\n"), words, len(classes) - classes.count(b"c")
+
+def count_blocks(blocks, lines_only=False):
+    """Count lines, words and characters in a sequence of byte blocks.
+
+    Also returns whether the blocks start and end inside a word, so the caller
+    can merge words that span adjacent ranges. With ``lines_only`` only
+    newlines are counted, which skips classifying every byte.
+    """
+    lines = words = chars = 0
+    starts_in_word = ends_in_word = False
+    last_byte = None
+    for block in blocks:
+        if not block:
+            continue
+        if lines_only:
+            lines += block.count(b"\n")
+            last_byte = block[-1]
+            continue
+        block_lines, block_words, block_chars = count_block(block)
+        lines += block_lines
+        chars += block_chars
+        words += block_words
+        if last_byte is None:
+            starts_in_word = block[0] not in WHITESPACE
+        elif ends_in_word and block[0] not in WHITESPACE:
+            words -= 1  # The first word of this block continues the last one of the previous block.
+        ends_in_word = block[-1] not in WHITESPACE
+        last_byte = block[-1]
+    return {"lines": lines, "words": words, "chars": chars, "starts_in_word": starts_in_word,
+            "ends_in_word": ends_in_word, "last_byte": last_byte}
+
+def read_blocks(file_path, start, end):
+    """Yield ``[start, end)`` of a file in blocks read into one reused buffer."""
+    buffer = bytearray(min(BLOCK_SIZE, max(end - start, 1)))
+    with open(file_path, "rb", buffering=0) as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            size = file.readinto(buffer if end - position >= len(buffer) else memoryview(buffer)[:end - position])
+            if not size:
+                break
+            yield buffer if size == len(buffer) else buffer[:size]
+            position += size
+
+def count_range(file_path, start, end, lines_only=False):
+    """Count lines, words and characters in ``[start, end)`` of a file (see ``count_blocks``)."""
+    return count_blocks(read_blocks(file_path, start, end), lines_only)
+
+def count_decoded(file_path, encoding, skip=0, lines_only=False):
+    """Count a file in an encoding that is not ASCII-compatible (such as UTF-16) from its decoded text.
+
+    Blocks are decoded incrementally and re-encoded as UTF-8 in memory, so
+    words and characters are counted exactly as for a UTF-8 file.
+    """
+    return count_blocks((text.encode("utf-8", decoding.ERRORS) for text in decoding.iter_text(file_path, encoding, skip)),
+                        lines_only)
+
+def split_ranges(size, parts):
+    """Split ``[0, size)`` into ``parts`` contiguous ranges."""
+    step = -(-size // parts)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+def count_file(file_path, workers=None, lines_only=False, encoding="utf-8", skip=0):
+    """Count lines, words, characters and bytes of a file in one pass.
+
+    ``lines`` is the number of newline bytes, as in ``wc -l``; ``line_count``
+    also counts a last line that has no trailing newline. Files in an
+    ASCII-compatible ``encoding`` are counted from their raw bytes (characters
+    of other encodings than UTF-8 are counted separately); others are decoded.
+    ``skip`` bytes at the start, such as a BOM, are left out. With
+    ``lines_only`` words and characters are not counted and are None.
+    """
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    raw = decoding.ascii_compatible(encoding)
+    parts = max(1, min(workers, (size - skip) // MIN_CHUNK_SIZE)) if raw and size - skip >= PARALLEL_THRESHOLD else 1
+
+    if size <= skip:
+        ranges = []
+    elif not raw:
+        ranges = [count_decoded(file_path, encoding, skip, lines_only)]
+    elif parts == 1:
+        ranges = [count_range(file_path, skip, size, lines_only)]
+    else:
+        bounds = [(skip + start, skip + end) for start, end in split_ranges(size - skip, parts)]
+        with ProcessPoolExecutor(max_workers=parts) as executor:
+            ranges = list(executor.map(count_range, [file_path] * len(bounds), [start for start, _ in bounds],
+                                       [end for _, end in bounds], [lines_only] * len(bounds)))
+
+    totals = {"lines": 0, "words": 0, "chars": 0}
+    for index, counts in enumerate(ranges):
+        for key in totals:
+            totals[key] += counts[key]
+        if index and ranges[index - 1]["ends_in_word"] and counts["starts_in_word"]:
+            totals["words"] -= 1
+    if lines_only:
+        totals["words"] = totals["chars"] = None
+    elif raw and not decoding.is_utf8(encoding):
+        totals["chars"] = (size - skip if decoding.single_byte(encoding)
+                           else decoding.count_characters(file_path, encoding, skip))
+    totals["bytes"] = size
+    totals["line_count"] = totals["lines"] + (1 if ranges and ranges[-1]["last_byte"] != ord("\n") else 0)
+    elapsed = time.perf_counter() - start_time
+    totals["seconds"] = elapsed
+    totals["mb_per_s"] = size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    totals["workers"] = parts
+    return totals
@@ -1,64 +1,62 @@
 import csv
-import json
 import os
+from typing import Any, List, Optional
+import converting
+from results import OperationResult
 
-def read_csv(file_path):
-    """Read and print the contents of a CSV file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                print(row)
-    except Exception as e:
-        print(f"Error reading CSV file: {e}")
+def read_csv(file_path: str) -> OperationResult:
+    """Read the contents of a CSV file."""
+    with open(file_path, 'r', encoding='utf-8') as csv_file:
+        rows = list(csv.reader(csv_file))
+    return OperationResult("read_csv", file_path, data={"rows": rows},
+                           message="\n".join(str(row) for row in rows))
 
-def write_csv(file_path):
-    """Write data to a new CSV file."""
-    try:
-        data = input("Enter data to write to CSV (comma-separated): ")
-        with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(data.split(','))
-        print(f"Data written to CSV successfully: {file_path}")
-    except Exception as e:
-        print(f"Error writing to CSV file: {e}")
+def write_csv(file_path: str, values: List[str]) -> OperationResult:
+    """Write a row of data to a new CSV file."""
+    with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(values)
+    return OperationResult("write_csv", file_path, [file_path],
+                           message=f"Data written to CSV successfully: {file_path}")
 
-def append_to_csv(file_path):
-    """Append data to an existing CSV file."""
-    try:
-        data = input("Enter data to append to CSV (comma-separated): ")
-        with open(file_path, 'a', newline='', encoding='utf-8') as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(data.split(','))
-        print(f"Data appended to CSV successfully: {file_path}")
-    except Exception as e:
-        print(f"Error appending to CSV file: {e}")
+def append_to_csv(file_path: str, values: List[str]) -> OperationResult:
+    """Append a row of data to an existing CSV file."""
+    with open(file_path, 'a', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(values)
+    return OperationResult("append_to_csv", file_path, [file_path],
+                           message=f"Data appended to CSV successfully: {file_path}")
 
-def convert_csv_to_json(file_path):
-    """Convert a CSV file to JSON format."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as csv_file:
-            reader = csv.DictReader(csv_file)
-            json_data = [row for row in reader]
-        json_file_path = os.path.splitext(file_path)[0] + ".json"
-        with open(json_file_path, 'w', encoding='utf-8') as json_file:
-            json.dump(json_data, json_file, indent=4)
-        print(f"CSV converted to JSON successfully: {json_file_path}")
-    except Exception as e:
-        print(f"Error converting CSV to JSON: {e}")
+def convert_csv_to_json(file_path: str, output_path: Optional[str] = None, output_format: str = "json",
+                        infer_types: bool = False, columns: Optional[List[str]] = None, rename: Any = None,
+                        compact: bool = False, delimiter: str = ",", encoding: Optional[str] = None,
+                        workers: Optional[int] = None) -> OperationResult:
+    """Convert a CSV file to a JSON array or to NDJSON (one object per line).
 
-def filter_csv(file_path):
-    """Filter rows in a CSV file based on a condition."""
-    try:
-        condition = input("Enter a condition to filter rows (e.g., column_name=value): ")
-        column_name, value = condition.split('=')
-        with open(file_path, 'r', encoding='utf-8') as csv_file:
-            reader = csv.DictReader(csv_file)
-            filtered_rows = [row for row in reader if row.get(column_name) == value]
-        for row in filtered_rows:
-            print(row)
-    except Exception as e:
-        print(f"Error filtering CSV file: {e}")
+    Rows are streamed, so memory use does not grow with the file; large files
+    are converted in record-aligned ranges on several cores. ``infer_types``
+    writes numbers, booleans and nulls instead of strings, ``columns`` keeps
+    only the given columns in that order and ``rename`` (``old=new,...``)
+    renames them.
+    """
+    extension = ".ndjson" if output_format == "ndjson" else ".json"
+    json_file_path = output_path or os.path.splitext(file_path)[0] + extension
+    stats = converting.convert_file(file_path, json_file_path, output_format, infer_types, columns, rename, compact,
+                                    delimiter, encoding, workers)
+    label = "NDJSON" if output_format == "ndjson" else "JSON"
+    return OperationResult("convert_csv_to_json", file_path, [json_file_path],
+                           {key: stats[key] for key in ("rows", "columns", "types", "fallbacks", "workers",
+                                                         "mb_per_s")},
+                           f"CSV converted to {label} successfully: {json_file_path} ({stats['rows']} rows, "
+                           f"{stats['mb_per_s']:.1f} MB/s)")
+
+def filter_csv(file_path: str, column_name: str, value: str) -> OperationResult:
+    """Filter rows in a CSV file where a column equals a value."""
+    with open(file_path, 'r', encoding='utf-8') as csv_file:
+        reader = csv.DictReader(csv_file)
+        filtered_rows = [row for row in reader if row.get(column_name) == value]
+    return OperationResult("filter_csv", file_path, data={"rows": filtered_rows},
+                           message="\n".join(str(row) for row in filtered_rows))
 
 def handle_csv(file_path):
     """Handle CSV file operations."""
@@ -69,14 +67,35 @@ def handle_csv(file_path):
     print("5. Filter CSV")
     choice = input("Select option: ")
     if choice == "1":
-        read_csv(file_path)
+        try:
+            print(read_csv(file_path).message)
+        except Exception as e:
+            print(f"Error reading CSV file: {e}")
     elif choice == "2":
-        write_csv(file_path)
+        try:
+            data = input("Enter data to write to CSV (comma-separated): ")
+            print(write_csv(file_path, data.split(',')).message)
+        except Exception as e:
+            print(f"Error writing to CSV file: {e}")
     elif choice == "3":
-        append_to_csv(file_path)
+        try:
+            data = input("Enter data to append to CSV (comma-separated): ")
+            print(append_to_csv(file_path, data.split(',')).message)
+        except Exception as e:
+            print(f"Error appending to CSV file: {e}")
     elif choice == "4":
-        convert_csv_to_json(file_path) 
+        try:
+            output_format = input("Output format (json/ndjson) [json]: ").strip().lower() or "json"
+            infer_types = input("Infer number, boolean and null types? (y/n): ").strip().lower() == "y"
+            print(convert_csv_to_json(file_path, output_format=output_format, infer_types=infer_types).message)
+        except Exception as e:
+            print(f"Error converting CSV to JSON: {e}")
     elif choice == "5":
-        filter_csv(file_path)
+        try:
+            condition = input("Enter a condition to filter rows (e.g., column_name=value): ")
+            column_name, value = condition.split('=')
+            print(filter_csv(file_path, column_name, value).message)
+        except Exception as e:
+            print(f"Error filtering CSV file: {e}")
     else:
         print("Invalid option selected.")
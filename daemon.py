@@ -0,0 +1,300 @@
+import collections
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cache
+import registry
+
+def default_socket_path():
+    """Return the Unix socket path used when none is given."""
+    return os.environ.get("UFT_SOCKET") or f"/tmp/uft-{os.getuid()}.sock"
+
+def preload_modules(module_names):
+    """Import handler modules once per worker so jobs never pay the import cost."""
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Warning: could not preload {module_name}: {e}")
+
+def run_request(operation, args, params, cache_options=None):
+    """Run one job inside a warm worker process, through the result cache if enabled."""
+    start = time.perf_counter()
+    try:
+        if cache_options and len(args) == 1 and operation in cache.CACHEABLE_OPERATIONS:
+            result, hit = cache.get_cache(*cache_options).run(operation, args[0], params)
+        else:
+            result, hit = registry.call_operation(operation, *args, **params), False
+        response = {"ok": True, "cached": hit, "result": result.to_dict()}
+    except Exception as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    response["run_ms"] = (time.perf_counter() - start) * 1000
+    response["worker_pid"] = os.getpid()
+    return response
+
+class JobStats:
+    """Thread-safe counters and a window of recent job latencies."""
+
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.latencies = collections.deque(maxlen=window)
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0
+        self.started = time.time()
+
+    def job_started(self):
+        with self.lock:
+            self.pending += 1
+
+    def job_finished(self, latency_ms, ok):
+        with self.lock:
+            self.pending -= 1
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+            self.latencies.append(latency_ms)
+
+    def snapshot(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": self.pending,
+                "uptime_s": round(time.time() - self.started, 1),
+            }
+        if latencies:
+            stats["latency_ms"] = {
+                "mean": round(sum(latencies) / len(latencies), 2),
+                "p50": round(latencies[len(latencies) // 2], 2),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+                "max": round(latencies[-1], 2),
+            }
+        return stats
+
+class JobHandler(socketserver.StreamRequestHandler):
+    """Reads newline-delimited JSON jobs and answers each one as soon as it finishes.
+
+    Jobs on one connection are pipelined: every request is handed to the worker
+    pool immediately and responses carry the request ``id`` so clients can match
+    them up in whatever order they complete.
+    """
+
+    def handle(self):
+        write_lock = threading.Lock()
+        in_flight = []
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                # There is no id to echo, so say so explicitly for the client.
+                self.send({"id": None, "ok": False, "error": f"Invalid request: {e}"}, write_lock)
+                continue
+
+            command = request.get("command", "run")
+            if command == "ping":
+                self.send({"id": request.get("id"), "ok": True, "pid": os.getpid()}, write_lock)
+            elif command == "stats":
+                stats = self.server.stats.snapshot()
+                stats["workers"] = self.server.workers
+                self.send({"id": request.get("id"), "ok": True, "stats": stats}, write_lock)
+            elif command == "shutdown":
+                self.send({"id": request.get("id"), "ok": True}, write_lock)
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            elif command == "run":
+                in_flight.append(self.submit(request, write_lock))
+            else:
+                self.send({"id": request.get("id"), "ok": False, "error": f"Unknown command: {command}"}, write_lock)
+
+        for finished in in_flight:
+            finished.wait()
+
+    def submit(self, request, write_lock):
+        server = self.server
+        received = time.perf_counter()
+        finished = threading.Event()
+        server.slots.acquire()
+        server.stats.job_started()
+        cache_options = server.cache_options if request.get("cache", True) else None
+        future = server.executor.submit(
+            run_request, request.get("operation", ""), request.get("args", []), request.get("params", {}),
+            cache_options,
+        )
+
+        def done(future):
+            server.slots.release()
+            try:
+                response = future.result()
+            except Exception as e:
+                response = {"ok": False, "error": f"Worker failed: {e}"}
+            latency_ms = (time.perf_counter() - received) * 1000
+            response["id"] = request.get("id")
+            response["latency_ms"] = round(latency_ms, 3)
+            server.stats.job_finished(latency_ms, response["ok"])
+            self.send(response, write_lock)
+            finished.set()
+
+        future.add_done_callback(done)
+        return finished
+
+    def send(self, response, write_lock):
+        data = (json.dumps(response) + "\n").encode("utf-8")
+        with write_lock:
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except OSError:
+                pass  # The client went away; the job result is simply dropped.
+
+class JobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(socket_path=None, workers=None, max_pending=None, preload=None, cache_options=None):
+    """Run the job daemon until it is told to shut down."""
+    socket_path = socket_path or default_socket_path()
+    workers = workers or os.cpu_count() or 1
+    module_names = preload or sorted(registry.MODULE_OPERATIONS)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    preload_modules(module_names)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=preload_modules, initargs=(module_names,))
+    # Warm every worker up front so the first jobs do not pay for process start-up.
+    for future in [executor.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+
+    old_umask = os.umask(0o077)
+    try:
+        server = JobServer(socket_path, JobHandler)
+    finally:
+        os.umask(old_umask)
+    server.executor = executor
+    server.workers = workers
+    server.slots = threading.BoundedSemaphore(max_pending or workers * 4)
+    server.stats = JobStats()
+    server.cache_options = cache_options
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"UFT daemon listening on {socket_path} with {workers} workers (pid {os.getpid()}).")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        executor.shutdown(wait=True)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("UFT daemon stopped.")
+
+def send_requests(requests, socket_path=None):
+    """Send requests to the daemon and yield the responses as they arrive."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path or default_socket_path())
+
+        def write_requests():
+            # Written from a separate thread so a long job list cannot deadlock
+            # against responses filling up the socket buffer.
+            with client.makefile("wb") as writer:
+                for request in requests:
+                    writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            client.shutdown(socket.SHUT_WR)
+
+        writer_thread = threading.Thread(target=write_requests, daemon=True)
+        writer_thread.start()
+        with client.makefile("rb") as reader:
+            for line in reader:
+                yield json.loads(line)
+        writer_thread.join()
+
+def run_serve(args):
+    cache_options = None
+    if not args.no_cache:
+        cache_options = (args.cache_dir or cache.default_cache_dir(), cache.parse_size(args.cache_size))
+    serve(args.socket, args.workers, args.max_pending, args.preload, cache_options)
+    return 0
+
+def run_submit(args):
+    """Submit jobs to a running daemon and print their results."""
+    from batch import collect_files, parse_params
+
+    try:
+        if args.command in ("ping", "stats", "shutdown"):
+            for response in send_requests([{"id": 0, "command": args.command}], args.socket):
+                print(json.dumps(response, indent=4))
+            return 0
+
+        if not args.op:
+            print("Error: --op is required when submitting jobs.")
+            return 1
+        params = parse_params(args.param)
+        files = collect_files(args.inputs, args.file_list, args.recursive)
+        requests = [
+            {"id": i, "operation": args.op, "args": [file_path], "params": params, "cache": not args.no_cache}
+            for i, file_path in enumerate(files)
+        ]
+        if not requests:
+            print("No files to process.")
+            return 1
+
+        failed = 0
+        start = time.perf_counter()
+        files_by_id = dict(enumerate(files))
+        for response in send_requests(requests, args.socket):
+            file_path = files_by_id.get(response.get("id"))
+            if file_path is None:
+                # A response we cannot match to a job, e.g. a rejected request.
+                response = dict(response, ok=False)
+            if args.json:
+                print(json.dumps(dict(response, file=file_path)))
+                failed += not response["ok"]
+                continue
+            status = "OK" if response["ok"] else "FAILED"
+            cached = ", cached" if response.get("cached") else ""
+            label = file_path if file_path is not None else "<unknown job>"
+            print(f"[{status}] {label} ({response.get('latency_ms', 0):.1f} ms, ran {response.get('run_ms', 0):.1f} ms{cached})")
+            message = response["result"]["message"] if response["ok"] else f"Error: {response.get('error', 'no matching job')}"
+            for line in message.splitlines():
+                print(f"    {line}")
+            failed += not response["ok"]
+        elapsed = time.perf_counter() - start
+        if not args.json:
+            print(f"Submitted {len(requests)} jobs in {elapsed:.2f}s: {len(requests) - failed} succeeded, {failed} failed.")
+        return 0 if failed == 0 else 1
+    except OSError as e:
+        print(f"Error talking to the UFT daemon: {e}")
+        return 1
+
+def add_serve_arguments(parser):
+    """Register the serve subcommand options on an argument parser."""
+    parser.add_argument("--socket", help="Unix socket path (default: $UFT_SOCKET or /tmp/uft-<uid>.sock)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of warm worker processes")
+    parser.add_argument("--max-pending", type=int, help="Maximum jobs queued or running at once (default: 4 per worker)")
+    parser.add_argument("--preload", action="append", help="Handler module to preload (repeatable, default: all)")
+    cache.add_cache_arguments(parser)
+
+def add_submit_arguments(parser):
+    """Register the submit subcommand options on an argument parser."""
+    parser.add_argument("inputs", nargs="*", help="Files, directories or glob patterns to process")
+    parser.add_argument("--socket", help="Unix socket path (default: $UFT_SOCKET or /tmp/uft-<uid>.sock)")
+    parser.add_argument("--op", help="Operation to run, e.g. resize_image or count_lines")
+    parser.add_argument("--param", action="append", metavar="KEY=VALUE", help="Operation parameter (repeatable)")
+    parser.add_argument("--file-list", help="File containing one input path per line")
+    parser.add_argument("--recursive", action="store_true", help="Descend into subdirectories")
+    parser.add_argument("--command", choices=["run", "ping", "stats", "shutdown"], default="run",
+                        help="Daemon command to send (default: run jobs)")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON responses, one per line")
+    parser.add_argument("--no-cache", action="store_true", help="Ask the daemon to recompute instead of using its cache")
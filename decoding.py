@@ -0,0 +1,200 @@
+"""Encoding detection and a shared reader layer for text files.
+
+The text engines read raw bytes: counting, splitting and deduplicating only
+look for ASCII newlines and whitespace, and the engines that need characters
+decode UTF-8 themselves. This module finds out what a file actually contains
+and hands each engine bytes it can use.
+
+A file's encoding comes from its byte order mark, or else from a sample of
+its first bytes: zero bytes in every other position mean UTF-16 without a
+BOM, a sample that decodes as UTF-8 means UTF-8, and anything else is read
+as Windows-1252 (or Latin-1 if it has bytes Windows-1252 leaves undefined).
+
+Files whose bytes an engine can use as they are (UTF-8, or any ASCII-compatible
+encoding for engines that only look at ASCII bytes) are never decoded or
+copied. Anything else, such as UTF-16 logs, Latin-1 text to convert the case of,
+or a file that starts with a BOM, is decoded incrementally block by block
+into a temporary UTF-8 copy. The engine's output is then encoded back into the
+file's encoding, with its BOM restored.
+"""
+import codecs
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import transforming
+
+SAMPLE_SIZE = 64 * 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+# Undecodable bytes survive the round trip through UTF-8 unchanged.
+ERRORS = "surrogateescape"
+BOMS = (
+    # UTF-32 LE is checked first: its BOM starts with the UTF-16 LE one.
+    (codecs.BOM_UTF32_LE, "utf-32-le"),
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# A sample without a BOM is taken for UTF-16 if at least this share of its odd
+# (or even) bytes are zero, and almost none of the others.
+UTF16_ZERO_SHARE = 0.3
+ASCII = "".join(map(chr, range(128)))
+
+def detect_encoding(file_path, sample_size=SAMPLE_SIZE):
+    """Return ``(encoding, BOM length)`` for a file, from its byte order mark or a sample of its first bytes."""
+    with open(file_path, "rb") as file:
+        sample = file.read(sample_size)
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+    pairs = len(sample) // 2
+    if pairs >= 2:
+        even_zeros, odd_zeros = sample[0:pairs * 2:2].count(0), sample[1:pairs * 2:2].count(0)
+        if odd_zeros >= UTF16_ZERO_SHARE * pairs and even_zeros * 10 <= odd_zeros:
+            return "utf-16-le", 0
+        if even_zeros >= UTF16_ZERO_SHARE * pairs and odd_zeros * 10 <= even_zeros:
+            return "utf-16-be", 0
+    try:
+        # A sample cut in the middle of a character is still UTF-8.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=len(sample) < sample_size)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode("cp1252")
+        return "cp1252", 0
+    except UnicodeDecodeError:
+        return "latin-1", 0
+
+def resolve_encoding(file_path, encoding=None):
+    """Return ``(encoding, BOM length)``: detected, or ``encoding`` if given (with the file's BOM skipped if it matches)."""
+    detected, bom = detect_encoding(file_path)
+    if encoding is None:
+        return detected, bom
+    name = codecs.lookup(encoding).name
+    # "utf-16" or "utf-8-sig" mean "with a BOM"; the BOM tells which byte order.
+    if bom and detected.startswith(name.replace("-sig", "")):
+        return detected, bom
+    return name, 0
+
+def is_utf8(encoding):
+    return codecs.lookup(encoding).name == "utf-8"
+
+def ascii_compatible(encoding):
+    """Whether ASCII characters are stored as their ASCII bytes, so newlines and spaces can be found in raw bytes."""
+    try:
+        return ASCII.encode(encoding) == ASCII.encode("ascii")
+    except UnicodeEncodeError:
+        return False
+
+def single_byte(encoding):
+    """Whether every character is one byte, so a file has as many characters as bytes."""
+    name = codecs.lookup(encoding).name
+    return not name.startswith("utf") and len(bytes(range(256)).decode(name, "replace")) == 256
+
+def iter_text(file_path, encoding, skip=0, errors=ERRORS, block_size=BLOCK_SIZE, opener=open):
+    """Yield the text of a file from byte ``skip`` in decoded blocks; characters split between reads are kept whole."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors)
+    with opener(file_path, "rb") as file:
+        file.seek(skip)
+        while True:
+            block = file.read(block_size)
+            text = decoder.decode(block, final=not block)
+            if text:
+                yield text
+            if not block:
+                break
+
+def open_text(file_path, encoding=None, errors=ERRORS):
+    """Open a file for reading text in its detected encoding (or ``encoding``), without its BOM."""
+    encoding, bom = resolve_encoding(file_path, encoding)
+    raw = open(file_path, "rb")
+    raw.seek(bom)
+    return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+
+def count_characters(file_path, encoding, skip=0):
+    return sum(len(text) for text in iter_text(file_path, encoding, skip))
+
+def transcode(source_path, output, source_encoding, target_encoding, skip=0, opener=open):
+    """Write a file's text from byte ``skip``, re-encoded, to an open binary file."""
+    encoder = codecs.getincrementalencoder(target_encoding)(ERRORS)
+    for text in iter_text(source_path, source_encoding, skip, opener=opener):
+        output.write(encoder.encode(text))
+    output.write(encoder.encode("", final=True))
+
+class TextSource:
+    """A text file's content as UTF-8 bytes, for the engines that read raw bytes.
+
+    Used as a context manager. ``path`` is the file itself if an engine can
+    read its bytes as they are, or else a temporary UTF-8 copy. With ``raw`` the
+    engine only looks at ASCII newlines and whitespace, so any ASCII-compatible
+    encoding is used as is. A file with a BOM is always copied, so the BOM does
+    not end up inside the first line.
+    Engines write their output to ``output(target)`` and ``finish(target)``
+    encodes it back into the file's encoding.
+    """
+
+    def __init__(self, file_path, encoding=None, raw=False):
+        self.file_path = file_path
+        self.encoding, self.bom = resolve_encoding(file_path, encoding)
+        usable = ascii_compatible(self.encoding) if raw else is_utf8(self.encoding)
+        self.transcoded = bool(self.bom) or not usable
+        self.path = file_path
+        self.temp_dir = None
+
+    def __enter__(self):
+        if self.transcoded:
+            self.temp_dir = tempfile.mkdtemp(prefix=".uft-text-",
+                                             dir=os.path.dirname(os.path.abspath(self.file_path)))
+            os.mkdir(os.path.join(self.temp_dir, "out"))
+            # The copy keeps the file name, so names derived from it do not change.
+            self.path = os.path.join(self.temp_dir, os.path.basename(self.file_path))
+            with open(self.path, "wb") as copy:
+                transcode(self.file_path, copy, self.encoding, "utf-8", self.bom)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @property
+    def output_encoding(self):
+        """The encoding of the text engines write: the file's own unless it was copied to UTF-8."""
+        return "utf-8" if self.transcoded else self.encoding
+
+    def output_dir(self, directory):
+        """The directory engines should write into for outputs meant for ``directory``."""
+        return os.path.join(self.temp_dir, "out") if self.transcoded else directory
+
+    def output(self, target):
+        """The path engines should write to for an output meant for ``target``."""
+        return os.path.join(self.output_dir(None), os.path.basename(target)) if self.transcoded else target
+
+    def finish(self, target, compressed=False):
+        """Encode the output written for ``target`` back into the file's encoding (and BOM) and move it into place.
+
+        Output the file's encoding cannot represent (such as replacement text in
+        another script) is written as UTF-8 instead. Returns the encoding written.
+        """
+        if not self.transcoded:
+            return self.encoding
+        bom = next(mark for mark, encoding in BOMS if encoding == self.encoding) if self.bom else b""
+        output_path = self.output(target)
+
+        def writer(encoding, mark):
+            def write(temp_file):
+                output = gzip.GzipFile(fileobj=temp_file, mode="wb") if compressed else temp_file
+                output.write(mark)
+                transcode(output_path, output, "utf-8", encoding, opener=gzip.open if compressed else open)
+                if compressed:
+                    output.close()
+            return write
+
+        try:
+            transforming.write_atomically(self.file_path, target, writer(self.encoding, bom))
+            return self.encoding
+        except UnicodeEncodeError:
+            transforming.write_atomically(self.file_path, target, writer("utf-8", b""))
+            return "utf-8"
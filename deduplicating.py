@@ -0,0 +1,210 @@
+"""Order-preserving removal of duplicate lines from files of any size.
+
+Lines are streamed as raw bytes and only a fixed-size 128-bit digest of each
+distinct line is kept, so the first occurrence of every line is written in
+its original position without holding the text in memory.
+
+Once the digests exceed the memory threshold, the rest of the file is
+deduplicated with disk partitions: each line's digest and line number are
+appended to one of several partition files chosen by the digest, every
+partition is then checked on its own for repeats, and a final pass copies the
+remaining lines while skipping the line numbers found to be duplicates.
+
+The approximate mode keeps a Bloom filter of a few bytes per line instead.
+It never keeps a duplicate, but may drop a unique line with the configured
+false-positive probability.
+"""
+import hashlib
+import heapq
+import math
+import os
+import shutil
+import struct
+import tempfile
+import time
+from array import array
+
+DIGEST_SIZE = 16
+# A digest in a set: the bytes object (rounded up by the allocator) plus its share of the
+# hash table, which is kept at most 60% full and doubles as it grows.
+ENTRY_BYTES = 120
+RECORD = struct.Struct(f"{DIGEST_SIZE}sq")
+# Line number recorded for digests of lines written before switching to partitions.
+ALREADY_WRITTEN = -1
+MIN_PARTITIONS = 16
+MAX_PARTITIONS = 256
+BUFFER_SIZE = 1024 * 1024
+
+def digest(line):
+    return hashlib.blake2b(line, digest_size=DIGEST_SIZE).digest()
+
+class BloomFilter:
+    """A blocked Bloom filter sized for ``capacity`` items at the given false-positive rate.
+
+    All bits of an item fall in one 64-bit word, so adding and testing it is a
+    single word operation instead of one memory access per hash function.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        # Blocking raises the false-positive rate well above the classic formula; measured
+        # rates stay below the target with 2.5 times its bits and at most 6 bits per item.
+        size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2 * 2.5))
+        self.hashes = min(6, max(1, round(size / capacity * math.log(2))))
+        self.words = array("Q", bytes((size + 63) // 64 * 8))
+        self.shifts = range(0, 6 * self.hashes, 6)
+
+    def add(self, line_digest):
+        """Add a digest; returns True if it was (probably) present already."""
+        word = int.from_bytes(line_digest[:8], "little") % len(self.words)
+        bits = int.from_bytes(line_digest[8:], "little")
+        mask = 0
+        for shift in self.shifts:
+            mask |= 1 << (bits >> shift & 63)
+        current = self.words[word]
+        if current & mask == mask:
+            return True
+        self.words[word] = current | mask
+        return False
+
+class Deduplicator:
+    """Streams lines to ``writer``, dropping every line seen before."""
+
+    def __init__(self, memory, approximate=False, capacity=0, error_rate=0.001, temp_dir=None):
+        self.memory = memory
+        self.temp_dir = temp_dir
+        self.seen = set()
+        self.bloom = BloomFilter(capacity, error_rate) if approximate else None
+        self.stats = {"lines": 0, "duplicates_removed": 0, "mode": "bloom" if approximate else "memory",
+                      "partitions": 0, "spilled_bytes": 0,
+                      "memory_bytes": self.bloom.words.itemsize * len(self.bloom.words) if approximate else 0}
+
+    def run(self, reader, writer):
+        bloom, seen = self.bloom, self.seen
+        limit = self.memory // ENTRY_BYTES
+        number = -1
+        for number, line in enumerate(reader):
+            line_digest = digest(line if line[-1:] == b"\n" else line + b"\n")
+            if bloom is not None:
+                duplicate = bloom.add(line_digest)
+            else:
+                duplicate = line_digest in seen
+                if not duplicate:
+                    seen.add(line_digest)
+                    if len(seen) > limit:
+                        writer.write(line)
+                        self.partitioned(reader, writer, number + 1)
+                        return self.stats
+            if duplicate:
+                self.stats["duplicates_removed"] += 1
+            else:
+                writer.write(line)
+        self.stats["lines"] = number + 1
+        if bloom is None:
+            self.stats["memory_bytes"] = len(seen) * ENTRY_BYTES
+        return self.stats
+
+    def partitioned(self, reader, writer, first_number):
+        """Deduplicate the rest of ``reader`` (from line ``first_number``) with disk partitions."""
+        self.stats["mode"] = "partitioned"
+        self.stats["memory_bytes"] = len(self.seen) * ENTRY_BYTES
+        resume = reader.tell()
+        remaining = os.fstat(reader.fileno()).st_size - resume
+        average = max(resume / first_number, 1.0)
+        # Enough partitions for each to fit in the memory threshold, counting the digests seen so far.
+        needed = (len(self.seen) + remaining / average) * ENTRY_BYTES / self.memory
+        count = min(MAX_PARTITIONS, max(MIN_PARTITIONS, math.ceil(needed * 2)))
+        self.stats["partitions"] = count
+        spill_dir = tempfile.mkdtemp(prefix="uft-dedup-", dir=self.temp_dir)
+        try:
+            paths = [os.path.join(spill_dir, f"part-{index}") for index in range(count)]
+            partitions = [open(path, "wb", buffering=BUFFER_SIZE // 4) for path in paths]
+            for line_digest in self.seen:
+                partitions[line_digest[0] % count].write(RECORD.pack(line_digest, ALREADY_WRITTEN))
+            self.seen = set()
+            number = first_number - 1
+            for number, line in enumerate(reader, first_number):
+                line_digest = digest(line if line[-1:] == b"\n" else line + b"\n")
+                partitions[line_digest[0] % count].write(RECORD.pack(line_digest, number))
+            self.stats["lines"] = number + 1
+            for partition in partitions:
+                partition.close()
+            self.stats["spilled_bytes"] = sum(os.path.getsize(path) for path in paths)
+
+            drop_paths = []
+            for path in paths:
+                seen = set()
+                drops = array("q")
+                with open(path, "rb") as partition:
+                    # Records are in line order, so the first record of a digest is its first occurrence.
+                    for line_digest, number in RECORD.iter_unpack(partition.read()):
+                        if line_digest in seen:
+                            drops.append(number)
+                        else:
+                            seen.add(line_digest)
+                self.stats["memory_bytes"] = max(self.stats["memory_bytes"], len(seen) * ENTRY_BYTES)
+                os.unlink(path)
+                drop_paths.append(f"{path}.drops")
+                with open(drop_paths[-1], "wb") as drop_file:
+                    drops.tofile(drop_file)
+                self.stats["duplicates_removed"] += len(drops)
+
+            reader.seek(resume)
+            drop_files = [open(path, "rb", buffering=BUFFER_SIZE // 4) for path in drop_paths]
+            try:
+                drops = heapq.merge(*(read_numbers(drop_file) for drop_file in drop_files))
+                next_drop = next(drops, None)
+                for number, line in enumerate(reader, first_number):
+                    if number == next_drop:
+                        next_drop = next(drops, None)
+                    else:
+                        writer.write(line)
+            finally:
+                for drop_file in drop_files:
+                    drop_file.close()
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+def read_numbers(file):
+    while True:
+        numbers = array("q")
+        numbers.frombytes(file.read(BUFFER_SIZE // 8 * numbers.itemsize))
+        if not numbers:
+            return
+        yield from numbers
+
+def deduplicate_file(file_path, output_path=None, memory=256 * 1024 * 1024, approximate=False,
+                     error_rate=0.001, temp_dir=None):
+    """Remove repeated lines from a file, keeping first occurrences in order.
+
+    The result is written to a temporary file that atomically replaces
+    ``output_path`` (default: the input). Returns statistics: lines read,
+    duplicates removed, mode, partitions, bytes spilled, memory used for
+    digests, seconds and MB/s.
+    """
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_path)
+    target = output_path or file_path
+    capacity = 0
+    if approximate:
+        # Size the filter from the average line length of the start of the file.
+        with open(file_path, "rb") as sample_file:
+            sample = sample_file.read(BUFFER_SIZE)
+        capacity = int(size / max(len(sample) / max(sample.count(b"\n"), 1), 1)) + 1
+    deduplicator = Deduplicator(memory, approximate, capacity, error_rate, temp_dir)
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", dir=os.path.dirname(os.path.abspath(target)))
+    try:
+        with open(file_path, "rb", buffering=BUFFER_SIZE) as reader, open(handle, "wb", buffering=BUFFER_SIZE) as writer:
+            stats = deduplicator.run(reader, writer)
+            writer.flush()
+            os.fsync(writer.fileno())
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    elapsed = time.perf_counter() - start_time
+    stats["seconds"] = elapsed
+    stats["mb_per_s"] = size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return stats
@@ -0,0 +1,205 @@
+"""Chunked, authenticated streaming encryption with AES-256-GCM.
+
+An encrypted file is a small header followed by fixed-size chunks:
+
+    header   magic, chunk size, plaintext size, random 8-byte nonce prefix
+    chunk i  AES-GCM ciphertext of plaintext bytes [i * chunk, (i + 1) * chunk),
+             followed by its 16-byte authentication tag
+
+Chunk i is encrypted with the nonce ``prefix + i`` and authenticates the
+header, its own index and whether it is the last chunk, so reordered,
+truncated, extended or otherwise modified files fail to decrypt. An empty
+file still has one (empty) chunk.
+
+Every chunk sits at a fixed offset in both files, so workers encrypt or
+decrypt disjoint runs of chunks and write them straight into the output
+with ``os.pwrite``; memory use is about one chunk per worker regardless of
+file size, and a byte range can be decrypted by reading only the chunks
+that cover it.
+"""
+import base64
+import os
+import shutil
+import struct
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+MAGIC = b"UFTGCM01"
+HEADER = struct.Struct("<8sIQ8s")
+TAG_SIZE = 16
+KEY_SIZE = 32
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Files smaller than this are processed in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MIN_RANGE_SIZE = 32 * 1024 * 1024
+# The chunk index fills the last four bytes of the 12-byte nonce.
+MAX_CHUNKS = 2 ** 32
+
+def generate_key():
+    """A new random key, URL-safe base64 encoded."""
+    return base64.urlsafe_b64encode(os.urandom(KEY_SIZE)).decode()
+
+def decode_key(key):
+    raw = base64.urlsafe_b64decode(key.encode() if isinstance(key, str) else key)
+    if len(raw) != KEY_SIZE:
+        raise ValueError(f"The key must be {KEY_SIZE} bytes, URL-safe base64 encoded.")
+    return raw
+
+def read_header(file_path):
+    """Return ``(header bytes, chunk size, plaintext size, nonce prefix)``, or None if the file is not a container."""
+    with open(file_path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    magic, chunk_size, plaintext_size, prefix = HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    return header, chunk_size, plaintext_size, prefix
+
+def is_container(file_path):
+    return read_header(file_path) is not None
+
+def chunk_count(plaintext_size, chunk_size):
+    return max(1, -(-plaintext_size // chunk_size))
+
+def encrypted_size(plaintext_size, chunk_size):
+    return HEADER.size + plaintext_size + chunk_count(plaintext_size, chunk_size) * TAG_SIZE
+
+def nonce(prefix, index):
+    return prefix + index.to_bytes(4, "big")
+
+def associated_data(header, index, count):
+    return header + struct.pack(">IB", index, index == count - 1)
+
+def pwrite_all(fd, data, offset):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+def encrypt_chunks(first, last, file_path, output_path, key, header):
+    """Encrypt chunks ``[first, last)`` of a file into their places in the container."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    _, chunk_size, plaintext_size, prefix = HEADER.unpack(header)
+    count = chunk_count(plaintext_size, chunk_size)
+    cipher = AESGCM(key)
+    with open(file_path, "rb") as source, open(output_path, "r+b") as output:
+        for index in range(first, last):
+            data = os.pread(source.fileno(), chunk_size, index * chunk_size)
+            sealed = cipher.encrypt(nonce(prefix, index), data, associated_data(header, index, count))
+            pwrite_all(output.fileno(), sealed, HEADER.size + index * (chunk_size + TAG_SIZE))
+
+def decrypt_chunks(first, last, file_path, output_path, key, header, start, end):
+    """Decrypt chunks ``[first, last)``, writing the plaintext bytes in ``[start, end)`` to the output.
+
+    Plaintext byte ``offset`` goes to output byte ``offset - start``.
+    """
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    _, chunk_size, plaintext_size, prefix = HEADER.unpack(header)
+    count = chunk_count(plaintext_size, chunk_size)
+    cipher = AESGCM(key)
+    with open(file_path, "rb") as source, open(output_path, "r+b") as output:
+        for index in range(first, last):
+            chunk_start = index * chunk_size
+            length = min(chunk_size, plaintext_size - chunk_start) + TAG_SIZE
+            sealed = os.pread(source.fileno(), length, HEADER.size + index * (chunk_size + TAG_SIZE))
+            try:
+                data = cipher.decrypt(nonce(prefix, index), sealed, associated_data(header, index, count))
+            except InvalidTag:
+                raise ValueError(f"Chunk {index} failed authentication: wrong key or corrupted file.") from None
+            low, high = max(start, chunk_start), min(end, chunk_start + len(data))
+            pwrite_all(output.fileno(), memoryview(data)[low - chunk_start:high - chunk_start], low - start)
+
+def chunk_ranges(first, last, parts):
+    step = -(-(last - first) // parts)
+    return [(index, min(index + step, last)) for index in range(first, last, step)]
+
+def run_chunks(function, first, last, nbytes, workers, *args):
+    """Run ``function(first, last, *args)`` over a chunk range, split across worker processes for large inputs.
+
+    Returns the number of parts the range was split into.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = max(1, min(workers, nbytes // MIN_RANGE_SIZE, last - first)) if nbytes >= PARALLEL_THRESHOLD else 1
+    if parts == 1:
+        function(first, last, *args)
+        return 1
+    ranges = chunk_ranges(first, last, parts)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(function, low, high, *args) for low, high in ranges]
+        for future in futures:
+            future.result()
+    return len(ranges)
+
+def write_atomically(source_path, output_path, size, fill):
+    """Create a file of ``size`` bytes, let ``fill(temp_path)`` write its content, then move it into place.
+
+    The output gets the permissions of ``source_path``.
+    """
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(output_path)}.",
+                                         dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        os.ftruncate(handle, size)
+        os.close(handle)
+        result = fill(temp_path)
+        with open(temp_path, "rb") as temp_file:
+            os.fsync(temp_file.fileno())
+        shutil.copymode(source_path, temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return result
+
+def encrypt_file(file_path, output_path, key=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """Encrypt a file into a chunked AES-GCM container; a new key is generated unless one is given.
+
+    Returns statistics including the (base64) key.
+    """
+    start_time = time.perf_counter()
+    key = key or generate_key()
+    raw_key = decode_key(key)
+    size = os.path.getsize(file_path)
+    count = chunk_count(size, chunk_size)
+    if count > MAX_CHUNKS:
+        raise ValueError(f"The file is too large for {chunk_size}-byte chunks; use a larger chunk size.")
+    header = HEADER.pack(MAGIC, chunk_size, size, os.urandom(8))
+
+    def fill(temp_path):
+        with open(temp_path, "r+b") as output:
+            output.write(header)
+        return run_chunks(encrypt_chunks, 0, count, size, workers, file_path, temp_path, raw_key, header)
+
+    parts = write_atomically(file_path, output_path, encrypted_size(size, chunk_size), fill)
+    elapsed = time.perf_counter() - start_time
+    return {"key": key, "chunks": count, "chunk_size": chunk_size, "workers": parts, "bytes": size,
+            "seconds": elapsed, "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
+
+def decrypt_file(file_path, output_path, key, offset=0, length=None, workers=None):
+    """Decrypt a container, or only ``length`` plaintext bytes from ``offset``, reading just the chunks needed.
+
+    Raises ValueError if the key is wrong or the file was modified or truncated.
+    """
+    start_time = time.perf_counter()
+    parsed = read_header(file_path)
+    if parsed is None:
+        raise ValueError(f"{file_path} is not a chunked AES-GCM file.")
+    header, chunk_size, plaintext_size, _ = parsed
+    if chunk_size < 1 or os.path.getsize(file_path) != encrypted_size(plaintext_size, chunk_size):
+        raise ValueError(f"{file_path} is truncated or corrupted.")
+    start = min(max(offset, 0), plaintext_size)
+    end = plaintext_size if length is None else min(plaintext_size, start + max(length, 0))
+    # An empty file still has its one chunk authenticated.
+    first, last = (start // chunk_size, -(-end // chunk_size)) if plaintext_size else (0, 1)
+    raw_key = decode_key(key)
+    parts = write_atomically(file_path, output_path, end - start, lambda temp_path: run_chunks(
+        decrypt_chunks, first, last, end - start, workers, file_path, temp_path, raw_key, header, start, end))
+    elapsed = time.perf_counter() - start_time
+    return {"bytes": end - start, "offset": start, "chunks": last - first, "workers": parts, "seconds": elapsed,
+            "mb_per_s": (end - start) / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
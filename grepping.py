@@ -0,0 +1,347 @@
+"""Multi-keyword line extraction for large files.
+
+Keywords are compiled into one regular expression shaped like a trie of the
+keywords (common prefixes are shared and longer keywords are tried first), so
+the regex engine walks all keywords at once from each position and skips
+positions that cannot start any keyword, much like an Aho-Corasick automaton.
+Matches are leftmost-longest and do not overlap: with keywords ``err`` and
+``error``, the text ``error`` counts once, for ``error``. In regex mode the
+patterns are found together like a find-and-replace table (see
+``replacing.PatternSet``), so each keeps its own group numbers and names.
+
+The file is scanned as raw bytes in line-aligned blocks, so memory use does
+not depend on its size. Large files are split into line-aligned ranges that
+are scanned on several cores; each worker also reads the context lines just
+outside its range so context is exact across range boundaries, and the
+parent joins the workers' outputs in order.
+"""
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import line_index
+import replacing
+import sorting
+
+BLOCK_SIZE = 4 * 1024 * 1024
+# Files smaller than this are scanned in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MIN_RANGE_SIZE = 32 * 1024 * 1024
+SEPARATOR = b"--\n"
+
+def load_keywords(path):
+    """Read keywords from a file, one per line (blank lines are ignored)."""
+    with open(path, "r", encoding="utf-8") as keyword_file:
+        return [line.rstrip("\r\n") for line in keyword_file if line.strip()]
+
+def trie_pattern(keywords):
+    """Return a regex source (bytes) matching any of ``keywords``, longest first, shaped as a trie."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for byte in keyword:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def build(node):
+        end = None in node
+        branches = [re.escape(bytes([byte])) + build(child) for byte, child in sorted(
+            (item for item in node.items() if item[0] is not None), key=lambda item: item[0])]
+        if not branches:
+            return b""
+        body = branches[0] if len(branches) == 1 else b"(?:" + b"|".join(branches) + b")"
+        if end:
+            return (b"(?:" + body + b")?") if len(branches) > 1 or len(body) > 1 else body + b"?"
+        return body
+
+    return build(trie)
+
+def case_pattern(keyword):
+    """Return a regex source (bytes) matching ``keyword`` in UTF-8 with its letters in any case.
+
+    ``re.IGNORECASE`` only folds ASCII letters in bytes patterns, so it is
+    left to handle those and every other letter becomes an alternation of its
+    case variants (``Ä`` and ``ä``).
+    """
+    parts = []
+    for char in keyword:
+        variants = {char}
+        while not char.isascii():
+            more = variants | {mapped for variant in variants
+                               for mapped in (variant.lower(), variant.upper(), variant.casefold()) if len(mapped) == 1}
+            if more == variants:
+                break
+            variants = more
+        alternatives = sorted(re.escape(variant.encode("utf-8")) for variant in variants)
+        parts.append(alternatives[0] if len(alternatives) == 1 else b"(?:" + b"|".join(alternatives) + b")")
+    return b"".join(parts)
+
+class Matcher:
+    """Finds the lines that match any of a set of keywords (or regexes) and counts hits per pattern.
+
+    Case-insensitive searches for ASCII keywords run on lowercased text (the
+    same length as the original), which is much faster than ``re.IGNORECASE``.
+    Keywords with other letters are matched through ``case_pattern``. In regex
+    mode, ignoring case only folds ASCII letters.
+    """
+
+    def __init__(self, patterns, regex=False, ignore_case=False):
+        patterns = [pattern for pattern in dict.fromkeys(patterns) if pattern]
+        if not patterns:
+            raise ValueError("No keywords to search for.")
+        self.patterns = patterns
+        self.regex = regex
+        ascii_only = all(pattern.isascii() for pattern in patterns)
+        self.fold = ignore_case and not regex and ascii_only
+        any_case = ignore_case and not regex and not ascii_only
+        encoded = [pattern.encode("utf-8") for pattern in patterns]
+        if self.fold:
+            encoded = [keyword.lower() for keyword in encoded]
+        self.literal = encoded[0] if not regex and not any_case and len(encoded) == 1 else None
+        # Indexes into ``patterns`` of the pattern set's patterns.
+        self.order = list(range(len(patterns)))
+        self.matches = None
+        if regex:
+            flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+            self.matches = replacing.PatternSet([replacing.compile_pattern(pattern, flags) for pattern in encoded])
+        elif any_case:
+            # Longest first, so that as in the trie the longest keyword at a position wins.
+            self.order.sort(key=lambda index: len(encoded[index]), reverse=True)
+            self.matches = replacing.PatternSet([re.compile(case_pattern(patterns[index]), re.IGNORECASE)
+                                                 for index in self.order])
+        else:
+            self.compiled = re.compile(trie_pattern(encoded))
+            self.lookup = {}
+            for keyword, pattern in zip(encoded, patterns):
+                self.lookup.setdefault(keyword, pattern)
+
+    def find(self, text, position):
+        """Return the offset of the first match in ``text`` at or after ``position``, or -1."""
+        if self.literal is not None:
+            return text.find(self.literal, position)
+        if self.matches is not None:
+            found = self.matches.search(text, position)
+            return found[1].start() if found else -1
+        match = self.compiled.search(text, position)
+        return match.start() if match else -1
+
+    def tally(self, text, counts):
+        """Add the hits in ``text`` to ``counts``, keyed by pattern."""
+        if self.literal is not None:
+            counts[self.patterns[0]] += text.count(self.literal)
+        elif self.matches is not None:
+            counts.update(self.patterns[self.order[index]] for index, _ in self.matches.finditer(text))
+        else:
+            for keyword, count in Counter(self.compiled.findall(text)).items():
+                counts[self.lookup[keyword]] += count
+
+def read_blocks(file, start, end):
+    """Yield blocks of bytes from ``[start, end)`` of an open file, each ending at a line end."""
+    file.seek(start)
+    position = start
+    pending = b""
+    while position < end:
+        block = file.read(min(BLOCK_SIZE, end - position))
+        if not block:
+            break
+        position += len(block)
+        block = pending + block
+        cut = block.rfind(b"\n") + 1
+        if cut == 0 and position < end:
+            pending = block
+            continue
+        pending = block[cut:]
+        if cut:
+            yield block[:cut]
+    if pending:
+        yield pending
+
+def lines_before(file, position, count):
+    """Return the offset of the start of the line ``count`` lines before ``position`` (a line start)."""
+    found = 0
+    cursor = position
+    while cursor > 0:
+        step = min(BLOCK_SIZE, cursor)
+        file.seek(cursor - step)
+        block = file.read(step)
+        # The newline that ends the line just before ``position`` does not start a line.
+        index = len(block) - 1 if cursor == position else len(block)
+        while True:
+            index = block.rfind(b"\n", 0, index)
+            if index < 0:
+                break
+            found += 1
+            if found > count:
+                return cursor - step + index + 1
+        cursor -= step
+    return 0
+
+def scan_range(file_path, start, end, matcher, before, after, line_numbers, first_number, output_path):
+    """Write the matching lines (with context) of ``[start, end)`` to ``output_path``.
+
+    Context lines outside the range are read but not written, so adjacent ranges
+    produce exactly the output of a single scan. Returns a summary dict.
+    """
+    counts = Counter()
+    matched_lines = 0
+    # Line indexes are counted from the start of the scan, which may begin before the range.
+    state = {"printed": -1, "emitted": None, "first_emitted": None, "own_first": math.inf, "own_end": math.inf}
+    plain = not before and not after and not line_numbers
+    tail = []
+
+    with open(file_path, "rb") as file, open(output_path, "wb") as output:
+        def emit(index, line):
+            if index <= state["printed"]:
+                return
+            state["printed"] = index
+            if not state["own_first"] <= index < state["own_end"]:
+                return
+            if (before or after) and state["emitted"] is not None and index > state["emitted"] + 1:
+                output.write(SEPARATOR)
+            if state["first_emitted"] is None:
+                state["first_emitted"] = index
+            state["emitted"] = index
+            if line_numbers:
+                output.write(b"%d:" % (first_number + index - state["own_first"] + 1))
+            output.write(line if line.endswith(b"\n") else line + b"\n")
+
+        def blocks():
+            if after and start:
+                # Matches just before the range add after-context lines to it.
+                for block in read_blocks(file, lines_before(file, start, after), start):
+                    yield block, False
+            yield from ((block, True) for block in read_blocks(file, start, end))
+            # Likewise, matches just after the range add before-context lines to it.
+            wanted = before
+            for block in read_blocks(file, end, os.fstat(file.fileno()).st_size) if before else ():
+                lines = block.split(b"\n", wanted)
+                if len(lines) <= wanted or (len(lines) == wanted + 1 and not lines[wanted]):
+                    yield block, False
+                    wanted -= block.count(b"\n")
+                    if wanted <= 0:
+                        break
+                    continue
+                yield b"\n".join(lines[:wanted]) + b"\n", False
+                break
+
+        first = 0
+        after_until = -1
+        for block, own in blocks():
+            if own and state["own_first"] == math.inf:
+                state["own_first"] = first
+            elif not own and state["own_first"] != math.inf and state["own_end"] == math.inf:
+                state["own_end"] = first
+            line_count = block.count(b"\n") + (0 if block.endswith(b"\n") else 1)
+            haystack = block.lower() if matcher.fold else block
+
+            # Find each matching line once; the rest of a line need not be searched.
+            spans = []
+            position = 0
+            while True:
+                hit = matcher.find(haystack, position)
+                if hit < 0:
+                    break
+                position = block.find(b"\n", hit) + 1 or len(block)
+                spans.append((block.rfind(b"\n", 0, hit) + 1, position))
+            if own and spans:
+                matched_lines += len(spans)
+                matcher.tally(b"".join(haystack[line_start:line_end] for line_start, line_end in spans), counts)
+
+            if plain:
+                if own and spans:
+                    lines = b"".join(block[line_start:line_end] for line_start, line_end in spans)
+                    output.write(lines if lines.endswith(b"\n") else lines + b"\n")
+                    state["emitted"] = first
+                first += line_count
+                continue
+
+            lines = None
+            index = first
+            position = 0
+            for line_start, line_end in spans:
+                index += block.count(b"\n", position, line_start)
+                position = line_start
+                if after_until >= first or before:
+                    lines = lines or block.split(b"\n")
+                for context in range(max(state["printed"] + 1, first), min(after_until, index - 1) + 1):
+                    emit(context, lines[context - first])
+                for context in range(max(index - before, state["printed"] + 1), index):
+                    emit(context, lines[context - first] if context >= first else tail[context - first])
+                emit(index, block[line_start:line_end])
+                after_until = index + after
+            if after_until >= first and state["printed"] < first + line_count - 1:
+                lines = lines or block.split(b"\n")
+                for context in range(max(state["printed"] + 1, first), min(after_until, first + line_count - 1) + 1):
+                    emit(context, lines[context - first])
+            if before:
+                body = block[:-1] if block.endswith(b"\n") else block
+                tail = (tail + body.rsplit(b"\n", before)[-before:])[-before:]
+            first += line_count
+    own_end = min(state["own_end"], first)
+    return {"counts": counts, "matched_lines": matched_lines,
+            "starts_at_first": state["first_emitted"] == state["own_first"],
+            "ends_at_last": state["emitted"] == own_end - 1, "emitted": state["emitted"] is not None}
+
+def grep_file(file_path, output_path, patterns, regex=False, ignore_case=False, before=0, after=0,
+              line_numbers=False, workers=None):
+    """Write every line of a file that matches any of ``patterns`` to ``output_path``.
+
+    ``before`` and ``after`` add context lines, with ``--`` between
+    non-adjacent groups as in grep. Returns per-pattern hit counts, the
+    number of matching lines, workers, seconds and MB/s.
+    """
+    start_time = time.perf_counter()
+    matcher = Matcher(patterns, regex, ignore_case)
+    size = os.path.getsize(file_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = max(1, min(workers, size // MIN_RANGE_SIZE)) if size >= PARALLEL_THRESHOLD else 1
+    ranges = sorting.line_ranges(file_path, parts) if size else [(0, 0)]
+
+    if len(ranges) == 1:
+        results = [scan_range(file_path, 0, size, matcher, before, after, line_numbers, 0, output_path)]
+    else:
+        first_numbers = [0] * len(ranges)
+        index = line_index.LineIndex.load(file_path) if line_numbers else None
+        if index is not None:
+            first_numbers = [index.line_at(start) for start, _ in ranges]
+        elif line_numbers:
+            with open(file_path, "rb") as file:
+                for index, (start, end) in enumerate(ranges[:-1]):
+                    first_numbers[index + 1] = first_numbers[index] + sum(
+                        block.count(b"\n") for block in read_blocks(file, start, end))
+        part_dir = tempfile.mkdtemp(prefix=".uft-grep-", dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            part_paths = [os.path.join(part_dir, f"part-{index}") for index in range(len(ranges))]
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                results = list(executor.map(
+                    scan_range, [file_path] * len(ranges), [start for start, _ in ranges],
+                    [end for _, end in ranges], [matcher] * len(ranges), [before] * len(ranges),
+                    [after] * len(ranges), [line_numbers] * len(ranges), first_numbers, part_paths))
+            with open(output_path, "wb") as output:
+                previous = None
+                for part_path, result in zip(part_paths, results):
+                    if not result["emitted"]:
+                        if previous:
+                            previous = dict(previous, ends_at_last=False)  # An empty range is a gap.
+                        continue
+                    if (before or after) and previous and not (previous["ends_at_last"] and result["starts_at_first"]):
+                        output.write(SEPARATOR)
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, output, BLOCK_SIZE)
+                    previous = result
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    counts = Counter()
+    for result in results:
+        counts.update(result["counts"])
+    elapsed = time.perf_counter() - start_time
+    return {"counts": {pattern: counts[pattern] for pattern in matcher.patterns},
+            "matched_lines": sum(result["matched_lines"] for result in results),
+            "workers": len(ranges), "seconds": elapsed,
+            "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
@@ -0,0 +1,195 @@
+"""Single-pass multi-algorithm hashing of files and directory trees.
+
+Every digest of a file is computed from one read pass over a large reused
+buffer. Trees are hashed on a thread pool: hashlib releases the GIL while
+digesting large buffers, so threads hash several files at once.
+
+Tree results are kept in a JSON manifest keyed by relative path, with each
+file's size and modification time. On the next run, files whose size and
+modification time are unchanged are taken from the manifest instead of
+being read again; verify mode re-reads every file and reports files that
+changed, went missing or were added since the manifest was written.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BUFFER_SIZE = 4 * 1024 * 1024
+ALGORITHMS = ("sha256", "sha1", "md5", "blake2b")
+# The algorithm used to verify a tree, most preferred first.
+VERIFY_PREFERENCE = ("blake2b", "sha256", "sha1", "md5")
+MANIFEST_VERSION = 1
+
+def parse_algorithms(value):
+    """Parse ``"sha256"``, ``"sha256,md5"`` or ``"all"`` into a list of algorithm names."""
+    names = list(ALGORITHMS) if value.strip().lower() == "all" else [
+        name.strip().lower() for name in value.split(",") if name.strip()]
+    for name in names:
+        if name not in hashlib.algorithms_available:
+            raise ValueError(f"Unsupported hash algorithm: {name}")
+    if not names:
+        raise ValueError("No hash algorithm given.")
+    return names
+
+def hash_file(file_path, algorithms=("sha256",)):
+    """Return ``{algorithm: hex digest}`` for a file, reading it once."""
+    hashers = [(name, hashlib.new(name)) for name in algorithms]
+    with open(file_path, "rb", buffering=0) as file:
+        # Small files do not need (and should not pay for zeroing) the full buffer.
+        buffer = bytearray(min(BUFFER_SIZE, os.fstat(file.fileno()).st_size + 1))
+        view = memoryview(buffer)
+        while True:
+            size = file.readinto(buffer)
+            if not size:
+                break
+            chunk = view[:size] if size < len(buffer) else view
+            for _, hasher in hashers:
+                hasher.update(chunk)
+    return {name: hasher.hexdigest() for name, hasher in hashers}
+
+def default_manifest_path(directory):
+    """The manifest kept next to a directory: ``<directory>.hashes.json``."""
+    return os.path.abspath(directory).rstrip(os.sep) + ".hashes.json"
+
+def walk(directory):
+    """Yield ``(relative path, path, stat)`` for every regular file under ``directory``, in sorted order."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Broken symlink or a file deleted while walking.
+            if os.path.isfile(path):
+                yield os.path.relpath(path, directory).replace(os.sep, "/"), path, stat
+
+def load_manifest(manifest_path):
+    """Load a hash manifest; a missing file is an empty manifest."""
+    if not os.path.exists(manifest_path):
+        return {"version": MANIFEST_VERSION, "algorithms": [], "files": {}}
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported hash manifest version in {manifest_path}")
+    return manifest
+
+def save_manifest(manifest_path, manifest):
+    """Write a manifest atomically."""
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(manifest_path)}.",
+                                         dir=os.path.dirname(os.path.abspath(manifest_path)))
+    with open(handle, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+def hash_tree(directory, algorithms=("sha256",), manifest_path=None, workers=None, force=False):
+    """Hash every file under ``directory`` and update its manifest.
+
+    Files whose size and modification time match the manifest (and that have
+    every requested digest) are skipped unless ``force`` is set. Algorithms
+    already recorded in the manifest are computed too, in the same pass.
+    Returns statistics including the manifest path.
+    """
+    start_time = time.perf_counter()
+    manifest_path = manifest_path or default_manifest_path(directory)
+    manifest = load_manifest(manifest_path)
+    previous = manifest["files"]
+    # Digests already in the manifest are kept up to date alongside the requested ones.
+    algorithms = list(dict.fromkeys(list(algorithms) + manifest["algorithms"]))
+    files = {}
+    jobs = []
+    skipped = 0
+    for relative_path, path, stat in walk(directory):
+        if os.path.abspath(path) == os.path.abspath(manifest_path):
+            continue
+        entry = previous.get(relative_path)
+        if (not force and entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+                and all(name in entry for name in algorithms)):
+            files[relative_path] = entry
+            skipped += 1
+        else:
+            jobs.append((relative_path, path, stat))
+
+    def hash_job(job):
+        relative_path, path, stat = job
+        return relative_path, dict(hash_file(path, algorithms), size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for relative_path, entry in executor.map(hash_job, jobs):
+            files[relative_path] = entry
+    save_manifest(manifest_path, {"version": MANIFEST_VERSION, "algorithms": list(algorithms), "files": files})
+
+    hashed_bytes = sum(stat.st_size for _, _, stat in jobs)
+    elapsed = time.perf_counter() - start_time
+    return {"manifest_path": manifest_path, "files": len(files), "hashed": len(jobs), "skipped": skipped,
+            "removed": len(set(previous) - set(files)), "hashed_bytes": hashed_bytes, "seconds": elapsed,
+            "mb_per_s": hashed_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
+
+def verify_tree(directory, manifest_path=None, algorithm=None, workers=None):
+    """Re-hash every file under ``directory`` and compare it with the manifest.
+
+    Returns the number of matching files and the relative paths that were
+    modified, are missing, or were added since the manifest was written.
+    """
+    start_time = time.perf_counter()
+    manifest_path = manifest_path or default_manifest_path(directory)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"No hash manifest at {manifest_path}")
+    manifest = load_manifest(manifest_path)
+    if algorithm is None:
+        algorithm = next((name for name in VERIFY_PREFERENCE if name in manifest["algorithms"]),
+                         (manifest["algorithms"] or ["sha256"])[0])
+    present = {relative_path: path for relative_path, path, _ in walk(directory)
+               if os.path.abspath(path) != os.path.abspath(manifest_path)}
+    expected = manifest["files"]
+    checked = [relative_path for relative_path in expected if relative_path in present]
+
+    def check(relative_path):
+        return hash_file(present[relative_path], (algorithm,))[algorithm] == expected[relative_path].get(algorithm)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        matches = list(executor.map(check, checked))
+    checked_bytes = sum(expected[relative_path]["size"] for relative_path in checked)
+    elapsed = time.perf_counter() - start_time
+    return {"manifest_path": manifest_path, "algorithm": algorithm, "ok": sum(matches),
+            "modified": [relative_path for relative_path, match in zip(checked, matches) if not match],
+            "missing": sorted(set(expected) - set(present)), "added": sorted(set(present) - set(expected)),
+            "seconds": elapsed, "mb_per_s": checked_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
+
+def add_hash_arguments(parser):
+    """Register the hash subcommand options on an argument parser."""
+    parser.add_argument("directory", help="Directory tree to hash or verify")
+    parser.add_argument("--algorithms", default="sha256",
+                        help="Comma-separated digests to compute, or 'all' (" + ", ".join(ALGORITHMS) + ")")
+    parser.add_argument("--manifest", help="Hash manifest file (default: <directory>.hashes.json)")
+    parser.add_argument("--verify", action="store_true", help="Check the tree against the manifest instead")
+    parser.add_argument("--force", action="store_true", help="Re-hash files even if their size and mtime are unchanged")
+    parser.add_argument("--workers", type=int, help="Number of hashing threads")
+
+def run_hash(args):
+    """Hash a directory tree into its manifest, or verify the tree against it."""
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}")
+        return 1
+    try:
+        if args.verify:
+            result = verify_tree(args.directory, args.manifest, workers=args.workers)
+        else:
+            result = hash_tree(args.directory, parse_algorithms(args.algorithms), args.manifest, args.workers,
+                               args.force)
+    except Exception as e:
+        print(f"Error hashing {args.directory}: {e}")
+        return 1
+    if not args.verify:
+        print(f"Hashed {result['hashed']} files ({result['mb_per_s']:.1f} MB/s), {result['skipped']} unchanged, "
+              f"{result['removed']} removed: {result['manifest_path']}")
+        return 0
+    for label in ("modified", "missing", "added"):
+        for relative_path in result[label]:
+            print(f"{label.upper():<9} {relative_path}")
+    print(f"{result['ok']} files match ({result['algorithm']}), {len(result['modified'])} modified, "
+          f"{len(result['missing'])} missing, {len(result['added'])} added")
+    return 1 if result["modified"] or result["missing"] else 0
@@ -1,186 +1,355 @@
 import os
+from typing import Any, List, Optional, Tuple
 from PIL import Image, ImageEnhance, ImageDraw, ImageFont
-from PyPDF2 import PdfReader, PdfWriter
+from results import OperationResult
+import tracing
 
-def resize_image(file_path):
-    """Resize an image."""
-    try:
+IMAGE_FORMATS = ("JPEG", "PNG", "BMP", "GIF")
+
+def open_image(file_path: str):
+    """Open and fully decode an image, so decoding is not hidden in the first transform."""
+    with tracing.phase("decode"):
         img = Image.open(file_path)
-        print(f"Current size: {img.size}")
-        width = int(input("Enter new width: "))
-        height = int(input("Enter new height: "))
+        img.load()
+    return img
+
+def save_image(img, output_path: str, *args, **kwargs) -> None:
+    """Encode and write an image."""
+    with tracing.phase("encode"):
+        img.save(output_path, *args, **kwargs)
+
+def get_image_info(file_path: str) -> OperationResult:
+    """Report the size, mode and format of an image."""
+    with Image.open(file_path) as img:
+        info = {"size": list(img.size), "mode": img.mode, "format": img.format}
+    return OperationResult("get_image_info", file_path, data=info, message=f"Current size: {img.size}")
+
+def resize_image(file_path: str, width: int, height: int, output_path: Optional[str] = None) -> OperationResult:
+    """Resize an image."""
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         img = img.resize((width, height))
-        img.save(file_path)
-        print("Image resized successfully.")
-    except Exception as e:
-        print(f"Error resizing image: {e}")
+    save_image(img, output_path)
+    return OperationResult("resize_image", file_path, [output_path], {"size": [width, height]},
+                           "Image resized successfully.")
 
-def convert_image(file_path):
+def convert_image(file_path: str, format_to: str = "JPEG", output_path: Optional[str] = None) -> OperationResult:
     """Convert image to another format."""
-    try:
-        img = Image.open(file_path)
-        format_map = {"1": "JPEG", "2": "PNG", "3": "BMP", "4": "GIF"}
-        print("Choose format to convert to:")
-        print("1. JPEG\n2. PNG\n3. BMP\n4. GIF")
-        choice = input("Select option: ")
-        format_to = format_map.get(choice, "JPEG")
-        new_file_path = os.path.splitext(file_path)[0] + f".{format_to.lower()}"
-        img.save(new_file_path, format_to)
-        print(f"Image converted to {format_to} successfully.")
-    except Exception as e:
-        print(f"Error converting image: {e}")
-
-def rotate_image(file_path):
+    format_to = format_to.upper()
+    if format_to not in IMAGE_FORMATS:
+        raise ValueError(f"Unsupported image format: {format_to}")
+    img = open_image(file_path)
+    if format_to == "JPEG" and img.mode not in ("RGB", "L"):
+        with tracing.phase("transform"):
+            img = img.convert("RGB")
+    new_file_path = output_path or os.path.splitext(file_path)[0] + f".{format_to.lower()}"
+    save_image(img, new_file_path, format_to)
+    return OperationResult("convert_image", file_path, [new_file_path], {"format": format_to},
+                           f"Image converted to {format_to} successfully.")
+
+def rotate_image(file_path: str, angle: int, output_path: Optional[str] = None) -> OperationResult:
     """Rotate an image."""
-    try:
-        img = Image.open(file_path)
-        angle = int(input("Enter angle to rotate (in degrees): "))
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         img = img.rotate(angle)
-        img.save(file_path)
-        print("Image rotated successfully.")
-    except Exception as e:
-        print(f"Error rotating image: {e}")
-
-def flip_image(file_path):
-    """Flip an image."""
-    try:
-        img = Image.open(file_path)
-        print("1. Flip horizontally")
-        print("2. Flip vertically")
-        choice = input("Select option: ")
-        if choice == "1":
-            img = img.transpose(Image.FLIP_LEFT_RIGHT)
-        elif choice == "2":
-            img = img.transpose(Image.FLIP_TOP_BOTTOM)
-        else:
-            print("Invalid option selected.")
-            return
-        img.save(file_path)
-        print("Image flipped successfully.")
-    except Exception as e:
-        print(f"Error flipping image: {e}")
+    save_image(img, output_path)
+    return OperationResult("rotate_image", file_path, [output_path], {"angle": angle},
+                           "Image rotated successfully.")
+
+def flip_image(file_path: str, direction: str, output_path: Optional[str] = None) -> OperationResult:
+    """Flip an image horizontally or vertically."""
+    if direction == "horizontal":
+        method = Image.FLIP_LEFT_RIGHT
+    elif direction == "vertical":
+        method = Image.FLIP_TOP_BOTTOM
+    else:
+        raise ValueError(f"Unsupported flip direction: {direction} (expected 'horizontal' or 'vertical')")
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
+        img = img.transpose(method)
+    save_image(img, output_path)
+    return OperationResult("flip_image", file_path, [output_path], {"direction": direction},
+                           "Image flipped successfully.")
 
-def grayscale_image(file_path):
+def grayscale_image(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Convert image to grayscale."""
-    try:
-        img = Image.open(file_path)
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         img = img.convert("L")
-        img.save(file_path)
-        print("Image converted to grayscale successfully.")
-    except Exception as e:
-        print(f"Error converting image to grayscale: {e}")
+    save_image(img, output_path)
+    return OperationResult("grayscale_image", file_path, [output_path],
+                           message="Image converted to grayscale successfully.")
 
-def crop_image(file_path):
+def crop_image(file_path: str, left: int, top: int, right: int, bottom: int,
+               output_path: Optional[str] = None) -> OperationResult:
     """Crop an image."""
-    try:
-        img = Image.open(file_path)
-        print(f"Current size: {img.size}")
-        left = int(input("Enter left coordinate: "))
-        top = int(input("Enter top coordinate: "))
-        right = int(input("Enter right coordinate: "))
-        bottom = int(input("Enter bottom coordinate: "))
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         img = img.crop((left, top, right, bottom))
-        img.save(file_path)
-        print("Image cropped successfully.")
-    except Exception as e:
-        print(f"Error cropping image: {e}")
+    save_image(img, output_path)
+    return OperationResult("crop_image", file_path, [output_path], {"box": [left, top, right, bottom]},
+                           "Image cropped successfully.")
 
-def compress_image(file_path):
+def compress_image(file_path: str, quality: int, output_path: Optional[str] = None) -> OperationResult:
     """Compress an image by adjusting quality."""
-    try:
-        img = Image.open(file_path)
-        quality = int(input("Enter compression quality (1-100): "))
-        img.save(file_path, quality=quality)
-        print("Image compressed successfully.")
-    except Exception as e:
-        print(f"Error compressing image: {e}")
+    if not 1 <= quality <= 100:
+        raise ValueError("Compression quality must be between 1 and 100.")
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    save_image(img, output_path, quality=quality)
+    return OperationResult("compress_image", file_path, [output_path], {"quality": quality},
+                           "Image compressed successfully.")
 
-def adjust_brightness(file_path):
+def adjust_brightness(file_path: str, factor: float, output_path: Optional[str] = None) -> OperationResult:
     """Adjust the brightness of an image."""
-    try:
-        img = Image.open(file_path)
-        factor = float(input("Enter brightness factor (0.0 - 2.0): "))
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         enhancer = ImageEnhance.Brightness(img)
         img = enhancer.enhance(factor)
-        img.save(file_path)
-        print("Brightness adjusted successfully.")
-    except Exception as e:
-        print(f"Error adjusting brightness: {e}")
+    save_image(img, output_path)
+    return OperationResult("adjust_brightness", file_path, [output_path], {"factor": factor},
+                           "Brightness adjusted successfully.")
 
-def adjust_contrast(file_path):
+def adjust_contrast(file_path: str, factor: float, output_path: Optional[str] = None) -> OperationResult:
     """Adjust the contrast of an image."""
-    try:
-        img = Image.open(file_path)
-        factor = float(input("Enter contrast factor (0.0 - 2.0): "))
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         enhancer = ImageEnhance.Contrast(img)
         img = enhancer.enhance(factor)
-        img.save(file_path)
-        print("Contrast adjusted successfully.")
-    except Exception as e:
-        print(f"Error adjusting contrast: {e}")
+    save_image(img, output_path)
+    return OperationResult("adjust_contrast", file_path, [output_path], {"factor": factor},
+                           "Contrast adjusted successfully.")
 
-def add_border(file_path):
+def add_border(file_path: str, border_size: int, output_path: Optional[str] = None) -> OperationResult:
     """Add a border around the image."""
-    try:
-        img = Image.open(file_path)
-        border_size = int(input("Enter border size (in pixels): "))
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         bordered_img = Image.new("RGB", (img.width + 2 * border_size, img.height + 2 * border_size), "black")
         bordered_img.paste(img, (border_size, border_size))
-        bordered_img.save(file_path)
-        print("Border added successfully.")
-    except Exception as e:
-        print(f"Error adding border: {e}")
+    save_image(bordered_img, output_path)
+    return OperationResult("add_border", file_path, [output_path], {"border_size": border_size},
+                           "Border added successfully.")
 
-def create_thumbnail(file_path):
+def create_thumbnail(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Create a thumbnail version of the image."""
-    try:
+    size = (128, 128)
+    with tracing.phase("decode"):
         img = Image.open(file_path)
-        size = (128, 128)
+        # Same draft request thumbnail() makes, so JPEGs are decoded at a reduced scale.
+        img.draft(None, (size[0] * 2, size[1] * 2))
+        img.load()
+    with tracing.phase("transform"):
         img.thumbnail(size)
-        thumbnail_path = os.path.splitext(file_path)[0] + "_thumbnail.jpg"
-        img.save(thumbnail_path, "JPEG")
-        print(f"Thumbnail created successfully: {thumbnail_path}")
-    except Exception as e:
-        print(f"Error creating thumbnail: {e}")
-
-def overlay_text(file_path):
-    """Overlay text on an image."""
-    try:
-        img = Image.open(file_path)
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+    thumbnail_path = output_path or os.path.splitext(file_path)[0] + "_thumbnail.jpg"
+    save_image(img, thumbnail_path, "JPEG")
+    return OperationResult("create_thumbnail", file_path, [thumbnail_path], {"size": list(img.size)},
+                           f"Thumbnail created successfully: {thumbnail_path}")
+
+def overlay_text(file_path: str, text: str, font_size: int = 10, output_path: Optional[str] = None) -> OperationResult:
+    """Overlay text on the centre of an image."""
+    output_path = output_path or file_path
+    img = open_image(file_path)
+    with tracing.phase("transform"):
         draw = ImageDraw.Draw(img)
-        text = input("Enter text to overlay: ")
-        font_size = int(input("Enter font size: "))
         font = ImageFont.load_default()
-        text_width, text_height = draw.textsize(text, font=font)
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+        text_width, text_height = right - left, bottom - top
         position = (img.width // 2 - text_width // 2, img.height // 2 - text_height // 2)
-        draw.text(position, text, (255, 255, 255), font=font) 
-        img.save(file_path)
-        print("Text overlay added successfully.")
-    except Exception as e:
-        print(f"Error overlaying text: {e}")
+        draw.text(position, text, (255, 255, 255), font=font)
+    save_image(img, output_path)
+    return OperationResult("overlay_text", file_path, [output_path], {"text": text, "font_size": font_size},
+                           "Text overlay added successfully.")
 
-def add_image_to_pdf(pdf_path, image_path):
+def add_image_to_pdf(pdf_path: str, image_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Add an image to a PDF."""
-    try:
-        pdf_writer = PdfWriter()
-        pdf_reader = PdfReader(pdf_path)
-        for page in pdf_reader.pages:
-            pdf_writer.add_page(page)
-
-        img = Image.open(image_path)
-        img_pdf_path = os.path.splitext(image_path)[0] + ".pdf"
-        img.save(img_pdf_path, "PDF", resolution=100.0)
-
-        img_reader = PdfReader(img_pdf_path)
-        for img_page in img_reader.pages:
-            pdf_writer.add_page(img_page)
-
-        output_pdf_path = os.path.splitext(pdf_path)[0] + "_with_image.pdf"
-        with open(output_pdf_path, "wb") as output_pdf:
-            pdf_writer.write(output_pdf)
-        print(f"Image added to PDF successfully: {output_pdf_path}")
-    except Exception as e:
-        print(f"Error adding image to PDF: {e}")
+    from PyPDF2 import PdfReader, PdfWriter
+
+    pdf_writer = PdfWriter()
+    pdf_reader = PdfReader(pdf_path)
+    for page in pdf_reader.pages:
+        pdf_writer.add_page(page)
+
+    img = open_image(image_path)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    img_pdf_path = os.path.splitext(image_path)[0] + ".pdf"
+    save_image(img, img_pdf_path, "PDF", resolution=100.0)
+
+    img_reader = PdfReader(img_pdf_path)
+    for img_page in img_reader.pages:
+        pdf_writer.add_page(img_page)
+
+    output_pdf_path = output_path or os.path.splitext(pdf_path)[0] + "_with_image.pdf"
+    with tracing.phase("io"), open(output_pdf_path, "wb") as output_pdf:
+        pdf_writer.write(output_pdf)
+    return OperationResult("add_image_to_pdf", image_path, [output_pdf_path],
+                           message=f"Image added to PDF successfully: {output_pdf_path}")
+
+# Quarter turns and flips form a closed group of eight lossless transposes, so
+# any run of them can be replaced by at most one Image.transpose call. Each
+# transform is modelled on a 2x2 grid of corner labels to find the composite.
+CORNERS = (("a", "b"), ("c", "d"))
+GRID_TRANSFORMS = {
+    Image.FLIP_LEFT_RIGHT: lambda g: ((g[0][1], g[0][0]), (g[1][1], g[1][0])),
+    Image.FLIP_TOP_BOTTOM: lambda g: (g[1], g[0]),
+    Image.ROTATE_90: lambda g: ((g[0][1], g[1][1]), (g[0][0], g[1][0])),
+    Image.ROTATE_180: lambda g: ((g[1][1], g[1][0]), (g[0][1], g[0][0])),
+    Image.ROTATE_270: lambda g: ((g[1][0], g[0][0]), (g[1][1], g[0][1])),
+    Image.TRANSPOSE: lambda g: ((g[0][0], g[1][0]), (g[0][1], g[1][1])),
+    Image.TRANSVERSE: lambda g: ((g[1][1], g[0][1]), (g[1][0], g[0][0])),
+}
+QUARTER_TURNS = {90: Image.ROTATE_90, 180: Image.ROTATE_180, 270: Image.ROTATE_270}
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Parse a WIDTHxHEIGHT string."""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+def parse_pipeline(spec: str) -> List[Tuple[str, Any]]:
+    """Parse a pipeline spec such as ``resize:800x600,rotate:90,grayscale,contrast:1.2``.
+
+    Supported steps: ``resize:WxH``, ``thumbnail:WxH``, ``rotate:DEGREES``,
+    ``flip:horizontal|vertical``, ``grayscale``, ``crop:LEFT:TOP:RIGHT:BOTTOM``,
+    ``brightness:FACTOR``, ``contrast:FACTOR``, ``border:PIXELS`` and
+    ``quality:1-100`` (applied when the result is encoded).
+    """
+    steps = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition(":")
+        name = name.lower()
+        if name in ("resize", "thumbnail"):
+            steps.append((name, parse_size(value)))
+        elif name == "rotate":
+            steps.append((name, float(value) % 360))
+        elif name == "flip":
+            direction = {"h": "horizontal", "v": "vertical"}.get(value.lower(), value.lower())
+            if direction not in ("horizontal", "vertical"):
+                raise ValueError(f"Unsupported flip direction: {value}")
+            steps.append((name, direction))
+        elif name == "grayscale":
+            steps.append((name, None))
+        elif name == "crop":
+            steps.append((name, tuple(int(v) for v in value.split(":"))))
+            if len(steps[-1][1]) != 4:
+                raise ValueError("crop expects LEFT:TOP:RIGHT:BOTTOM")
+        elif name in ("brightness", "contrast"):
+            steps.append((name, float(value)))
+        elif name in ("border", "quality"):
+            steps.append((name, int(value)))
+        else:
+            raise ValueError(f"Unknown pipeline step: {name}")
+    return steps
+
+def transpose_method(step: Tuple[str, Any]) -> Optional[int]:
+    """Return the lossless transpose equivalent of a step, or None if it has none."""
+    name, value = step
+    if name == "flip":
+        return Image.FLIP_LEFT_RIGHT if value == "horizontal" else Image.FLIP_TOP_BOTTOM
+    if name == "rotate" and value in QUARTER_TURNS:
+        return QUARTER_TURNS[value]
+    return None
+
+def fuse_steps(steps: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """Merge runs of quarter turns and flips into a single transpose and drop overwritten resizes."""
+    fused = []
+    grid = None
+    for step in steps:
+        if step == ("rotate", 0.0):
+            continue
+        method = transpose_method(step)
+        if method is not None:
+            grid = GRID_TRANSFORMS[method](grid or CORNERS)
+            continue
+        if grid is not None:
+            fused.extend(composite_transpose(grid))
+            grid = None
+        if step[0] == "resize" and fused and fused[-1][0] == "resize":
+            fused.pop()
+        fused.append(step)
+    if grid is not None:
+        fused.extend(composite_transpose(grid))
+    return fused
+
+def composite_transpose(grid) -> List[Tuple[str, Any]]:
+    """Return the single transpose step that maps the original corners to ``grid``."""
+    if grid == CORNERS:
+        return []
+    for method, transform in GRID_TRANSFORMS.items():
+        if transform(CORNERS) == grid:
+            return [("transpose", method)]
+    raise AssertionError("Quarter turns and flips always compose to one transpose.")
+
+def apply_step(img, step: Tuple[str, Any]):
+    """Apply one pipeline step to an in-memory image."""
+    name, value = step
+    if name == "resize":
+        return img.resize(value)
+    if name == "thumbnail":
+        img = img.copy()
+        img.thumbnail(value)
+        return img
+    if name == "transpose":
+        return img.transpose(value)
+    if name == "rotate":
+        return img.rotate(value, expand=True)
+    if name == "grayscale":
+        return img.convert("L")
+    if name == "crop":
+        return img.crop(value)
+    if name == "brightness":
+        return ImageEnhance.Brightness(img).enhance(value)
+    if name == "contrast":
+        return ImageEnhance.Contrast(img).enhance(value)
+    if name == "border":
+        bordered_img = Image.new("RGB", (img.width + 2 * value, img.height + 2 * value), "black")
+        bordered_img.paste(img, (value, value))
+        return bordered_img
+    raise ValueError(f"Unknown pipeline step: {name}")
+
+def apply_pipeline(file_path: str, spec: str, output_path: Optional[str] = None) -> OperationResult:
+    """Decode an image once, apply a chain of steps in memory and encode it once.
+
+    Rotations in a pipeline expand the canvas, so quarter turns are lossless
+    and any run of quarter turns and flips is fused into one transpose.
+    """
+    steps = parse_pipeline(spec)
+    quality = None
+    transforms = []
+    for step in steps:
+        if step[0] == "quality":
+            quality = step[1]
+        else:
+            transforms.append(step)
+    plan = fuse_steps(transforms)
+
+    output_path = output_path or file_path
+    with Image.open(file_path) as source:
+        img = source
+        with tracing.phase("decode"):
+            img.load()
+        for step in plan:
+            with tracing.phase("transform", step=step[0]):
+                img = apply_step(img, step)
+        save_options = {} if quality is None else {"quality": quality}
+        if os.path.splitext(output_path)[1].lower() in (".jpg", ".jpeg") and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        save_image(img, output_path, **save_options)
+    return OperationResult("apply_pipeline", file_path, [output_path],
+                           {"steps": len(steps), "applied": [name for name, _ in plan]},
+                           f"Applied {len(steps)} steps in {len(plan)} passes with a single decode and encode.")
 
 def handle_image(file_path):
     print("1. Resize Image")
@@ -196,33 +365,104 @@ def handle_image(file_path):
     print("11. Create Thumbnail")
     print("12. Overlay Text")
     print("13. Add Image to PDF")
+    print("14. Apply Pipeline of Edits")
     choice = input("Select option: ")
     if choice == "1":
-        resize_image(file_path)
+        try:
+            print(get_image_info(file_path).message)
+            width = int(input("Enter new width: "))
+            height = int(input("Enter new height: "))
+            print(resize_image(file_path, width, height).message)
+        except Exception as e:
+            print(f"Error resizing image: {e}")
     elif choice == "2":
-        convert_image(file_path)
+        format_map = {"1": "JPEG", "2": "PNG", "3": "BMP", "4": "GIF"}
+        print("Choose format to convert to:")
+        print("1. JPEG\n2. PNG\n3. BMP\n4. GIF")
+        format_to = format_map.get(input("Select option: "), "JPEG")
+        try:
+            print(convert_image(file_path, format_to).message)
+        except Exception as e:
+            print(f"Error converting image: {e}")
     elif choice == "3":
-        rotate_image(file_path)
+        try:
+            angle = int(input("Enter angle to rotate (in degrees): "))
+            print(rotate_image(file_path, angle).message)
+        except Exception as e:
+            print(f"Error rotating image: {e}")
     elif choice == "4":
-        flip_image(file_path)
+        print("1. Flip horizontally")
+        print("2. Flip vertically")
+        direction = {"1": "horizontal", "2": "vertical"}.get(input("Select option: "))
+        if direction is None:
+            print("Invalid option selected.")
+            return
+        try:
+            print(flip_image(file_path, direction).message)
+        except Exception as e:
+            print(f"Error flipping image: {e}")
     elif choice == "5":
-        grayscale_image(file_path)
+        try:
+            print(grayscale_image(file_path).message)
+        except Exception as e:
+            print(f"Error converting image to grayscale: {e}")
     elif choice == "6":
-        crop_image(file_path)
+        try:
+            print(get_image_info(file_path).message)
+            left = int(input("Enter left coordinate: "))
+            top = int(input("Enter top coordinate: "))
+            right = int(input("Enter right coordinate: "))
+            bottom = int(input("Enter bottom coordinate: "))
+            print(crop_image(file_path, left, top, right, bottom).message)
+        except Exception as e:
+            print(f"Error cropping image: {e}")
     elif choice == "7":
-        compress_image(file_path)
+        try:
+            quality = int(input("Enter compression quality (1-100): "))
+            print(compress_image(file_path, quality).message)
+        except Exception as e:
+            print(f"Error compressing image: {e}")
     elif choice == "8":
-        adjust_brightness(file_path)
+        try:
+            factor = float(input("Enter brightness factor (0.0 - 2.0): "))
+            print(adjust_brightness(file_path, factor).message)
+        except Exception as e:
+            print(f"Error adjusting brightness: {e}")
     elif choice == "9":
-        adjust_contrast(file_path)
+        try:
+            factor = float(input("Enter contrast factor (0.0 - 2.0): "))
+            print(adjust_contrast(file_path, factor).message)
+        except Exception as e:
+            print(f"Error adjusting contrast: {e}")
     elif choice == "10":
-        add_border(file_path)
+        try:
+            border_size = int(input("Enter border size (in pixels): "))
+            print(add_border(file_path, border_size).message)
+        except Exception as e:
+            print(f"Error adding border: {e}")
     elif choice == "11":
-        create_thumbnail(file_path)
+        try:
+            print(create_thumbnail(file_path).message)
+        except Exception as e:
+            print(f"Error creating thumbnail: {e}")
     elif choice == "12":
-        overlay_text(file_path)
+        try:
+            text = input("Enter text to overlay: ")
+            font_size = int(input("Enter font size: "))
+            print(overlay_text(file_path, text, font_size).message)
+        except Exception as e:
+            print(f"Error overlaying text: {e}")
     elif choice == "13":
-        pdf_path = input("Enter the PDF file path to add the image to: ")
-        add_image_to_pdf(pdf_path, file_path)
+        try:
+            pdf_path = input("Enter the PDF file path to add the image to: ")
+            print(add_image_to_pdf(pdf_path, file_path).message)
+        except Exception as e:
+            print(f"Error adding image to PDF: {e}")
+    elif choice == "14":
+        try:
+            spec = input("Enter steps (e.g., resize:800x600,rotate:90,grayscale,contrast:1.2): ")
+            print(apply_pipeline(file_path, spec).message)
+        except Exception as e:
+            print(f"Error applying pipeline: {e}")
     else:
         print("Invalid option selected.")
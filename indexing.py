@@ -0,0 +1,401 @@
+"""Full-text inverted index over text and Markdown files, stored in SQLite.
+
+Files are split into lowercase terms (runs of letters and digits), so
+Markdown markup and punctuation fall away and the line numbers are those of
+the source file. For every term of a file the index keeps one postings
+entry: the term's token positions and line numbers, delta-encoded as
+varints, so a term that occurs a handful of times costs a few bytes.
+Postings are keyed by (term, file), so the files containing a term are one
+range scan of the primary key.
+
+Updates are incremental. Files whose size and modification time are
+unchanged are skipped; a file whose modification time changed but whose
+content hash did not only has its metadata updated; files that disappeared
+from an indexed directory are dropped. Files are tokenised in worker
+processes and only the main process writes to the database.
+
+Queries AND their words together. ``OR`` between two clauses makes a
+disjunction, a leading ``-`` excludes a clause, and ``"double quotes"``
+match a phrase (consecutive terms). A word that splits into several terms,
+such as ``request_id``, is matched as a phrase too.
+"""
+import os
+import re
+import sqlite3
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice
+import cache
+import decoding
+import hashing
+
+INDEX_VERSION = 1
+TERM = re.compile(r"[^\W_]+")
+QUERY_TOKEN = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+EXTENSIONS = (".txt", ".md", ".markdown", ".rst", ".log")
+# Fewer changed files than this are tokenised in-process.
+PARALLEL_FILES = 64
+# Files are written to the database in transactions of this many.
+BATCH_FILES = 500
+# SQLite's default limit on the number of ? parameters in one statement.
+MAX_PARAMETERS = 999
+
+def default_index_path():
+    """The index used when none is given: ``$UFT_INDEX`` or ``index.db`` in the cache directory."""
+    return os.environ.get("UFT_INDEX") or os.path.join(cache.default_cache_dir(), "index.db")
+
+def tokenize(text):
+    return TERM.findall(text.lower())
+
+def encode_varint(number):
+    data = bytearray()
+    while number >= 0x80:
+        data.append(number & 0x7F | 0x80)
+        number >>= 7
+    data.append(number)
+    return bytes(data)
+
+# Encodings of the numbers that fit in two bytes, which are nearly all deltas.
+SMALL_VARINTS = [encode_varint(number) for number in range(1 << 14)]
+
+def encode_varints(numbers):
+    try:
+        return b"".join([SMALL_VARINTS[number] for number in numbers])
+    except IndexError:
+        return b"".join(map(encode_varint, numbers))
+
+def decode_varints(data):
+    if data.isascii():
+        return list(data)
+    numbers = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            numbers.append(value)
+            value = shift = 0
+    return numbers
+
+def deltas(numbers):
+    return [numbers[0]] + [current - previous for previous, current in zip(numbers, numbers[1:])]
+
+def encode_postings(positions, lines):
+    """Encode a term's token positions and line numbers in one file."""
+    if len(positions) == 1:
+        return encode_varints((1, positions[0], lines[0]))
+    return encode_varints([len(positions)] + deltas(positions) + deltas(lines))
+
+def decode_postings(data):
+    """Return ``(positions, lines)`` from an encoded postings entry."""
+    numbers = decode_varints(data)
+    count = numbers[0]
+    return list(accumulate(numbers[1:count + 1])), list(accumulate(numbers[count + 1:]))
+
+def tokenize_file(file_path, known_hash=None):
+    """Read a file and return its metadata and ``{term: postings}``.
+
+    If the content hash equals ``known_hash`` the file is not tokenised and
+    the postings are None.
+    """
+    stat = os.stat(file_path)
+    digest = hashing.hash_file(file_path)["sha256"]
+    if digest == known_hash:
+        return file_path, stat.st_size, stat.st_mtime_ns, digest, None, None
+    occurrences = {}
+    position = 0
+    with decoding.open_text(file_path, errors="replace") as file:
+        for line_number, line in enumerate(file, 1):
+            for term in TERM.findall(line.lower()):
+                entry = occurrences.get(term)
+                if entry is None:
+                    occurrences[term] = entry = ([], [])
+                entry[0].append(position)
+                entry[1].append(line_number)
+                position += 1
+    postings = {term: encode_postings(*entry) for term, entry in occurrences.items()}
+    return file_path, stat.st_size, stat.st_mtime_ns, digest, position, postings
+
+def collect_files(paths, extensions=EXTENSIONS):
+    """Return ``({absolute path: stat}, directory roots)`` for files given directly or found in directories."""
+    found = {}
+    roots = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            roots.append(path)
+            for _, file_path, stat in hashing.walk(path):
+                if file_path.lower().endswith(extensions):
+                    found[os.path.abspath(file_path)] = stat
+        elif os.path.isfile(path):
+            found[path] = os.stat(path)
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+    return found, roots
+
+def parse_query(query):
+    """Parse a query into ``[(negated, [alternative, ...]), ...]``; an alternative is a list of terms.
+
+    Clauses are ANDed; alternatives inside a clause (joined by ``OR``) are ORed;
+    an alternative of several terms is a phrase.
+    """
+    clauses = []
+    join_next = False
+    for match in QUERY_TOKEN.finditer(query):
+        negated, phrase, word = match.group(1), match.group(2), match.group(3)
+        if word == "OR":
+            join_next = bool(clauses)
+            continue
+        if word is not None and word.startswith("-") and len(word) > 1:
+            negated, word = "-", word[1:]
+        terms = tokenize(phrase if word is None else word)
+        if not terms:
+            continue
+        if join_next and not negated and not clauses[-1][0]:
+            clauses[-1][1].append(terms)
+        else:
+            clauses.append((bool(negated), [terms]))
+        join_next = False
+    return clauses
+
+class SearchIndex:
+    """An on-disk inverted index of text files."""
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path or default_index_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        self.db = sqlite3.connect(self.index_path, timeout=60)
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, INDEX_VERSION):
+            raise ValueError(f"{self.index_path} was built by another version; delete it and index again.")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime_ns INTEGER, hash TEXT,
+                tokens INTEGER, terms BLOB
+            );
+            CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE);
+            CREATE TABLE IF NOT EXISTS postings (
+                term_id INTEGER, file_id INTEGER, data BLOB, PRIMARY KEY (term_id, file_id)
+            ) WITHOUT ROWID;
+            PRAGMA user_version = {INDEX_VERSION};
+        """)
+        self.term_ids = {}
+
+    def close(self):
+        self.db.close()
+
+    def lookup_terms(self, terms, create=False):
+        """Map terms to their ids (adding missing ones if ``create``); unknown terms are left out."""
+        missing = [term for term in terms if term not in self.term_ids]
+        if missing and create:
+            self.db.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", ((term,) for term in missing))
+        for start in range(0, len(missing), MAX_PARAMETERS):
+            chunk = missing[start:start + MAX_PARAMETERS]
+            self.term_ids.update(self.db.execute(
+                f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk))
+        return {term: self.term_ids[term] for term in terms if term in self.term_ids}
+
+    def remove_postings(self, file_id, terms_blob):
+        term_ids = array("I")
+        term_ids.frombytes(terms_blob or b"")
+        self.db.executemany("DELETE FROM postings WHERE term_id = ? AND file_id = ?",
+                            ((term_id, file_id) for term_id in term_ids))
+
+    def store(self, result, known, rows):
+        """Write the result of ``tokenize_file`` to the database; its postings rows are added to ``rows``."""
+        file_path, size, mtime_ns, digest, tokens, postings = result
+        row = known.get(file_path)
+        if postings is None:
+            self.db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, row[0]))
+            return False
+        if row is not None:
+            file_id = row[0]
+            self.remove_postings(file_id, self.db.execute("SELECT terms FROM files WHERE id = ?",
+                                                          (file_id,)).fetchone()[0])
+        else:
+            file_id = self.db.execute("INSERT INTO files (path) VALUES (?)", (file_path,)).lastrowid
+        term_ids = self.lookup_terms(list(postings), create=True)
+        rows.extend((term_ids[term], file_id, data) for term, data in postings.items())
+        self.db.execute("UPDATE files SET size = ?, mtime_ns = ?, hash = ?, tokens = ?, terms = ? WHERE id = ?",
+                        (size, mtime_ns, digest, tokens, array("I", term_ids.values()).tobytes(), file_id))
+        return True
+
+    def update(self, paths, extensions=EXTENSIONS, workers=None):
+        """Bring the index up to date with files and directories; returns statistics."""
+        start_time = time.perf_counter()
+        found, roots = collect_files(paths, extensions)
+        known = {path: (file_id, size, mtime_ns, digest) for file_id, path, size, mtime_ns, digest
+                 in self.db.execute("SELECT id, path, size, mtime_ns, hash FROM files")}
+        jobs = [(path, known[path][3] if path in known else None) for path, stat in found.items()
+                if path not in known or known[path][1:3] != (stat.st_size, stat.st_mtime_ns)]
+        removed = [path for path in known if path not in found
+                   and any(path.startswith(root + os.sep) for root in roots)]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        indexed = 0
+        with self.db:
+            for path in removed:
+                file_id = known[path][0]
+                self.remove_postings(file_id, self.db.execute("SELECT terms FROM files WHERE id = ?",
+                                                              (file_id,)).fetchone()[0])
+                self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+        if workers > 1 and len(jobs) >= PARALLEL_FILES:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(tokenize_file, *zip(*jobs), chunksize=16)
+        else:
+            executor = None
+            results = (tokenize_file(*job) for job in jobs)
+        try:
+            while True:
+                batch = list(islice(results, BATCH_FILES))
+                if not batch:
+                    break
+                rows = []
+                with self.db:
+                    indexed += sum(self.store(result, known, rows) for result in batch)
+                    # Inserting a whole batch in key order keeps the B-tree writes local.
+                    rows.sort()
+                    self.db.executemany("INSERT INTO postings VALUES (?, ?, ?)", rows)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        elapsed = time.perf_counter() - start_time
+        return {"files": len(found), "indexed": indexed, "touched": len(jobs) - indexed,
+                "unchanged": len(found) - len(jobs), "removed": len(removed), "seconds": elapsed}
+
+    def term_postings(self, term):
+        """``{file id: encoded postings}`` for a term."""
+        term_id = self.lookup_terms([term]).get(term)
+        if term_id is None:
+            return {}
+        return dict(self.db.execute("SELECT file_id, data FROM postings WHERE term_id = ?", (term_id,)))
+
+    def match_alternative(self, terms, postings):
+        """``{file id: matching line numbers}`` for a term or phrase."""
+        for term in terms:
+            if term not in postings:
+                postings[term] = self.term_postings(term)
+        if len(terms) == 1:
+            return {file_id: decode_postings(data)[1] for file_id, data in postings[terms[0]].items()}
+        file_ids = set.intersection(*(set(postings[term]) for term in terms))
+        matches = {}
+        for file_id in file_ids:
+            decoded = [decode_postings(postings[term][file_id]) for term in terms]
+            later = [set(positions) for positions, _ in decoded[1:]]
+            first_positions, first_lines = decoded[0]
+            lines = [line for position, line in zip(first_positions, first_lines)
+                     if all(position + offset in positions for offset, positions in enumerate(later, 1))]
+            if lines:
+                matches[file_id] = lines
+        return matches
+
+    def search(self, query, limit=20):
+        """Return ``(total matching files, hits)``; hits are dicts of path, score and matching lines.
+
+        Files are ranked by the number of matching occurrences.
+        """
+        clauses = parse_query(query)
+        if not any(not negated for negated, _ in clauses):
+            raise ValueError("The query needs at least one term that is not excluded.")
+        postings = {}
+        lines = None
+        excluded = set()
+        for negated, alternatives in clauses:
+            matches = {}
+            for terms in alternatives:
+                for file_id, found in self.match_alternative(terms, postings).items():
+                    matches.setdefault(file_id, []).extend(found)
+            if negated:
+                excluded.update(matches)
+            elif lines is None:
+                lines = matches
+            else:
+                lines = {file_id: found + matches[file_id] for file_id, found in lines.items() if file_id in matches}
+        file_ids = [file_id for file_id in lines if file_id not in excluded]
+        paths = {}
+        for start in range(0, len(file_ids), MAX_PARAMETERS):
+            chunk = file_ids[start:start + MAX_PARAMETERS]
+            paths.update(self.db.execute(f"SELECT id, path FROM files WHERE id IN ({','.join('?' * len(chunk))})",
+                                         chunk))
+        hits = [{"path": paths[file_id], "score": len(lines[file_id]), "lines": sorted(set(lines[file_id]))}
+                for file_id in file_ids]
+        hits.sort(key=lambda hit: (-hit["score"], hit["path"]))
+        return len(hits), hits[:limit] if limit else hits
+
+    def stats(self):
+        files, tokens = self.db.execute("SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM files").fetchone()
+        terms = self.db.execute("SELECT COUNT(*) FROM terms").fetchone()[0]
+        # Recent writes may still be in the write-ahead log.
+        size = sum(os.path.getsize(path) for path in (self.index_path, self.index_path + "-wal")
+                   if os.path.exists(path))
+        return {"files": files, "tokens": tokens, "terms": terms, "bytes": size}
+
+def read_lines(file_path, numbers):
+    """Return ``{line number: text}`` for the wanted (1-based) line numbers of a file."""
+    wanted = set(numbers)
+    found = {}
+    with decoding.open_text(file_path, errors="replace") as file:
+        for line_number, line in enumerate(file, 1):
+            if line_number in wanted:
+                found[line_number] = line.rstrip("\r\n")
+                if len(found) == len(wanted):
+                    break
+    return found
+
+def add_index_arguments(parser):
+    """Register the index subcommand options on an argument parser."""
+    parser.add_argument("paths", nargs="*", help="Files and directories to index")
+    parser.add_argument("--index", help="Index database (default: $UFT_INDEX or index.db in the cache directory)")
+    parser.add_argument("--ext", action="append",
+                        help="File extension to index in directories (repeatable; default: " + " ".join(EXTENSIONS) + ")")
+    parser.add_argument("--workers", type=int, help="Number of tokenising processes")
+
+def run_index(args):
+    """Index files and directories, or show index statistics when no paths are given."""
+    try:
+        index = SearchIndex(args.index)
+        if args.paths:
+            extensions = tuple(ext if ext.startswith(".") else "." + ext for ext in args.ext) if args.ext else EXTENSIONS
+            result = index.update(args.paths, tuple(ext.lower() for ext in extensions), args.workers)
+            print(f"Indexed {result['indexed']} files in {result['seconds']:.2f}s: {result['unchanged']} unchanged, "
+                  f"{result['touched']} touched but identical, {result['removed']} removed")
+        stats = index.stats()
+    except Exception as e:
+        print(f"Error indexing: {e}")
+        return 1
+    print(f"Index {index.index_path}: {stats['files']} files, {stats['terms']} terms, {stats['tokens']} tokens "
+          f"({stats['bytes'] / (1024 * 1024):.1f} MB)")
+    return 0
+
+def add_search_arguments(parser):
+    """Register the search subcommand options on an argument parser."""
+    parser.add_argument("query", nargs="+", help='Words to find; OR, -word and "a phrase" are supported (quote the whole query when it uses -word)')
+    parser.add_argument("--index", help="Index database (default: $UFT_INDEX or index.db in the cache directory)")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum number of files to list (0 for all)")
+    parser.add_argument("--lines", type=int, default=3, help="Matching lines to show per file (0 for none)")
+
+def run_search(args):
+    """Search the index and print the matching files and lines."""
+    start_time = time.perf_counter()
+    try:
+        index = SearchIndex(args.index)
+        total, hits = index.search(" ".join(args.query), args.limit)
+    except Exception as e:
+        print(f"Error searching: {e}")
+        return 1
+    elapsed = time.perf_counter() - start_time
+    for hit in hits:
+        print(f"{hit['path']} ({hit['score']} matches)")
+        numbers = hit["lines"][:args.lines]
+        try:
+            texts = read_lines(hit["path"], numbers) if numbers else {}
+        except OSError:
+            texts = {}
+        for number in numbers:
+            print(f"  {number}: {texts.get(number, '')}")
+    print(f"{total} files matched in {elapsed * 1000:.1f} ms" + (f", showing {len(hits)}" if len(hits) < total else ""))
+    return 0 if total else 1
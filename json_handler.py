@@ -1,93 +1,97 @@
 import json
 import os
 import csv
+from typing import Any, List, Optional
+from results import OperationResult
+import concatenating
 
-def read_json(file_path):
-    """Read and print the contents of a JSON file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            print(json.dumps(data, indent=4))  # Pretty print the JSON data
-    except Exception as e:
-        print(f"Error reading JSON file: {e}")
+def read_json(file_path: str) -> OperationResult:
+    """Read the contents of a JSON file."""
+    with open(file_path, 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    return OperationResult("read_json", file_path, data={"content": data},
+                           message=json.dumps(data, indent=4))  # Pretty print the JSON data
 
-def write_json(file_path):
+def write_json(file_path: str, data: Any) -> OperationResult:
     """Write data to a new JSON file."""
-    try:
-        data = input("Enter JSON data to write (as a valid JSON string): ")
-        json_data = json.loads(data)  # Convert string to JSON object
-        with open(file_path, 'w', encoding='utf-8') as json_file:
-            json.dump(json_data, json_file, indent=4)
-        print(f"Data written to JSON successfully: {file_path}")
-    except Exception as e:
-        print(f"Error writing to JSON file: {e}")
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=4)
+    return OperationResult("write_json", file_path, [file_path],
+                           message=f"Data written to JSON successfully: {file_path}")
 
-def append_to_json(file_path):
+def append_to_json(file_path: str, new_data: Any) -> OperationResult:
     """Append data to an existing JSON file."""
-    try:
-        with open(file_path, 'r+', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            new_data = input("Enter new data to append (as a valid JSON string): ")
-            new_data = json.loads(new_data)
-            if isinstance(data, list):
-                data.append(new_data) 
-            elif isinstance(data, dict):
-                data.update(new_data)
-            else:
-                print("Unsupported JSON structure for appending.")
-                return
-            json_file.seek(0)  
-            json.dump(data, json_file, indent=4)
-            json_file.truncate() 
-        print(f"Data appended to JSON successfully: {file_path}")
-    except Exception as e:
-        print(f"Error appending to JSON file: {e}")
+    with open(file_path, 'r+', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+        if isinstance(data, list):
+            data.append(new_data)
+        elif isinstance(data, dict) and isinstance(new_data, dict):
+            data.update(new_data)
+        else:
+            raise ValueError("Unsupported JSON structure for appending.")
+        json_file.seek(0)
+        json.dump(data, json_file, indent=4)
+        json_file.truncate()
+    return OperationResult("append_to_json", file_path, [file_path],
+                           message=f"Data appended to JSON successfully: {file_path}")
 
-def convert_json_to_csv(file_path):
+def convert_json_to_csv(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Convert a JSON file to CSV format."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            if isinstance(data, list):
-                csv_file_path = os.path.splitext(file_path)[0] + ".csv"
-                with open(csv_file_path, 'w', newline='', encoding='utf-8') as csv_file:
-                    writer = csv.DictWriter(csv_file, fieldnames=data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(data)
-                print(f"JSON converted to CSV successfully: {csv_file_path}")
-            else:
-                print("JSON data is not in a list format, cannot convert to CSV.")
-    except Exception as e:
-        print(f"Error converting JSON to CSV: {e}")
+    with open(file_path, 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    if not isinstance(data, list):
+        raise ValueError("JSON data is not in a list format, cannot convert to CSV.")
+    if not data:
+        raise ValueError("JSON list is empty, cannot convert to CSV.")
+    csv_file_path = output_path or os.path.splitext(file_path)[0] + ".csv"
+    with open(csv_file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=data[0].keys())
+        writer.writeheader()
+        writer.writerows(data)
+    return OperationResult("convert_json_to_csv", file_path, [csv_file_path], {"rows": len(data)},
+                           f"JSON converted to CSV successfully: {csv_file_path}")
 
-def pretty_print_json(file_path):
+def pretty_print_json(file_path: str) -> OperationResult:
     """Pretty print the contents of a JSON file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-            print(json.dumps(data, indent=4)) 
-    except Exception as e:
-        print(f"Error reading JSON file for pretty print: {e}")
+    with open(file_path, 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    return OperationResult("pretty_print_json", file_path, message=json.dumps(data, indent=4))
+
+def merge_json_files(file_paths: List[str], output_path: str = "merged_output.json",
+                     zero_copy: bool = False) -> OperationResult:
+    """Merge multiple JSON files into a single JSON file.
+
+    Every file is parsed and checked, and the merged list is re-indented. With ``zero_copy``
+    the items of each top-level array are copied byte for byte instead; only the brackets
+    and the commas next to them are checked, so the inputs must be trusted to be valid JSON.
+    """
+    if zero_copy:
+        merged, skipped, methods = concatenating.concatenate_json_arrays(file_paths, output_path)
+        warnings = [f"Warning: {file_path} does not contain a list. Skipping." for file_path in skipped]
+        if not merged:
+            os.remove(output_path)
+            raise ValueError("No JSON list data to merge.")
+        return OperationResult("merge_json_files", ",".join(file_paths), [output_path],
+                               {"files": merged, "skipped": len(skipped), "copy_methods": methods},
+                               "\n".join(warnings + [f"Merged JSON data written to: {output_path}"]))
 
-def merge_json_files(file_paths):
-    """Merge multiple JSON files into a single JSON file."""
     merged_data = []
+    warnings = []
     for file_path in file_paths:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as json_file:
-                data = json.load(json_file)
-                if isinstance(data, list):
-                    merged_data.extend(data)
-                else:
-                    print(f"Warning: {file_path} does not contain a list. Skipping.")
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
-    
-    if merged_data:
-        output_file_path = "merged_output.json"
-        with open(output_file_path, 'w', encoding='utf-8') as output_file:
-            json.dump(merged_data, output_file, indent=4)
-        print(f"Merged JSON data written to: {output_file_path}")
+        with open(file_path, 'r', encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        if isinstance(data, list):
+            merged_data.extend(data)
+        else:
+            warnings.append(f"Warning: {file_path} does not contain a list. Skipping.")
+
+    if not merged_data:
+        raise ValueError("No JSON list data to merge.")
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(merged_data, output_file, indent=4)
+    return OperationResult("merge_json_files", ",".join(file_paths), [output_path],
+                           {"items": len(merged_data), "skipped": len(warnings)},
+                           "\n".join(warnings + [f"Merged JSON data written to: {output_path}"]))
 
 def handle_json(file_path):
     """Handle JSON file operations."""
@@ -99,18 +103,38 @@ def handle_json(file_path):
     print("6. Merge JSON Files")
     choice = input("Select option: ")
     if choice == "1":
-        read_json(file_path)
+        try:
+            print(read_json(file_path).message)
+        except Exception as e:
+            print(f"Error reading JSON file: {e}")
     elif choice == "2":
-        write_json(file_path)
+        try:
+            data = input("Enter JSON data to write (as a valid JSON string): ")
+            print(write_json(file_path, json.loads(data)).message)
+        except Exception as e:
+            print(f"Error writing to JSON file: {e}")
     elif choice == "3":
-        append_to_json(file_path)
+        try:
+            new_data = input("Enter new data to append (as a valid JSON string): ")
+            print(append_to_json(file_path, json.loads(new_data)).message)
+        except Exception as e:
+            print(f"Error appending to JSON file: {e}")
     elif choice == "4":
-        convert_json_to_csv(file_path)
+        try:
+            print(convert_json_to_csv(file_path).message)
+        except Exception as e:
+            print(f"Error converting JSON to CSV: {e}")
     elif choice == "5":
-        pretty_print_json(file_path)
+        try:
+            print(pretty_print_json(file_path).message)
+        except Exception as e:
+            print(f"Error reading JSON file for pretty print: {e}")
     elif choice == "6":
-        num_files = int(input("How many JSON files do you want to merge? "))
-        file_paths = [input(f"Enter path for JSON file {i + 1}: ") for i in range(num_files)]
-        merge_json_files(file_paths)
+        try:
+            num_files = int(input("How many JSON files do you want to merge? "))
+            file_paths = [input(f"Enter path for JSON file {i + 1}: ") for i in range(num_files)]
+            print(merge_json_files(file_paths).message)
+        except Exception as e:
+            print(f"Error merging JSON files: {e}")
     else:
         print("Invalid option selected.")
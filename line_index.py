@@ -0,0 +1,206 @@
+"""Sidecar line-offset index for random access into large text files.
+
+The index stores the byte offset of every ``every``-th line start in a
+compact array, built in one streaming pass and saved next to the file as
+``<file>.lineidx``. It records the file's size and modification time and is
+ignored (and rebuilt) once either changes.
+
+With the index, fetching line N reads at most ``every`` lines from the
+nearest sampled offset instead of scanning from the start of the file;
+tailing and seeking to a percentage of the file do not need it at all, but
+use it to report line numbers.
+"""
+import bisect
+import os
+import struct
+import tempfile
+from array import array
+
+SUFFIX = ".lineidx"
+MAGIC = b"UFTLIDX1"
+HEADER = struct.Struct("<8sQqQQ")
+DEFAULT_EVERY = 1024
+BLOCK_SIZE = 4 * 1024 * 1024
+# Smaller files are scanned directly; building an index would cost as much as the scan it saves.
+INDEX_THRESHOLD = 16 * 1024 * 1024
+
+def index_path(file_path):
+    return file_path + SUFFIX
+
+class LineIndex:
+    """Byte offsets of every ``every``-th line of a file, plus its line count."""
+
+    def __init__(self, file_path, size, mtime_ns, every, line_count, offsets):
+        self.file_path = file_path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.every = every
+        self.line_count = line_count
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, file_path, every=DEFAULT_EVERY):
+        """Scan a file once and return its index."""
+        stat = os.stat(file_path)
+        offsets = array("Q", [0])
+        newlines = 0
+        position = 0
+        last_byte = b"\n"
+        # Newlines still to skip before the next sampled line starts.
+        remaining = every
+        with open(file_path, "rb", buffering=0) as file:
+            while True:
+                block = file.read(BLOCK_SIZE)
+                if not block:
+                    break
+                count = block.count(b"\n")
+                if count < remaining:
+                    remaining -= count
+                else:
+                    cursor = 0
+                    for _ in range(count):
+                        cursor = block.find(b"\n", cursor) + 1
+                        remaining -= 1
+                        if remaining == 0:
+                            offsets.append(position + cursor)
+                            remaining = every
+                newlines += count
+                position += len(block)
+                last_byte = block[-1:]
+        if offsets[-1] == position and len(offsets) > 1:
+            offsets.pop()  # A trailing newline does not start another line.
+        line_count = newlines + (0 if last_byte == b"\n" else 1)
+        return cls(file_path, stat.st_size, stat.st_mtime_ns, every, line_count, offsets)
+
+    @classmethod
+    def load(cls, file_path):
+        """Return the saved index of a file, or None if there is none or it is stale."""
+        try:
+            with open(index_path(file_path), "rb") as index_file:
+                magic, size, mtime_ns, every, line_count = HEADER.unpack(index_file.read(HEADER.size))
+                offsets = array("Q")
+                offsets.frombytes(index_file.read())
+            stat = os.stat(file_path)
+        except (OSError, struct.error, ValueError):
+            return None
+        if magic != MAGIC or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+            return None
+        return cls(file_path, size, mtime_ns, every, line_count, offsets)
+
+    def save(self):
+        """Write the index next to the file (atomically); returns False if the directory is read-only."""
+        path = index_path(self.file_path)
+        try:
+            handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.",
+                                                 dir=os.path.dirname(os.path.abspath(path)))
+        except OSError:
+            return False
+        with open(handle, "wb") as index_file:
+            index_file.write(HEADER.pack(MAGIC, self.size, self.mtime_ns, self.every, self.line_count))
+            self.offsets.tofile(index_file)
+        os.replace(temp_path, path)
+        return True
+
+    def line_offset(self, line):
+        """Byte offset of the start of ``line`` (0-based); the file size past the last line."""
+        if line >= self.line_count:
+            return self.size
+        sample, skip = divmod(line, self.every)
+        offset = self.offsets[sample]
+        if not skip:
+            return offset
+        with open(self.file_path, "rb") as file:
+            file.seek(offset)
+            return skip_lines(file, offset, skip)
+
+    def line_at(self, offset):
+        """Number (0-based) of the line containing byte ``offset``."""
+        sample = bisect.bisect_right(self.offsets, offset) - 1
+        line = sample * self.every
+        start = self.offsets[sample]
+        with open(self.file_path, "rb") as file:
+            file.seek(start)
+            remaining = offset - start
+            while remaining > 0:
+                block = file.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                line += block.count(b"\n")
+                remaining -= len(block)
+        return line
+
+def skip_lines(file, offset, count):
+    """Advance past ``count`` newlines from ``offset`` in an open file; returns the new offset."""
+    while count > 0:
+        block = file.read(64 * 1024)
+        if not block:
+            return offset
+        found = block.count(b"\n")
+        if found < count:
+            count -= found
+            offset += len(block)
+            continue
+        cursor = 0
+        for _ in range(count):
+            cursor = block.find(b"\n", cursor) + 1
+        return offset + cursor
+    return offset
+
+def get_index(file_path, build=True, every=DEFAULT_EVERY):
+    """Return a valid index of a file, building (and saving) one if allowed and worthwhile."""
+    index = LineIndex.load(file_path)
+    if index is None and build and os.path.getsize(file_path) >= INDEX_THRESHOLD:
+        index = LineIndex.build(file_path, every)
+        index.save()
+    return index
+
+def read_from(file_path, offset, count):
+    """Read up to ``count`` lines starting at byte ``offset``."""
+    lines = []
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        for line in file:
+            lines.append(line)
+            if len(lines) >= count:
+                break
+    return lines
+
+def line_start_offset(file_path, line, index=None):
+    """Byte offset of the start of ``line`` (0-based), using the index if there is one."""
+    if index is not None:
+        return index.line_offset(line)
+    with open(file_path, "rb") as file:
+        return skip_lines(file, 0, line)
+
+def tail_offset(file_path, count):
+    """Byte offset of the start of the last ``count`` lines, found by reading backwards from the end."""
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        position = size
+        # A trailing newline ends the last line rather than starting a new one.
+        file.seek(max(size - 1, 0))
+        skip_trailing = file.read(1) == b"\n"
+        while position > 0:
+            step = min(64 * 1024, position)
+            file.seek(position - step)
+            block = file.read(step)
+            end = len(block) - 1 if skip_trailing and position == size else len(block)
+            while True:
+                end = block.rfind(b"\n", 0, end)
+                if end < 0:
+                    break
+                count -= 1
+                if count == 0:
+                    return position - step + end + 1
+            position -= step
+    return 0
+
+def percent_offset(file_path, percent):
+    """Byte offset of the first line starting at or after ``percent`` of the file."""
+    size = os.path.getsize(file_path)
+    offset = int(size * min(max(percent, 0.0), 100.0) / 100)
+    if offset == 0:
+        return 0
+    with open(file_path, "rb") as file:
+        file.seek(offset - 1)
+        return skip_lines(file, offset - 1, 1)
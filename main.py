@@ -1,16 +1,103 @@
 import argparse
+import contextlib
 import os
-from image_handler import handle_image
-from pdf_handler import handle_pdf
-from text_handler import handle_text
-from video_handler import handle_video
-from markdown_handler import handle_markdown
-from csv_handler import handle_csv
-from json_handler import handle_json
+import sys
+import registry
+import tracing
+
+def batch_main(argv):
+    from batch import add_batch_arguments, run_batch
+
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Run one operation over many files")
+    add_batch_arguments(parser)
+    args = parser.parse_args(argv)
+    return run_batch(args)
+
+def serve_main(argv):
+    from daemon import add_serve_arguments, run_serve
+
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Run a warm worker daemon on a Unix socket")
+    add_serve_arguments(parser)
+    return run_serve(parser.parse_args(argv))
+
+def submit_main(argv):
+    from daemon import add_submit_arguments, run_submit
+
+    parser = argparse.ArgumentParser(prog="main.py submit", description="Submit jobs to a running UFT daemon")
+    add_submit_arguments(parser)
+    return run_submit(parser.parse_args(argv))
+
+def cache_main(argv):
+    from cache import add_cache_arguments, run_cache
+
+    parser = argparse.ArgumentParser(prog="main.py cache", description="Show or clear the result cache")
+    add_cache_arguments(parser, include_toggle=False)
+    parser.add_argument("--clear", action="store_true", help="Remove every cached result")
+    return run_cache(parser.parse_args(argv))
+
+def run_main(argv):
+    from manifest import add_manifest_arguments, run_manifest
+
+    parser = argparse.ArgumentParser(prog="main.py run", description="Run a manifest of chained operations")
+    add_manifest_arguments(parser)
+    return run_manifest(parser.parse_args(argv))
+
+def hash_main(argv):
+    from hashing import add_hash_arguments, run_hash
+
+    parser = argparse.ArgumentParser(prog="main.py hash", description="Hash a directory tree or verify it")
+    add_hash_arguments(parser)
+    return run_hash(parser.parse_args(argv))
+
+def index_main(argv):
+    from indexing import add_index_arguments, run_index
+
+    parser = argparse.ArgumentParser(prog="main.py index", description="Build or update the full-text search index")
+    add_index_arguments(parser)
+    return run_index(parser.parse_args(argv))
+
+def search_main(argv):
+    from indexing import add_search_arguments, run_search
+
+    parser = argparse.ArgumentParser(prog="main.py search", description="Search the full-text index")
+    add_search_arguments(parser)
+    return run_search(parser.parse_args(argv))
+
+def run_traced(handler, file_path, trace_path=None, profile_path=None):
+    """Run an interactive handler with its operations traced and/or profiled."""
+    module_name = handler.__module__
+    tracing.instrument(sys.modules[module_name], registry.MODULE_OPERATIONS[module_name])
+    tracer = tracing.start() if trace_path else None
+    try:
+        with tracing.profiled(profile_path) if profile_path else contextlib.nullcontext():
+            handler(file_path)
+    finally:
+        tracing.stop()
+        if tracer:
+            tracing.print_summary(tracer)
+            tracing.save_trace(trace_path, tracer.events)
+            print(f"Trace written to {trace_path}")
+        if profile_path:
+            print(f"Profile written to {profile_path}")
+
+SUBCOMMANDS = {
+    "batch": batch_main,
+    "serve": serve_main,
+    "submit": submit_main,
+    "cache": cache_main,
+    "run": run_main,
+    "hash": hash_main,
+    "index": index_main,
+    "search": search_main,
+}
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(description="Universal File Tool (UFT)")
-    parser.add_argument("file", help="The file to be processed")
+    parser.add_argument("file", help="The file to be processed (or one of: " + ", ".join(SUBCOMMANDS) + ")")
+    tracing.add_trace_arguments(parser)
     args = parser.parse_args()
     file_path = args.file
 
@@ -18,25 +105,13 @@ def main():
         print("File does not exist.")
         return
 
-    _, file_extension = os.path.splitext(file_path)
-    file_extension = file_extension.lower()
-
-    if file_extension in [".jpg", ".jpeg", ".png", ".bmp", ".gif"]:
-        handle_image(file_path)
-    elif file_extension == ".pdf":
-        handle_pdf(file_path)
-    elif file_extension == ".txt":
-        handle_text(file_path)
-    elif file_extension in [".mp4", ".avi", ".mov", ".mkv"]:
-        handle_video(file_path)
-    elif file_extension == ".md":
-        handle_markdown(file_path)
-    elif file_extension == ".csv":
-        handle_csv(file_path)
-    elif file_extension == ".json":
-        handle_json(file_path)
-    else:
+    handler = registry.load_handler(file_path)
+    if handler is None:
         print("Unsupported file type.")
+        return
+    if args.trace or args.profile:
+        return run_traced(handler, file_path, args.trace, args.profile)
+    handler(file_path)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""Run a manifest of chained operations as a dependency graph.
+
+A manifest (TOML or JSON) lists steps. Each step names an operation, its
+inputs (paths, glob patterns or ``@step`` references to the outputs of an
+earlier step), optional parameters and an optional output path:
+
+    [[steps]]
+    id = "pages"
+    op = "convert_pdf_to_image"
+    input = "reports/*.pdf"
+
+    [[steps]]
+    id = "thumbs"
+    op = "create_thumbnail"
+    input = "@pages"
+    output = "thumbs/{stem}.jpg"
+
+Operations that take one file run once per input; operations whose first
+parameter is a list of files (``merge_json_files``, ``merge_files``,
+``concatenate_videos``) run once over all inputs. Independent steps run in
+parallel, and a per-file step fed by a single ``@step`` reference starts on
+each upstream output as soon as it is written instead of waiting for the
+whole upstream step. Jobs whose inputs and outputs are unchanged since their
+last successful run are skipped.
+"""
+import glob
+import graphlib
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import registry
+
+@dataclass
+class Step:
+    id: str
+    operation: str
+    inputs: List[str]
+    params: Dict[str, Any] = field(default_factory=dict)
+    output: Optional[str] = None
+    after: List[str] = field(default_factory=list)
+    fan_in: bool = False
+
+    @property
+    def references(self) -> List[str]:
+        return [value[1:] for value in self.inputs if value.startswith("@")]
+
+    @property
+    def dependencies(self) -> List[str]:
+        return self.references + [dep for dep in self.after if dep not in self.references]
+
+    @property
+    def streamed(self) -> bool:
+        """True when the step can start on each upstream output as it is produced."""
+        return not self.fan_in and len(self.inputs) == 1 and self.inputs[0].startswith("@") and not self.after
+
+def load_manifest(path: str) -> dict:
+    """Read a manifest file (``.toml`` or JSON)."""
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as manifest_file:
+            return tomllib.load(manifest_file)
+    with open(path, "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
+
+def parse_steps(data: dict) -> List[Step]:
+    """Validate manifest data and return its steps in dependency order."""
+    steps = {}
+    for raw in data.get("steps", []):
+        step_id = raw.get("id")
+        if not step_id:
+            raise ValueError(f"Every step needs an id: {raw}")
+        if step_id in steps:
+            raise ValueError(f"Duplicate step id: {step_id}")
+        operation = raw.get("op")
+        function = registry.get_operation(operation or "")
+        inputs = raw.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        if not inputs:
+            raise ValueError(f"Step {step_id} has no input")
+        if raw.get("output") and "output_path" not in inspect.signature(function).parameters:
+            raise ValueError(f"Step {step_id}: {operation} does not take an output path")
+        steps[step_id] = Step(step_id, operation, inputs, dict(raw.get("params", {})), raw.get("output"),
+                              list(raw.get("after", [])), registry.takes_file_list(function))
+
+    graph = {}
+    for step in steps.values():
+        for dependency in step.dependencies:
+            if dependency not in steps:
+                raise ValueError(f"Step {step.id} depends on unknown step: {dependency}")
+        graph[step.id] = set(step.dependencies)
+    try:
+        order = list(graphlib.TopologicalSorter(graph).static_order())
+    except graphlib.CycleError as e:
+        raise ValueError(f"Manifest steps form a cycle: {' -> '.join(e.args[1])}")
+    return [steps[step_id] for step_id in order]
+
+def run_step_job(operation, args, params):
+    """Run one job in a worker process."""
+    start = time.perf_counter()
+    try:
+        result = registry.call_operation(operation, *args, **params)
+        return {"ok": True, "message": result.message, "output_paths": result.output_paths,
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"ok": False, "message": f"Error: {e}", "output_paths": [], "seconds": time.perf_counter() - start}
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class ManifestRunner:
+    """Schedules manifest jobs on a process pool as their dependencies complete."""
+
+    def __init__(self, steps, base_dir, state_path, workers=None, force=False):
+        self.steps = {step.id: step for step in steps}
+        self.order = [step.id for step in steps]
+        self.base_dir = base_dir
+        self.state_path = state_path
+        self.workers = workers
+        self.force = force
+        self.state = {}
+        if os.path.exists(state_path) and not force:
+            with open(state_path, "r", encoding="utf-8") as state_file:
+                self.state = json.load(state_file)
+        self.dependents = {step_id: [] for step_id in self.steps}
+        for step in steps:
+            for dependency in step.dependencies:
+                self.dependents[dependency].append(step.id)
+        # Outputs keyed by job submission order, so fan-in steps see a stable input order.
+        self.outputs = {step_id: {} for step_id in self.steps}
+        self.submitted = 0
+        self.open_jobs = {step_id: 0 for step_id in self.steps}
+        self.started = set()
+        self.finished = set()
+        self.failed = set()
+        self.futures = {}
+        self.counts = {"ran": 0, "skipped": 0, "failed": 0}
+
+    def resolve(self, value):
+        if value.startswith("@"):
+            outputs = self.outputs[value[1:]]
+            return [path for sequence in sorted(outputs) for path in outputs[sequence]]
+        path = os.path.join(self.base_dir, os.path.expanduser(value))
+        matches = sorted(glob.glob(path, recursive=True))
+        return matches if glob.has_magic(path) else [path]
+
+    def output_path(self, step, input_path):
+        if not step.output:
+            return None
+        stem, extension = os.path.splitext(os.path.basename(input_path))
+        path = os.path.join(self.base_dir, step.output.format(stem=stem, name=os.path.basename(input_path),
+                                                              ext=extension, step=step.id))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        return path
+
+    def submit(self, executor, step, input_paths):
+        """Queue one job, or replay its recorded outputs when it is up to date."""
+        params = dict(step.params)
+        output_path = self.output_path(step, input_paths[0] if len(input_paths) == 1 else step.id)
+        if output_path:
+            params["output_path"] = output_path
+        args = [input_paths] if step.fan_in else input_paths
+        signature = hashlib.sha256(json.dumps([step.operation, args, params], sort_keys=True,
+                                              default=str).encode("utf-8")).hexdigest()
+        label = f"{step.id}: {', '.join(input_paths) if len(input_paths) <= 3 else f'{len(input_paths)} files'}"
+        self.open_jobs[step.id] += 1
+        self.submitted += 1
+        sequence = self.submitted
+        recorded = self.state.get(signature)
+        if recorded and self.up_to_date(recorded):
+            print(f"[SKIPPED] {label} (up to date)")
+            self.counts["skipped"] += 1
+            self.job_done(executor, step, sequence, recorded["outputs"], True)
+            return
+        future = executor.submit(run_step_job, step.operation, args, params)
+        self.futures[future] = (step, sequence, input_paths, signature, label)
+
+    def up_to_date(self, recorded):
+        try:
+            return all(file_stamp(path) == stamp for path, stamp in recorded["files"].items())
+        except OSError:
+            return False
+
+    def start(self, executor, step_id):
+        """Start a step whose dependencies have all finished."""
+        step = self.steps[step_id]
+        self.started.add(step_id)
+        if any(dependency in self.failed for dependency in step.dependencies):
+            print(f"[SKIPPED] {step_id}: a dependency failed")
+            self.failed.add(step_id)
+            self.finish(executor, step_id)
+            return
+        input_paths = [path for value in step.inputs for path in self.resolve(value)]
+        # Up-to-date jobs complete inside submit(), so hold the step open until all are queued.
+        self.open_jobs[step_id] += 1
+        if step.fan_in:
+            if input_paths:
+                self.submit(executor, step, input_paths)
+        else:
+            for input_path in input_paths:
+                self.submit(executor, step, [input_path])
+        self.open_jobs[step_id] -= 1
+        self.check(executor, step_id)
+
+    def job_done(self, executor, step, sequence, output_paths, ok):
+        self.open_jobs[step.id] -= 1
+        if ok:
+            self.outputs[step.id][sequence] = output_paths
+            # Per-file consumers pick up each output as soon as it exists.
+            for dependent_id in self.dependents[step.id]:
+                dependent = self.steps[dependent_id]
+                if dependent.streamed and dependent_id in self.started:
+                    for output_path in output_paths:
+                        self.submit(executor, dependent, [output_path])
+        else:
+            self.failed.add(step.id)
+        self.check(executor, step.id)
+
+    def check(self, executor, step_id):
+        """Finish a step once it has started, its jobs are done and its feed (if any) has closed."""
+        step = self.steps[step_id]
+        if step_id in self.finished or step_id not in self.started or self.open_jobs[step_id]:
+            return
+        if step.streamed and step.references[0] not in self.finished:
+            return
+        self.finish(executor, step_id)
+
+    def finish(self, executor, step_id):
+        self.finished.add(step_id)
+        for dependent_id in self.dependents[step_id]:
+            dependent = self.steps[dependent_id]
+            if dependent.streamed:
+                if step_id in self.failed and dependent_id not in self.finished:
+                    self.failed.add(dependent_id)
+                    print(f"[SKIPPED] {dependent_id}: a dependency failed")
+                self.check(executor, dependent_id)
+            elif dependent_id not in self.started and all(dep in self.finished for dep in dependent.dependencies):
+                self.start(executor, dependent_id)
+
+    def run(self):
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Streamed steps are open from the start and receive upstream outputs as they appear.
+            self.started.update(step_id for step_id in self.order if self.steps[step_id].streamed)
+            for step_id in self.order:
+                if step_id not in self.started and not self.steps[step_id].dependencies:
+                    self.start(executor, step_id)
+
+            while self.futures:
+                done, _ = wait(self.futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, sequence, input_paths, signature, label = self.futures.pop(future)
+                    result = future.result()
+                    status = "OK" if result["ok"] else "FAILED"
+                    print(f"[{status}] {label} ({result['seconds']:.3f}s)")
+                    for line in result["message"].splitlines():
+                        print(f"    {line}")
+                    if result["ok"]:
+                        self.counts["ran"] += 1
+                        self.record(signature, input_paths, result["output_paths"])
+                    else:
+                        self.counts["failed"] += 1
+                    self.job_done(executor, step, sequence, result["output_paths"], result["ok"])
+        self.save_state()
+        return self.counts
+
+    def record(self, signature, input_paths, output_paths):
+        files = {}
+        for path in list(input_paths) + list(output_paths):
+            if os.path.exists(path):
+                files[path] = file_stamp(path)
+        self.state[signature] = {"outputs": output_paths, "files": files}
+
+    def save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            json.dump(self.state, state_file, indent=1)
+        os.replace(temp_path, self.state_path)
+
+def describe(steps: List[Step]) -> None:
+    """Print the execution plan of a manifest."""
+    for step in steps:
+        mode = "all inputs at once" if step.fan_in else "streamed per file" if step.streamed else "per file"
+        depends = f", after {', '.join(step.dependencies)}" if step.dependencies else ""
+        print(f"{step.id}: {step.operation} on {', '.join(step.inputs)} ({mode}{depends})")
+
+def run_manifest(args):
+    """Run (or describe) every step of a manifest."""
+    try:
+        manifest_path = os.path.abspath(args.manifest)
+        steps = parse_steps(load_manifest(manifest_path))
+    except Exception as e:
+        print(f"Error loading manifest: {e}")
+        return 1
+    if args.dry_run:
+        describe(steps)
+        return 0
+
+    state_path = args.state or manifest_path + ".state.json"
+    start = time.perf_counter()
+    runner = ManifestRunner(steps, os.path.dirname(manifest_path), state_path, args.workers, args.force)
+    counts = runner.run()
+    elapsed = time.perf_counter() - start
+    print(f"Ran {counts['ran']} jobs, skipped {counts['skipped']} up to date, "
+          f"{counts['failed']} failed in {elapsed:.2f}s.")
+    return 0 if not runner.failed else 1
+
+def add_manifest_arguments(parser):
+    """Register the run subcommand options on an argument parser."""
+    parser.add_argument("manifest", help="Manifest file (.toml or .json)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--force", action="store_true", help="Re-run every job even if its outputs are up to date")
+    parser.add_argument("--dry-run", action="store_true", help="Print the execution plan without running it")
+    parser.add_argument("--state", help="File recording completed jobs (default: <manifest>.state.json)")
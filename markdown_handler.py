@@ -1,99 +1,84 @@
 import os
-import markdown
 import subprocess
+from typing import Optional
+from results import OperationResult
 
-def convert_markdown_to_html(file_path):
+def convert_markdown_to_html(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Convert Markdown file to HTML."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as md_file:
-            text = md_file.read()
-        html = markdown.markdown(text)
-        html_file_path = os.path.splitext(file_path)[0] + ".html"
-        with open(html_file_path, 'w', encoding='utf-8') as html_file:
-            html_file.write(html)
-        print(f"Markdown converted to HTML successfully: {html_file_path}")
-    except Exception as e:
-        print(f"Error converting Markdown to HTML: {e}")
+    import markdown
+
+    with open(file_path, 'r', encoding='utf-8') as md_file:
+        text = md_file.read()
+    html = markdown.markdown(text)
+    html_file_path = output_path or os.path.splitext(file_path)[0] + ".html"
+    with open(html_file_path, 'w', encoding='utf-8') as html_file:
+        html_file.write(html)
+    return OperationResult("convert_markdown_to_html", file_path, [html_file_path],
+                           message=f"Markdown converted to HTML successfully: {html_file_path}")
 
-def extract_text_from_markdown(file_path):
+def extract_text_from_markdown(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Extract plain text from a Markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as md_file:
-            text = md_file.read()
-        plain_text = markdown.markdown(text, extensions=['markdown.extensions.extra'])
-        plain_text_file_path = os.path.splitext(file_path)[0] + "_extracted.txt"
-        with open(plain_text_file_path, 'w', encoding='utf-8') as text_file:
-            text_file.write(plain_text)
-        print(f"Text extracted from Markdown successfully: {plain_text_file_path}")
-    except Exception as e:
-        print(f"Error extracting text from Markdown: {e}")
+    import markdown
 
-def create_markdown_file(file_path):
+    with open(file_path, 'r', encoding='utf-8') as md_file:
+        text = md_file.read()
+    plain_text = markdown.markdown(text, extensions=['markdown.extensions.extra'])
+    plain_text_file_path = output_path or os.path.splitext(file_path)[0] + "_extracted.txt"
+    with open(plain_text_file_path, 'w', encoding='utf-8') as text_file:
+        text_file.write(plain_text)
+    return OperationResult("extract_text_from_markdown", file_path, [plain_text_file_path],
+                           message=f"Text extracted from Markdown successfully: {plain_text_file_path}")
+
+def create_markdown_file(file_path: str, content: str) -> OperationResult:
     """Create a new Markdown file."""
-    try:
-        content = input("Enter the content for the new Markdown file:\n")
-        with open(file_path, 'w', encoding='utf-8') as md_file:
-            md_file.write(content)
-        print(f"Markdown file created successfully: {file_path}")
-    except Exception as e:
-        print(f"Error creating Markdown file: {e}")
+    with open(file_path, 'w', encoding='utf-8') as md_file:
+        md_file.write(content)
+    return OperationResult("create_markdown_file", file_path, [file_path],
+                           message=f"Markdown file created successfully: {file_path}")
 
-def lint_markdown_file(file_path):
+def lint_markdown_file(file_path: str) -> OperationResult:
     """Lint a Markdown file using tldr-lint."""
     try:
         result = subprocess.run(['tldr-lint', file_path], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("Linting successful. No issues found.")
-        else:
-            print("Linting issues found:")
-            print(result.stdout)
-            print(result.stderr)
     except FileNotFoundError:
-        print("tldr-lint is not installed. Please install it to use this feature.")
-    except Exception as e:
-        print(f"Error linting Markdown file: {e}")
+        raise RuntimeError("tldr-lint is not installed. Please install it to use this feature.")
+    if result.returncode == 0:
+        message = "Linting successful. No issues found."
+    else:
+        message = "\n".join(["Linting issues found:", result.stdout, result.stderr])
+    return OperationResult("lint_markdown_file", file_path,
+                           data={"passed": result.returncode == 0, "stdout": result.stdout, "stderr": result.stderr},
+                           message=message)
 
-def preview_markdown(file_path):
+def preview_markdown(file_path: str) -> OperationResult:
     """Preview the Markdown file content."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as md_file:
-            text = md_file.read()
-        print("Markdown Preview:")
-        print(text)
-    except Exception as e:
-        print(f"Error previewing Markdown file: {e}")
+    with open(file_path, 'r', encoding='utf-8') as md_file:
+        text = md_file.read()
+    return OperationResult("preview_markdown", file_path, data={"text": text},
+                           message="Markdown Preview:\n" + text)
 
-def count_words_in_markdown(file_path):
+def count_words_in_markdown(file_path: str) -> OperationResult:
     """Count the number of words in the Markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as md_file:
-            text = md_file.read()
-        word_count = len(text.split())
-        print(f"Word count: {word_count}")
-    except Exception as e:
-        print(f"Error counting words in Markdown file: {e}")
+    with open(file_path, 'r', encoding='utf-8') as md_file:
+        text = md_file.read()
+    word_count = len(text.split())
+    return OperationResult("count_words_in_markdown", file_path, data={"word_count": word_count},
+                           message=f"Word count: {word_count}")
 
-def list_headings_in_markdown(file_path):
+def list_headings_in_markdown(file_path: str) -> OperationResult:
     """List all headings in the Markdown file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as md_file:
-            text = md_file.readlines()
-        headings = [line.strip() for line in text if line.startswith('#')]
-        print("Headings found in the Markdown file:")
-        for heading in headings:
-            print(heading)
-    except Exception as e:
-        print(f"Error listing headings in Markdown file: {e}")
+    with open(file_path, 'r', encoding='utf-8') as md_file:
+        text = md_file.readlines()
+    headings = [line.strip() for line in text if line.startswith('#')]
+    return OperationResult("list_headings_in_markdown", file_path, data={"headings": headings},
+                           message="\n".join(["Headings found in the Markdown file:"] + headings))
 
-def append_content_to_markdown(file_path):
+def append_content_to_markdown(file_path: str, content: str) -> OperationResult:
     """Append content to an existing Markdown file."""
-    try:
-        content = input("Enter the content to append to the Markdown file:\n")
-        with open(file_path, 'a', encoding='utf-8') as md_file:
-            md_file.write("\n" + content)
-        print(f"Content appended successfully to: {file_path}")
-    except Exception as e:
-        print(f"Error appending content to Markdown file: {e}")
+    with open(file_path, 'a', encoding='utf-8') as md_file:
+        md_file.write("\n" + content)
+    return OperationResult("append_content_to_markdown", file_path, [file_path],
+                           message=f"Content appended successfully to: {file_path}")
 
 def handle_markdown(file_path):
     """Handle Markdown file operations."""
@@ -107,21 +92,47 @@ def handle_markdown(file_path):
     print("8. Append Content to Markdown File")
     choice = input("Select option: ")
     if choice == "1":
-        convert_markdown_to_html(file_path)
+        try:
+            print(convert_markdown_to_html(file_path).message)
+        except Exception as e:
+            print(f"Error converting Markdown to HTML: {e}")
     elif choice == "2":
-        extract_text_from_markdown(file_path)
+        try:
+            print(extract_text_from_markdown(file_path).message)
+        except Exception as e:
+            print(f"Error extracting text from Markdown: {e}")
     elif choice == "3":
-        new_file_path = input("Enter the new Markdown file path: ")
-        create_markdown_file(new_file_path)
+        try:
+            new_file_path = input("Enter the new Markdown file path: ")
+            content = input("Enter the content for the new Markdown file:\n")
+            print(create_markdown_file(new_file_path, content).message)
+        except Exception as e:
+            print(f"Error creating Markdown file: {e}")
     elif choice == "4":
-        lint_markdown_file(file_path)
+        try:
+            print(lint_markdown_file(file_path).message)
+        except Exception as e:
+            print(f"Error linting Markdown file: {e}")
     elif choice == "5":
-        preview_markdown(file_path)
+        try:
+            print(preview_markdown(file_path).message)
+        except Exception as e:
+            print(f"Error previewing Markdown file: {e}")
     elif choice == "6":
-        count_words_in_markdown(file_path)
+        try:
+            print(count_words_in_markdown(file_path).message)
+        except Exception as e:
+            print(f"Error counting words in Markdown file: {e}")
     elif choice == "7":
-        list_headings_in_markdown(file_path)
+        try:
+            print(list_headings_in_markdown(file_path).message)
+        except Exception as e:
+            print(f"Error listing headings in Markdown file: {e}")
     elif choice == "8":
-        append_content_to_markdown(file_path)
+        try:
+            content = input("Enter the content to append to the Markdown file:\n")
+            print(append_content_to_markdown(file_path, content).message)
+        except Exception as e:
+            print(f"Error appending content to Markdown file: {e}")
     else:
         print("Invalid option selected.")
@@ -0,0 +1,307 @@
+"""Streaming text-to-PDF rendering with wrapping and pagination.
+
+Lines are read one at a time, wrapped to the text width of the page and
+drawn with the reportlab canvas. A reportlab canvas keeps every finished page
+in memory until it is saved, so documents are rendered in segments of
+``SEGMENT_PAGES`` pages, each saved to its own part file, and the parts are
+then stitched into one PDF by copying their objects with renumbered
+references. Memory use is bounded by one segment regardless of the number of
+pages.
+
+Segments are independent, so they can also be rendered in parallel: a quick
+first pass works out where each segment starts (a byte offset, plus the
+number of wrapped rows of that line already on the previous page) without
+drawing anything, and worker processes render the segments from there. The
+result is identical to rendering them one after another.
+"""
+import bisect
+import os
+import re
+import shutil
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+SEGMENT_PAGES = 500
+# Files smaller than this are rendered in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+TAB_SIZE = 8
+
+OBJECT_REF = re.compile(rb"(\d+) 0 R\b")
+STREAM_START = re.compile(rb">>\s*stream\r?\n")
+
+class Layout:
+    """Page geometry and line wrapping for one font, size and page size."""
+
+    def __init__(self, font="Courier", font_size=10.0, margin=54.0, page_size="letter", landscape=False,
+                 leading=None):
+        from reportlab.lib import pagesizes
+        from reportlab.pdfbase import pdfmetrics
+
+        try:
+            pdfmetrics.getFont(font)
+        except KeyError:
+            raise ValueError(f"Unknown font: {font}") from None
+        size = getattr(pagesizes, page_size, None) or getattr(pagesizes, page_size.upper(), None)
+        if not isinstance(size, tuple):
+            raise ValueError(f"Unknown page size: {page_size}")
+        self.width, self.height = pagesizes.landscape(size) if landscape else pagesizes.portrait(size)
+        self.font = font
+        self.font_size = font_size
+        self.margin = margin
+        self.leading = leading or font_size * 1.2
+        self.text_width = self.width - 2 * margin
+        self.rows = int((self.height - 2 * margin - font_size) // self.leading) + 1
+        if self.text_width <= 0 or self.rows < 1:
+            raise ValueError("The margins leave no room for text on the page.")
+        # Monospaced fonts fit a fixed number of characters on a row, without measuring each line.
+        char_width = pdfmetrics.stringWidth("M", font, font_size)
+        self.columns = (max(1, int(self.text_width // char_width))
+                        if pdfmetrics.stringWidth("i", font, font_size) == char_width else None)
+        # Other fonts are measured per character; standard PDF fonts have no kerning.
+        self.char_widths = {}
+
+    def string_width(self, text):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        return stringWidth(text, self.font, self.font_size)
+
+    def text(self, raw):
+        """Decode one raw line for drawing."""
+        return raw.rstrip(b"\r\n").decode("utf-8", "replace").expandtabs(TAB_SIZE)
+
+    def wrap(self, text):
+        """Split a line into the rows it occupies on the page (at least one).
+
+        Rows break after the last space that fits; only a word longer than a
+        whole row is cut.
+        """
+        if self.columns is None:
+            widths = self.char_widths
+            for char in set(text).difference(widths):
+                widths[char] = self.string_width(char)
+            cumulative = list(accumulate(widths[char] for char in text))
+        rows = []
+        start = 0
+        while True:
+            # End of the longest run of characters from ``start`` that fits.
+            if self.columns is not None:
+                end = start + self.columns
+            else:
+                used = cumulative[start - 1] if start else 0.0
+                end = max(bisect.bisect_right(cumulative, used + self.text_width), start + 1)
+            if end >= len(text):
+                break
+            # A space right after the run may hang past the margin; it is invisible.
+            space = text.rfind(" ", start, end + 1)
+            cut = space + 1 if space > start else end
+            rows.append(text[start:cut])
+            start = cut
+        rows.append(text[start:])
+        return rows
+
+    def row_count(self, text):
+        if self.columns is not None and " " not in text:
+            return max(1, -(-len(text) // self.columns))
+        return len(self.wrap(text))
+
+def iter_rows(file_path, layout, offset=0, skip=0):
+    """Yield ``(row, position after it)`` from ``offset``, skipping the first ``skip`` rows of that line.
+
+    A position is ``(byte offset of a line, rows of it already drawn)``.
+    """
+    with open(file_path, "rb") as file:
+        file.seek(offset)
+        for raw in file:
+            rows = layout.wrap(layout.text(raw))
+            end = offset + len(raw)
+            for index in range(skip, len(rows)):
+                yield rows[index], (end, 0) if index == len(rows) - 1 else (offset, index + 1)
+            skip = 0
+            offset = end
+
+def render_segment(file_path, output_path, layout, offset=0, skip=0, max_pages=SEGMENT_PAGES):
+    """Render up to ``max_pages`` pages starting at a position into a PDF.
+
+    Returns ``(pages, position after the last page)``; the position is None
+    at the end of the file.
+    """
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(output_path, pagesize=(layout.width, layout.height), pageCompression=1)
+    pages = 0
+    rows = []
+
+    def draw_page():
+        text = pdf.beginText(layout.margin, layout.height - layout.margin - layout.font_size)
+        text.setFont(layout.font, layout.font_size, layout.leading)
+        for row in rows:
+            text.textLine(row)
+        pdf.drawText(text)
+        pdf.showPage()
+
+    size = os.path.getsize(file_path)
+    position = None
+    for row, position in iter_rows(file_path, layout, offset, skip):
+        rows.append(row)
+        if len(rows) == layout.rows:
+            draw_page()
+            pages += 1
+            rows = []
+            if pages == max_pages:
+                break
+    else:
+        if rows or not pages:
+            draw_page()
+            pages += 1
+    pdf.save()
+    return pages, None if position is None or position == (size, 0) else position
+
+def segment_starts(file_path, layout, segment_pages=SEGMENT_PAGES):
+    """Positions at which each segment of ``segment_pages`` pages starts, found without drawing."""
+    per_segment = layout.rows * segment_pages
+    starts = [(0, 0)]
+    filled = 0
+    offset = 0
+    with open(file_path, "rb") as file:
+        for raw in file:
+            count = layout.row_count(layout.text(raw))
+            skip = 0
+            while count - skip > per_segment - filled:
+                skip += per_segment - filled
+                starts.append((offset, skip))
+                filled = 0
+            filled += count - skip
+            offset += len(raw)
+            if filled == per_segment:
+                starts.append((offset, 0))
+                filled = 0
+    if len(starts) > 1 and starts[-1] == (offset, 0):
+        starts.pop()
+    return starts
+
+class PdfWriter:
+    """Writes numbered PDF objects to a file and the cross-reference table at the end."""
+
+    def __init__(self, file):
+        self.file = file
+        self.offsets = array("Q")
+        self.position = 0
+        self.write(b"%PDF-1.3\n%\x93\x8c\x8b\x9e\n")
+
+    def write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        """Allocate the next object number; its offset is filled in when the object is written."""
+        self.offsets.append(0)
+        return len(self.offsets)
+
+    def add(self, number, body):
+        self.offsets[number - 1] = self.position
+        self.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def close(self, root):
+        xref = self.position
+        self.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.offsets) + 1))
+        self.write(b"".join(b"%010d 00000 n \n" % offset for offset in self.offsets))
+        self.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                   % (len(self.offsets) + 1, root, xref))
+
+def part_objects(data):
+    """Parse a reportlab PDF: returns ``({number: body}, pages root number, page count)``.
+
+    reportlab writes a plain cross-reference table and no object streams, so
+    each object spans from its offset to the next one.
+    """
+    xref = int(data[data.rindex(b"startxref") + 9:].split()[0])
+    lines = data[xref:data.index(b"trailer", xref)].split(b"\n")
+    entries = [line.split() for line in lines[2:] if line.strip()]
+    offsets = {number: int(entry[0]) for number, entry in enumerate(entries) if entry[2] == b"n"}
+    starts = sorted(offsets.values())
+    ends = dict(zip(starts, starts[1:] + [xref]))
+    objects = {}
+    for number, start in offsets.items():
+        body = data[start:ends[start]]
+        objects[number] = body[body.index(b" obj") + 4:body.rindex(b"endobj")].strip()
+    trailer = data[data.index(b"trailer", xref):]
+    catalog = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+    info = re.search(rb"/Info (\d+) 0 R", trailer)
+    pages_root = int(re.search(rb"/Pages (\d+) 0 R", objects[catalog]).group(1))
+    count = int(re.search(rb"/Count (\d+)", objects[pages_root]).group(1))
+    for number in (catalog, int(info.group(1)) if info else None):
+        objects.pop(number, None)
+    return objects, pages_root, count
+
+def merge_parts(part_paths, output_path):
+    """Stitch PDFs written by ``render_segment`` into one, reading one part at a time. Returns the page count."""
+    with open(output_path, "wb") as output:
+        writer = PdfWriter(output)
+        root = writer.reserve()
+        catalog = writer.reserve()
+        kids = []
+        total = 0
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                objects, pages_root, count = part_objects(part.read())
+            numbers = {number: writer.reserve() for number in sorted(objects)}
+            renumber = lambda match: b"%d 0 R" % numbers[int(match.group(1))]
+            for number in sorted(objects):
+                body = objects[number]
+                match = STREAM_START.search(body)
+                head, stream = (body[:match.start()], body[match.start():]) if match else (body, b"")
+                head = OBJECT_REF.sub(renumber, head)
+                if number == pages_root:
+                    # The part's page tree becomes a subtree of the merged document's.
+                    head = head.replace(b"<<", b"<< /Parent %d 0 R" % root, 1)
+                writer.add(numbers[number], head + stream)
+            kids.append(numbers[pages_root])
+            total += count
+        writer.add(root, b"<< /Type /Pages /Count %d /Kids [ %s ] >>"
+                   % (total, b" ".join(b"%d 0 R" % kid for kid in kids)))
+        writer.add(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % root)
+        writer.close(catalog)
+    return total
+
+def render_file(file_path, output_path, layout, workers=None, segment_pages=SEGMENT_PAGES):
+    """Render a text file to a PDF, in parallel page ranges for large files.
+
+    Returns statistics: pages, segments, workers, seconds and pages per second.
+    """
+    start_time = time.perf_counter()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parallel = workers > 1 and os.path.getsize(file_path) >= PARALLEL_THRESHOLD
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    temp_dir = tempfile.mkdtemp(prefix=".uft-pdf-", dir=output_dir)
+    try:
+        part_path = lambda index: os.path.join(temp_dir, f"part{index:06d}.pdf")
+        if parallel:
+            starts = segment_starts(file_path, layout, segment_pages)
+            part_paths = [part_path(index) for index in range(len(starts))]
+            with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+                futures = [executor.submit(render_segment, file_path, path, layout, offset, skip, segment_pages)
+                           for path, (offset, skip) in zip(part_paths, starts)]
+                pages = sum(future.result()[0] for future in futures)
+        else:
+            part_paths = []
+            pages = 0
+            position = (0, 0)
+            while position is not None:
+                part_paths.append(part_path(len(part_paths)))
+                count, position = render_segment(file_path, part_paths[-1], layout, *position, segment_pages)
+                pages += count
+        merged_path = part_path(len(part_paths))
+        if len(part_paths) == 1:
+            os.replace(part_paths[0], merged_path)
+        else:
+            merge_parts(part_paths, merged_path)
+        os.replace(merged_path, output_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start_time
+    return {"pages": pages, "segments": len(part_paths), "workers": min(workers, len(part_paths)) if parallel else 1,
+            "seconds": elapsed, "pages_per_s": pages / elapsed if elapsed > 0 else 0.0}
@@ -1,202 +1,187 @@
 import os
+from typing import List, Optional
 from PyPDF2 import PdfReader, PdfWriter
-from pdf2image import convert_from_path
+from results import OperationResult
+import tracing
 
-def pdf_to_text(file_path):
+def pdf_to_text(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Convert PDF to text."""
-    try:
+    with tracing.phase("decode"):
         reader = PdfReader(file_path)
         text = ""
         for page in reader.pages:
             text += page.extract_text()
-        text_file_path = os.path.splitext(file_path)[0] + ".txt"
-        with open(text_file_path, "w") as text_file:
-            text_file.write(text)
-        print("PDF converted to text successfully.")
-    except Exception as e:
-        print(f"Error converting PDF to text: {e}")
-
-def merge_pdfs(output_path, *input_files):
-    """Merge multiple PDF files into one."""
-    try:
-        writer = PdfWriter()
-        for file_path in input_files:
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                writer.add_page(page)
-        with open(output_path, "wb") as output_pdf:
-            writer.write(output_pdf)
-        print(f"PDFs merged successfully into {output_path}.")
-    except Exception as e:
-        print(f"Error merging PDFs: {e}")
+    text_file_path = output_path or os.path.splitext(file_path)[0] + ".txt"
+    with tracing.phase("io"), open(text_file_path, "w") as text_file:
+        text_file.write(text)
+    return OperationResult("pdf_to_text", file_path, [text_file_path], {"pages": len(reader.pages)},
+                           "PDF converted to text successfully.")
 
-def split_pdf(file_path):
-    """Split a PDF file into individual pages."""
-    try:
+def merge_pdfs(output_path: str, *input_files: str) -> OperationResult:
+    """Merge multiple PDF files into one."""
+    writer = PdfWriter()
+    for file_path in input_files:
         reader = PdfReader(file_path)
-        for i, page in enumerate(reader.pages):
-            writer = PdfWriter()
+        for page in reader.pages:
             writer.add_page(page)
-            output_path = os.path.splitext(file_path)[0] + f"_page_{i + 1}.pdf"
-            with open(output_path, "wb") as output_pdf:
-                writer.write(output_pdf)
-        print("PDF split successfully.")
-    except Exception as e:
-        print(f"Error splitting PDF: {e}")
-
-def extract_pages(file_path):
-    """Extract specific pages from a PDF."""
-    try:
-        reader = PdfReader(file_path)
-        writer = PdfWriter()
-        pages = input("Enter page numbers to extract (comma-separated, e.g., 1,3,5): ")
-        pages = [int(p) - 1 for p in pages.split(",")]
-        for page_num in pages:
-            writer.add_page(reader.pages[page_num])
-        output_path = os.path.splitext(file_path)[0] + "_extracted.pdf"
-        with open(output_path, "wb") as output_pdf:
-            writer.write(output_pdf)
-        print("Pages extracted successfully.")
-    except Exception as e:
-        print(f"Error extracting pages: {e}")
+    with open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("merge_pdfs", ",".join(input_files), [output_path], {"files": len(input_files)},
+                           f"PDFs merged successfully into {output_path}.")
 
-def rotate_pages(file_path):
-    """Rotate specific pages in a PDF."""
-    try:
+def split_pdf(file_path: str) -> OperationResult:
+    """Split a PDF file into individual pages."""
+    with tracing.phase("decode"):
         reader = PdfReader(file_path)
+    output_paths = []
+    for i, page in enumerate(reader.pages):
         writer = PdfWriter()
-        pages = input("Enter page numbers to rotate (comma-separated, e.g., 1,3,5): ")
-        pages = [int(p) - 1 for p in pages.split(",")]
-        angle = int(input("Enter angle to rotate (90, 180, 270): "))
-        for i, page in enumerate(reader.pages):
-            if i in pages:
-                page.rotate_clockwise(angle)
-            writer.add_page(page)
-        output_path = os.path.splitext(file_path)[0] + "_rotated.pdf"
-        with open(output_path, "wb") as output_pdf:
+        writer.add_page(page)
+        output_path = os.path.splitext(file_path)[0] + f"_page_{i + 1}.pdf"
+        with tracing.phase("encode", page=i + 1), open(output_path, "wb") as output_pdf:
             writer.write(output_pdf)
-        print("Pages rotated successfully.")
-    except Exception as e:
-        print(f"Error rotating pages: {e}")
+        output_paths.append(output_path)
+    return OperationResult("split_pdf", file_path, output_paths, {"pages": len(output_paths)},
+                           "PDF split successfully.")
+
+def extract_pages(file_path: str, pages: List[int], output_path: Optional[str] = None) -> OperationResult:
+    """Extract specific pages (1-based) from a PDF."""
+    reader = PdfReader(file_path)
+    writer = PdfWriter()
+    for page_num in pages:
+        writer.add_page(reader.pages[page_num - 1])
+    output_path = output_path or os.path.splitext(file_path)[0] + "_extracted.pdf"
+    with open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("extract_pages", file_path, [output_path], {"pages": list(pages)},
+                           "Pages extracted successfully.")
 
-def compress_pdf(file_path):
+def rotate_pages(file_path: str, pages: List[int], angle: int, output_path: Optional[str] = None) -> OperationResult:
+    """Rotate specific pages (1-based) in a PDF."""
+    reader = PdfReader(file_path)
+    writer = PdfWriter()
+    indexes = {page_num - 1 for page_num in pages}
+    for i, page in enumerate(reader.pages):
+        if i in indexes:
+            page.rotate(angle)
+        writer.add_page(page)
+    output_path = output_path or os.path.splitext(file_path)[0] + "_rotated.pdf"
+    with open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("rotate_pages", file_path, [output_path], {"pages": list(pages), "angle": angle},
+                           "Pages rotated successfully.")
+
+def compress_pdf(file_path: str, output_path: Optional[str] = None) -> OperationResult:
     """Compress a PDF by reducing its quality."""
-    try:
+    with tracing.phase("decode"):
         reader = PdfReader(file_path)
         writer = PdfWriter()
         for page in reader.pages:
             writer.add_page(page)
-        writer.add_metadata(reader.metadata)
-        output_path = os.path.splitext(file_path)[0] + "_compressed.pdf"
-        with open(output_path, "wb") as output_pdf:
-            writer.write(output_pdf)
-        print(f"PDF compressed successfully into {output_path}.")
-    except Exception as e:
-        print(f"Error compressing PDF: {e}")
+        if reader.metadata:
+            writer.add_metadata(reader.metadata)
+    output_path = output_path or os.path.splitext(file_path)[0] + "_compressed.pdf"
+    with tracing.phase("encode"), open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("compress_pdf", file_path, [output_path],
+                           message=f"PDF compressed successfully into {output_path}.")
 
-def add_watermark(input_pdf_path, watermark_pdf_path, output_pdf_path):
+def add_watermark(input_pdf_path: str, watermark_pdf_path: str, output_pdf_path: str) -> OperationResult:
     """Add a watermark to each page of a PDF."""
-    try:
-        reader = PdfReader(input_pdf_path)
-        watermark = PdfReader(watermark_pdf_path)
-        writer = PdfWriter()
+    reader = PdfReader(input_pdf_path)
+    watermark = PdfReader(watermark_pdf_path)
+    writer = PdfWriter()
 
-        for page in reader.pages:
-            page.merge_page(watermark.pages[0])
-            writer.add_page(page)
+    for page in reader.pages:
+        page.merge_page(watermark.pages[0])
+        writer.add_page(page)
 
-        with open(output_pdf_path, "wb") as output_pdf:
-            writer.write(output_pdf)
-        print(f"Watermark added successfully to {output_pdf_path}.")
-    except Exception as e:
-        print(f"Error adding watermark: {e}")
+    with open(output_pdf_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("add_watermark", input_pdf_path, [output_pdf_path],
+                           message=f"Watermark added successfully to {output_pdf_path}.")
 
-def search_text_in_pdf(file_path):
+def search_text_in_pdf(file_path: str, search_text: str) -> OperationResult:
     """Search for specific text in a PDF and return the pages where it is found."""
-    try:
-        reader = PdfReader(file_path)
-        search_text = input("Enter text to search for: ")
-        found_pages = []
-
-        for i, page in enumerate(reader.pages):
-            text = page.extract_text()
-            if text and search_text in text:
-                found_pages.append(i + 1)
-
-        if found_pages:
-            print(f"Text found on pages: {', '.join(map(str, found_pages))}")
-        else:
-            print("Text not found in the PDF.")
-    except Exception as e:
-        print(f"Error searching text in PDF: {e}")
-
-def extract_images_from_pdf(file_path):
+    reader = PdfReader(file_path)
+    found_pages = []
+
+    for i, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text and search_text in text:
+            found_pages.append(i + 1)
+
+    if found_pages:
+        message = f"Text found on pages: {', '.join(map(str, found_pages))}"
+    else:
+        message = "Text not found in the PDF."
+    return OperationResult("search_text_in_pdf", file_path, data={"pages": found_pages}, message=message)
+
+def extract_images_from_pdf(file_path: str) -> OperationResult:
     """Extract images from a PDF and save them as separate files."""
-    try:
-        reader = PdfReader(file_path)
-        image_count = 0
-
-        for i, page in enumerate(reader.pages):
-            images = page.images
-            for img_index, img in enumerate(images):
-                image_count += 1
-                image_data = img.data
-                image_file_path = os.path.splitext(file_path)[0] + f"_image_{image_count}.png"
-                with open(image_file_path, "wb") as img_file:
-                    img_file.write(image_data)
-                print(f"Extracted image saved as {image_file_path}.")
-
-        if image_count == 0:
-            print("No images found in the PDF.")
-    except Exception as e:
-        print(f"Error extracting images from PDF: {e}")
-
-def convert_pdf_to_image(file_path):
+    reader = PdfReader(file_path)
+    output_paths = []
+    messages = []
+
+    for page in reader.pages:
+        for img in page.images:
+            image_file_path = os.path.splitext(file_path)[0] + f"_image_{len(output_paths) + 1}.png"
+            with open(image_file_path, "wb") as img_file:
+                img_file.write(img.data)
+            output_paths.append(image_file_path)
+            messages.append(f"Extracted image saved as {image_file_path}.")
+
+    if not output_paths:
+        messages.append("No images found in the PDF.")
+    return OperationResult("extract_images_from_pdf", file_path, output_paths, {"images": len(output_paths)},
+                           "\n".join(messages))
+
+def convert_pdf_to_image(file_path: str) -> OperationResult:
     """Convert each page of a PDF to an image."""
-    try:
+    from pdf2image import convert_from_path
+
+    with tracing.phase("decode") as details:
         images = convert_from_path(file_path)
-        image_count = 0
-        for i, image in enumerate(images):
-            image_count += 1
-            image_file_path = os.path.splitext(file_path)[0] + f"_page_{image_count}.png"
+        details["pages"] = len(images)
+    output_paths = []
+    messages = []
+    for i, image in enumerate(images):
+        image_file_path = os.path.splitext(file_path)[0] + f"_page_{i + 1}.png"
+        with tracing.phase("encode", page=i + 1):
             image.save(image_file_path, "PNG")
-            print(f"Converted page {i + 1} to image: {image_file_path}.")
-    except Exception as e:
-        print(f"Error converting PDF to image: {e}")
+        output_paths.append(image_file_path)
+        messages.append(f"Converted page {i + 1} to image: {image_file_path}.")
+    return OperationResult("convert_pdf_to_image", file_path, output_paths, {"pages": len(output_paths)},
+                           "\n".join(messages))
 
-def merge_pdf_with_password(output_path, password, *input_files):
+def merge_pdf_with_password(output_path: str, password: str, *input_files: str) -> OperationResult:
     """Merge multiple PDF files into one with password protection."""
-    try:
-        writer = PdfWriter()
-        for file_path in input_files:
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                writer.add_page(page)
-        writer.encrypt(password)
-        with open(output_path, "wb") as output_pdf:
-            writer.write(output_pdf)
-        print(f"PDFs merged successfully into {output_path} with password protection.")
-    except Exception as e:
-        print(f"Error merging PDFs with password: {e}")
+    writer = PdfWriter()
+    for file_path in input_files:
+        reader = PdfReader(file_path)
+        for page in reader.pages:
+            writer.add_page(page)
+    writer.encrypt(password)
+    with open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("merge_pdf_with_password", ",".join(input_files), [output_path],
+                           {"files": len(input_files)},
+                           f"PDFs merged successfully into {output_path} with password protection.")
 
-def remove_password_from_pdf(file_path):
+def remove_password_from_pdf(file_path: str, password: str, output_path: Optional[str] = None) -> OperationResult:
     """Remove password protection from a PDF."""
-    try:
-        password = input("Enter the password to unlock the PDF: ")
-        reader = PdfReader(file_path)
-        if reader.is_encrypted:
-            reader.decrypt(password)
-            output_path = os.path.splitext(file_path)[0] + "_unlocked.pdf"
-            writer = PdfWriter()
-            for page in reader.pages:
-                writer.add_page(page)
-            with open(output_path, "wb") as output_pdf:
-                writer.write(output_pdf)
-            print(f"Password removed successfully. Unlocked PDF saved as {output_path}.")
-        else:
-            print("The PDF is not password protected.")
-    except Exception as e:
-        print(f"Error removing password from PDF: {e}")
+    reader = PdfReader(file_path)
+    if not reader.is_encrypted:
+        return OperationResult("remove_password_from_pdf", file_path, message="The PDF is not password protected.")
+    reader.decrypt(password)
+    output_path = output_path or os.path.splitext(file_path)[0] + "_unlocked.pdf"
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    with open(output_path, "wb") as output_pdf:
+        writer.write(output_pdf)
+    return OperationResult("remove_password_from_pdf", file_path, [output_path],
+                           message=f"Password removed successfully. Unlocked PDF saved as {output_path}.")
 
 def handle_pdf(file_path):
     print("1. Convert PDF to Text")
@@ -213,38 +198,76 @@ def handle_pdf(file_path):
     print("12. Remove Password from PDF")
     choice = input("Select option: ")
     if choice == "1":
-        pdf_to_text(file_path)
+        try:
+            print(pdf_to_text(file_path).message)
+        except Exception as e:
+            print(f"Error converting PDF to text: {e}")
     elif choice == "2":
-        output_path = input("Enter output file path for merged PDF: ")
-        input_files = input("Enter input PDF files to merge (comma-separated): ").split(",")
-        merge_pdfs(output_path, *input_files)
+        try:
+            output_path = input("Enter output file path for merged PDF: ")
+            input_files = input("Enter input PDF files to merge (comma-separated): ").split(",")
+            print(merge_pdfs(output_path, *[f.strip() for f in input_files]).message)
+        except Exception as e:
+            print(f"Error merging PDFs: {e}")
     elif choice == "3":
-        split_pdf(file_path)
+        try:
+            print(split_pdf(file_path).message)
+        except Exception as e:
+            print(f"Error splitting PDF: {e}")
     elif choice == "4":
-        extract_pages(file_path)
+        try:
+            pages = input("Enter page numbers to extract (comma-separated, e.g., 1,3,5): ")
+            print(extract_pages(file_path, [int(p) for p in pages.split(",")]).message)
+        except Exception as e:
+            print(f"Error extracting pages: {e}")
     elif choice == "5":
-        rotate_pages(file_path)
+        try:
+            pages = input("Enter page numbers to rotate (comma-separated, e.g., 1,3,5): ")
+            angle = int(input("Enter angle to rotate (90, 180, 270): "))
+            print(rotate_pages(file_path, [int(p) for p in pages.split(",")], angle).message)
+        except Exception as e:
+            print(f"Error rotating pages: {e}")
     elif choice == "6":
-        compress_pdf(file_path)
+        try:
+            print(compress_pdf(file_path).message)
+        except Exception as e:
+            print(f"Error compressing PDF: {e}")
     elif choice == "7":
-        watermark_pdf_path = input("Enter watermark PDF file path: ")
-        output_path = input("Enter output file path for watermarked PDF: ")
-        add_watermark(file_path, watermark_pdf_path, output_path)
+        try:
+            watermark_pdf_path = input("Enter watermark PDF file path: ")
+            output_path = input("Enter output file path for watermarked PDF: ")
+            print(add_watermark(file_path, watermark_pdf_path, output_path).message)
+        except Exception as e:
+            print(f"Error adding watermark: {e}")
     elif choice == "8":
-        search_text_in_pdf(file_path)
+        try:
+            search_text = input("Enter text to search for: ")
+            print(search_text_in_pdf(file_path, search_text).message)
+        except Exception as e:
+            print(f"Error searching text in PDF: {e}")
     elif choice == "9":
-        extract_images_from_pdf(file_path)
+        try:
+            print(extract_images_from_pdf(file_path).message)
+        except Exception as e:
+            print(f"Error extracting images from PDF: {e}")
     elif choice == "10":
-        convert_pdf_to_image(file_path)
+        try:
+            print(convert_pdf_to_image(file_path).message)
+        except Exception as e:
+            print(f"Error converting PDF to image: {e}")
     elif choice == "11":
-        output_path = input("Enter output file path for merged PDF with password: ")
-        password = input("Enter password for the merged PDF: ")
-        input_files = input("Enter input PDF files to merge (comma-separated): ").split(",")
-        merge_pdf_with_password(output_path, password, *input_files)
+        try:
+            output_path = input("Enter output file path for merged PDF with password: ")
+            password = input("Enter password for the merged PDF: ")
+            input_files = input("Enter input PDF files to merge (comma-separated): ").split(",")
+            print(merge_pdf_with_password(output_path, password, *[f.strip() for f in input_files]).message)
+        except Exception as e:
+            print(f"Error merging PDFs with password: {e}")
     elif choice == "12":
-        remove_password_from_pdf(file_path)
+        try:
+            password = input("Enter the password to unlock the PDF: ")
+            print(remove_password_from_pdf(file_path, password).message)
+        except Exception as e:
+            print(f"Error removing password from PDF: {e}")
     else:
         print("Invalid option selected.")
-
-# Example usage:
-# handle_pdf("path_to_your_pdf_file.pdf")
@@ -0,0 +1,157 @@
+import importlib
+import inspect
+import json
+import os
+import typing
+from typing import Any, List, Union
+import tracing
+
+# Extension -> (handler module, menu function). Modules are only imported when
+# a file of that type is actually processed, so e.g. counting lines in a .txt
+# never pays for moviepy or PyPDF2.
+HANDLER_MODULES = {
+    ".jpg": ("image_handler", "handle_image"),
+    ".jpeg": ("image_handler", "handle_image"),
+    ".png": ("image_handler", "handle_image"),
+    ".bmp": ("image_handler", "handle_image"),
+    ".gif": ("image_handler", "handle_image"),
+    ".pdf": ("pdf_handler", "handle_pdf"),
+    ".txt": ("text_handler", "handle_text"),
+    ".mp4": ("video_handler", "handle_video"),
+    ".avi": ("video_handler", "handle_video"),
+    ".mov": ("video_handler", "handle_video"),
+    ".mkv": ("video_handler", "handle_video"),
+    ".md": ("markdown_handler", "handle_markdown"),
+    ".csv": ("csv_handler", "handle_csv"),
+    ".json": ("json_handler", "handle_json"),
+}
+
+# Prompt-free operations exposed by each handler module. Every one of them takes
+# explicit arguments and returns a results.OperationResult.
+MODULE_OPERATIONS = {
+    "image_handler": (
+        "get_image_info", "resize_image", "convert_image", "rotate_image", "flip_image",
+        "grayscale_image", "crop_image", "compress_image", "adjust_brightness", "adjust_contrast",
+        "add_border", "create_thumbnail", "overlay_text", "add_image_to_pdf", "apply_pipeline",
+    ),
+    "pdf_handler": (
+        "pdf_to_text", "merge_pdfs", "split_pdf", "extract_pages", "rotate_pages", "compress_pdf",
+        "add_watermark", "search_text_in_pdf", "extract_images_from_pdf", "convert_pdf_to_image",
+        "merge_pdf_with_password", "remove_password_from_pdf",
+    ),
+    "text_handler": (
+        "count_words", "count_lines", "count_text", "find_and_replace", "convert_case", "append_text",
+        "text_to_pdf", "calculate_hash", "aes_encrypt", "aes_decrypt", "split_file", "sort_lines",
+        "reverse_content", "merge_files", "remove_duplicates", "extract_sections_by_keyword", "view_lines",
+        "hash_directory", "verify_directory",
+    ),
+    "video_handler": (
+        "get_video_duration", "extract_audio", "concatenate_videos", "resize_video", "add_text_to_video",
+        "change_video_speed", "fade_in_video", "add_background_music", "trim_video", "rotate_video",
+        "fade_out_video",
+    ),
+    "markdown_handler": (
+        "convert_markdown_to_html", "extract_text_from_markdown", "create_markdown_file", "lint_markdown_file",
+        "preview_markdown", "count_words_in_markdown", "list_headings_in_markdown", "append_content_to_markdown",
+    ),
+    "csv_handler": ("read_csv", "write_csv", "append_to_csv", "convert_csv_to_json", "filter_csv"),
+    "json_handler": (
+        "read_json", "write_json", "append_to_json", "convert_json_to_csv", "pretty_print_json",
+        "merge_json_files",
+    ),
+}
+
+OPERATIONS = {
+    operation: module_name
+    for module_name, operations in MODULE_OPERATIONS.items()
+    for operation in operations
+}
+
+# Names operations give the single file they work on, as their first parameter.
+INPUT_PARAMETERS = ("file_path", "input_pdf_path")
+
+def file_extension(file_path):
+    """Return the lower-cased extension of a file path."""
+    return os.path.splitext(file_path)[1].lower()
+
+def get_module_name(file_path):
+    """Return the name of the handler module for a file, or None if unsupported."""
+    entry = HANDLER_MODULES.get(file_extension(file_path))
+    return entry[0] if entry else None
+
+def load_module(file_path):
+    """Import and return the handler module for a file, or None if unsupported."""
+    module_name = get_module_name(file_path)
+    if module_name is None:
+        return None
+    return importlib.import_module(module_name)
+
+def load_handler(file_path):
+    """Import and return the interactive menu function for a file, or None if unsupported."""
+    entry = HANDLER_MODULES.get(file_extension(file_path))
+    if entry is None:
+        return None
+    module_name, function_name = entry
+    return getattr(importlib.import_module(module_name), function_name)
+
+def get_operation(name):
+    """Import and return the operation function with the given name (traced while tracing is on)."""
+    module_name = OPERATIONS.get(name)
+    if module_name is None:
+        raise ValueError(f"Unknown operation: {name}")
+    function = getattr(importlib.import_module(module_name), name)
+    return tracing.traced(function) if tracing.active() else function
+
+def takes_file_list(function) -> bool:
+    """True if an operation's first parameter is a list of files."""
+    first = next(iter(inspect.signature(function).parameters.values()))
+    annotation = typing.get_type_hints(function).get(first.name)
+    return typing.get_origin(annotation) in (list, List)
+
+def check_single_input(name):
+    """Raise ``ValueError`` unless an operation takes the one file it works on as its first argument.
+
+    Batch jobs call every operation as ``operation(file_path, **params)``.
+    """
+    function = get_operation(name)
+    parameters = list(inspect.signature(function).parameters.values())
+    if takes_file_list(function):
+        raise ValueError(f"{name} takes a list of files, so it cannot run once per file; "
+                         f"use a manifest step to run it over all inputs")
+    if any(parameter.kind is inspect.Parameter.VAR_POSITIONAL for parameter in parameters):
+        raise ValueError(f"{name} takes a variable number of files, so it cannot run once per file")
+    if not parameters or parameters[0].name not in INPUT_PARAMETERS:
+        first = parameters[0].name if parameters else "nothing"
+        raise ValueError(f"{name} takes {first} first, not the file it works on, so it cannot run once per file")
+
+def coerce_value(value, annotation):
+    """Convert a string parameter to the type an operation's annotation asks for."""
+    if not isinstance(value, str):
+        return value
+    origin = typing.get_origin(annotation)
+    if origin is Union:
+        options = [option for option in typing.get_args(annotation) if option is not type(None)]
+        return coerce_value(value, options[0]) if len(options) == 1 else value
+    if origin in (list, List):
+        (item_type,) = typing.get_args(annotation) or (str,)
+        return [coerce_value(item.strip(), item_type) for item in value.split(",")]
+    if annotation is bool:
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if annotation in (int, float):
+        return annotation(value)
+    if annotation is Any:
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+def coerce_params(function, params):
+    """Convert string parameters (e.g. from the command line) using the function's type hints."""
+    hints = typing.get_type_hints(function)
+    return {name: coerce_value(value, hints.get(name, str)) for name, value in params.items()}
+
+def call_operation(name, *args, **params):
+    """Run an operation by name, converting string parameters to the types it expects."""
+    function = get_operation(name)
+    return function(*args, **coerce_params(function, params))
@@ -0,0 +1,225 @@
+"""Streaming find-and-replace for files of any size.
+
+Text is read in chunks and every pattern of a replacement table is matched
+in a single pass. Patterns are combined into one regular expression with a
+named group each, unless a pattern names its own groups or refers back to
+one: the combined expression would renumber or redefine those groups, so
+such patterns are searched for separately and the earliest match wins, as
+in an alternation. A window of text is
+held back at the end of each chunk, so matches that straddle chunk
+boundaries are still found, and a window of already-written text is kept in
+front of the search position so look-behinds and ``^`` see the real
+preceding text. Matches are assumed to be shorter than the window.
+
+Output goes to a temporary file in the target directory that is atomically
+renamed over the target once complete, so an interrupted run never leaves a
+truncated file behind.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+
+CHUNK_SIZE = 4 * 1024 * 1024
+WINDOW = 64 * 1024
+ENCODING = "utf-8"
+# Undecodable bytes survive the round trip unchanged.
+ERRORS = "surrogateescape"
+# Backreferences and conditionals, which refer to groups by number or name.
+GROUP_REFERENCE = r"\\[1-9]|\(\?P=|\(\?\("
+
+def load_table(path):
+    """Read a replacement table: a JSON object, or one ``find<TAB>replace`` pair per line."""
+    with open(path, "r", encoding=ENCODING) as table_file:
+        content = table_file.read()
+    if content.lstrip().startswith("{"):
+        return list(json.loads(content).items())
+    pairs = []
+    for line in content.splitlines():
+        if line.strip():
+            find_text, _, replace_text = line.partition("\t")
+            pairs.append((find_text, replace_text))
+    return pairs
+
+def compile_pattern(pattern, flags=0):
+    """Compile a user-supplied regex (str or bytes), raising ``ValueError`` with the pattern if it is invalid."""
+    try:
+        return re.compile(pattern, flags)
+    except re.error as error:
+        shown = pattern.decode("utf-8", "replace") if isinstance(pattern, bytes) else pattern
+        raise ValueError(f"Invalid regular expression {shown!r}: {error}") from None
+
+def refers_to_groups(pattern):
+    source = pattern.pattern if isinstance(pattern.pattern, str) else pattern.pattern.decode("latin-1")
+    return re.search(GROUP_REFERENCE, source) is not None
+
+class PatternSet:
+    """Finds the matches of several compiled regexes in one pass, as if they were alternatives.
+
+    At each position the earliest match wins, and of matches starting at the
+    same position the one of the earliest pattern. Patterns without group
+    names or references run as one combined regex.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.combined = None
+        if len(patterns) == 1:
+            self.combined = patterns[0]
+        elif not any(pattern.groupindex or refers_to_groups(pattern) for pattern in patterns):
+            separator, template = ("|", "(?P<_%d>%s)") if isinstance(patterns[0].pattern, str) else \
+                (b"|", b"(?P<_%d>%s)")
+            self.combined = re.compile(separator.join(template % (index, pattern.pattern)
+                                                      for index, pattern in enumerate(patterns)), patterns[0].flags)
+
+    def finditer(self, text, position=0):
+        """Yield ``(pattern index, match)`` for the non-overlapping matches in ``text`` from ``position``."""
+        if self.combined is not None:
+            single = len(self.patterns) == 1
+            for match in self.combined.finditer(text, position):
+                yield 0 if single else int(match.lastgroup[1:]), match
+            return
+        upcoming = [pattern.search(text, position) for pattern in self.patterns]
+        while True:
+            index = min((index for index, match in enumerate(upcoming) if match is not None),
+                        key=lambda index: upcoming[index].start(), default=None)
+            if index is None:
+                return
+            match = upcoming[index]
+            yield index, match
+            position = match.end()
+            # As with finditer, an empty match may not start where the previous empty match was.
+            empty = position if match.start() == position else None
+            for other, pending in enumerate(upcoming):
+                if pending is not None and (pending.start() < position or pending.end() == empty):
+                    pending = self.patterns[other].search(text, position)
+                    if pending is not None and pending.end() == empty:
+                        pending = self.patterns[other].search(text, position + 1) if position < len(text) else None
+                    upcoming[other] = pending
+
+    def search(self, text, position=0):
+        """Return ``(pattern index, match)`` for the first match at or after ``position``, or None."""
+        return next(self.finditer(text, position), None)
+
+class Replacer:
+    """Applies a table of (pattern, replacement) pairs in one pass.
+
+    Literal patterns are tried longest first at each position; regex
+    replacements may use ``\\1`` and ``\\g<name>`` group references.
+    """
+
+    def __init__(self, pairs, regex=False, ignore_case=False):
+        pairs = [(find_text, replace_text) for find_text, replace_text in pairs if find_text]
+        if not pairs:
+            raise ValueError("Nothing to replace: the search text is empty.")
+        if not regex:
+            pairs.sort(key=lambda pair: len(pair[0]), reverse=True)
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        self.regex = regex
+        self.labels = [find_text for find_text, _ in pairs]
+        self.replacements = [replace_text for _, replace_text in pairs]
+        self.patterns = [compile_pattern(find_text if regex else re.escape(find_text), flags)
+                         for find_text in self.labels]
+        if regex:
+            for pattern, replace_text in zip(self.patterns, self.replacements):
+                try:
+                    pattern.sub(replace_text, "")
+                except (re.error, IndexError) as error:
+                    raise ValueError(f"Invalid replacement {replace_text!r} for {pattern.pattern!r}: {error}") from None
+        self.matches = PatternSet(self.patterns)
+        # A single case-sensitive literal without newlines can use str.replace on whole lines.
+        self.plain = not regex and not ignore_case and len(pairs) == 1 and "\n" not in self.labels[0]
+        self.counts = [0] * len(pairs)
+
+    def replace_match(self, index, match):
+        """Return the replacement for a match of pattern ``index`` and count it against that pattern."""
+        self.counts[index] += 1
+        if not self.regex:
+            return self.replacements[index]
+        if match.re is not self.patterns[index]:
+            # Group numbers in the combined regex are shifted; take the groups from the pattern's own match.
+            match = self.patterns[index].match(match.string, match.start())
+        return match.expand(self.replacements[index])
+
+    def pattern_counts(self):
+        return dict(zip(self.labels, self.counts))
+
+    def stream(self, reader, writer, chunk_size=CHUNK_SIZE, window=WINDOW):
+        """Copy ``reader`` to ``writer`` with every match replaced; returns the number of replacements."""
+        if self.plain:
+            return self.stream_lines(reader, writer, chunk_size, window)
+        return self.stream_window(reader, writer, chunk_size, window)
+
+    def stream_lines(self, reader, writer, chunk_size, window):
+        """Fast path for one literal: replace in line-aligned segments, which no match can straddle."""
+        find_text, replace_text = self.labels[0], self.replacements[0]
+        pending = ""
+        while True:
+            chunk = reader.read(chunk_size)
+            buffer = pending + chunk
+            cut = len(buffer) if not chunk else buffer.rfind("\n") + 1
+            if cut == 0:
+                # A very long line: finish the file with the windowed scanner instead of buffering it.
+                return sum(self.counts) + self.stream_window(reader, writer, chunk_size, window, buffer)
+            segment = buffer[:cut]
+            self.counts[0] += segment.count(find_text)
+            writer.write(segment.replace(find_text, replace_text))
+            if not chunk:
+                return self.counts[0]
+            pending = buffer[cut:]
+
+    def stream_window(self, reader, writer, chunk_size, window, pending=""):
+        context = ""
+        total = 0
+        while True:
+            chunk = reader.read(chunk_size)
+            final = not chunk
+            buffer = context + pending + chunk
+            start = len(context)
+            limit = len(buffer) if final else max(start, len(buffer) - window)
+            position = start
+            pieces = []
+            for index, match in self.matches.finditer(buffer, start):
+                # An empty match at the very end of the input belongs to the final window.
+                if match.start() > limit or (not final and match.start() == limit):
+                    break
+                if not final and match.end() >= len(buffer):
+                    limit = match.start()  # Decided with the next chunk, once the whole match is visible.
+                    break
+                pieces.append(buffer[position:match.start()])
+                pieces.append(self.replace_match(index, match))
+                position = match.end()
+                total += 1
+            cut = max(position, limit)
+            pieces.append(buffer[position:cut])
+            writer.write("".join(pieces))
+            if final:
+                return total
+            context = buffer[max(0, cut - window):cut]
+            pending = buffer[cut:]
+
+def replace_in_file(file_path, pairs, regex=False, ignore_case=False, output_path=None):
+    """Replace every match in a file, writing atomically to ``output_path`` (default: in place).
+
+    Returns ``(total replacements, per-pattern counts, seconds)``.
+    """
+    replacer = Replacer(pairs, regex, ignore_case)
+    target = output_path or file_path
+    directory = os.path.dirname(os.path.abspath(target))
+    start = time.perf_counter()
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", dir=directory)
+    try:
+        with open(file_path, "r", encoding=ENCODING, errors=ERRORS, newline="") as reader, \
+                open(handle, "w", encoding=ENCODING, errors=ERRORS, newline="") as writer:
+            total = replacer.stream(reader, writer)
+            writer.flush()
+            os.fsync(writer.fileno())
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return total, replacer.pattern_counts(), time.perf_counter() - start
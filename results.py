@@ -0,0 +1,20 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+@dataclass
+class OperationResult:
+    """Outcome of a single file operation.
+
+    ``output_paths`` lists every file the operation wrote, ``data`` holds
+    machine-readable values such as counts or hashes, and ``message`` is the
+    human-readable summary the interactive menus print.
+    """
+    operation: str
+    input_path: str
+    output_paths: List[str] = field(default_factory=list)
+    data: Dict[str, Any] = field(default_factory=dict)
+    message: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a JSON-serialisable dictionary."""
+        return asdict(self)
@@ -0,0 +1,139 @@
+"""Memory-aware admission of batch jobs.
+
+Each job's peak memory is estimated from its operation, file type and size,
+and jobs are only started while the estimates of everything running fit in
+the budget. Estimates are deliberately simple linear models (a fixed worker
+cost plus a multiple of the input size, or of the decoded pixels for images
+and rendered pages for PDFs), so they can be tuned from the measured peaks
+that batch logs next to them.
+"""
+import os
+import registry
+
+MB = 1024 * 1024
+
+# Resident size of a worker with the handler module imported, before any input is touched.
+MODULE_BASE_BYTES = {
+    "text_handler": 25 * MB,
+    "csv_handler": 25 * MB,
+    "json_handler": 25 * MB,
+    "markdown_handler": 25 * MB,
+    "image_handler": 30 * MB,
+    "pdf_handler": 30 * MB,
+    "video_handler": 75 * MB,
+}
+
+# Peak memory as a multiple of the input size, on top of the module base. Operations
+# that stream their input use a small factor; whole-file ones pay for the decoded
+# string and its line list; JSON and CSV pay for Python objects per value.
+SIZE_FACTORS = {
+    "text_handler": 4.0,
+    "csv_handler": 10.0,
+    "json_handler": 12.0,
+    "markdown_handler": 6.0,
+    "pdf_handler": 4.0,
+    "video_handler": 0.5,
+}
+OPERATION_SIZE_FACTORS = {
+    "count_lines": 0.0,
+    "count_words": 0.0,
+    "count_text": 0.0,
+    "calculate_hash": 0.0,
+    "find_and_replace": 0.0,
+    "convert_case": 0.0,
+    "reverse_content": 0.0,
+    "extract_sections_by_keyword": 0.0,
+    "split_file": 0.0,
+    "sort_lines": 6.0,
+    "remove_duplicates": 6.0,
+    "merge_files": 0.0,
+    "convert_csv_to_json": 0.0,
+    "aes_encrypt": 0.0,
+    # Files encrypted with Fernet by older versions are still decrypted in memory.
+    "aes_decrypt": 3.0,
+    "text_to_pdf": 0.0,
+    "get_video_duration": 0.0,
+}
+# Operations that spill to disk stop growing with the input at their default memory cap.
+OPERATION_MAX_BYTES = {
+    "sort_lines": 384 * MB,
+    "remove_duplicates": 320 * MB,
+}
+
+# Bytes per decoded pixel held at once by image operations (source plus result).
+IMAGE_BYTES_PER_PIXEL = 8
+# Pages rendered by convert_pdf_to_image at pdf2image's default 200 dpi (US Letter, RGB),
+# all held in memory until they are saved.
+PDF_PAGE_RENDER_BYTES = 1700 * 2200 * 3
+# moviepy keeps a few decoded frames plus ffmpeg pipe buffers per clip.
+VIDEO_RENDER_BYTES = 200 * MB
+
+def image_pixels(file_path):
+    from PIL import Image
+
+    with Image.open(file_path) as img:
+        return img.width * img.height
+
+def pdf_pages(file_path):
+    from PyPDF2 import PdfReader
+
+    return len(PdfReader(file_path).pages)
+
+def estimate_memory(operation, file_path):
+    """Estimated peak RSS in bytes of a worker running ``operation`` on ``file_path``."""
+    module_name = registry.OPERATIONS.get(operation) or registry.get_module_name(file_path) or "text_handler"
+    base = MODULE_BASE_BYTES.get(module_name, 30 * MB)
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        size = 0
+    try:
+        if module_name == "image_handler" and operation != "add_image_to_pdf":
+            if operation == "get_image_info":
+                return base
+            return base + image_pixels(file_path) * IMAGE_BYTES_PER_PIXEL
+        if operation == "convert_pdf_to_image":
+            return base + size * 2 + pdf_pages(file_path) * PDF_PAGE_RENDER_BYTES
+    except Exception:
+        pass  # Unreadable headers fall back to the size-based estimate.
+    if module_name == "video_handler" and operation != "get_video_duration":
+        base += VIDEO_RENDER_BYTES
+    factor = OPERATION_SIZE_FACTORS.get(operation, SIZE_FACTORS.get(module_name, 4.0))
+    return int(base + min(size * factor, OPERATION_MAX_BYTES.get(operation, float("inf"))))
+
+class MemoryScheduler:
+    """Decides which queued jobs may start without exceeding a memory budget.
+
+    Jobs start in order while they fit. A job that does not fit may be
+    overtaken by smaller ones, but only a limited number of times, so large
+    jobs are not starved. A job larger than the whole budget runs on its own.
+    """
+
+    def __init__(self, budget, max_overtakes=8):
+        self.budget = budget
+        self.max_overtakes = max_overtakes
+        self.in_use = 0
+        self.overtakes = 0
+
+    def admit(self, queue, running, slots):
+        """Remove and return up to ``slots`` jobs from ``queue`` (``(estimate, job)`` pairs) that may start now."""
+        admitted = []
+        index = 0
+        while index < len(queue) and len(admitted) < slots:
+            estimate, job = queue[index]
+            if self.in_use + estimate <= self.budget or (running + len(admitted) == 0):
+                queue.pop(index)
+                self.in_use += estimate
+                admitted.append((estimate, job))
+                if index == 0:
+                    self.overtakes = 0
+                else:
+                    self.overtakes += 1
+                continue
+            if index == 0 and self.overtakes >= self.max_overtakes:
+                break  # Let the running jobs drain until the head of the queue fits.
+            index += 1
+        return admitted
+
+    def release(self, estimate):
+        self.in_use -= estimate
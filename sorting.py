@@ -0,0 +1,265 @@
+"""External merge sort for text files larger than memory.
+
+The file is split into line-aligned byte ranges that worker processes sort
+independently. Each worker reads its range in blocks and, whenever the lines
+it holds reach its share of the memory cap, sorts them and spills them to a
+run file in a temporary directory. The runs are then k-way merged with a
+heap, in several passes if there are too many to open at once. Files that fit
+under the cap are sorted in memory without spilling.
+
+Runs are merged in file order and Python's sort is stable, so lines with
+equal keys keep their original order. Lines are split on ``\\n`` only and the
+output always ends with a newline.
+"""
+import heapq
+import os
+import re
+import shutil
+import tempfile
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice
+
+BLOCK_SIZE = 4 * 1024 * 1024
+MIN_BLOCK_SIZE = 4096
+# Files smaller than this are sorted in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+# Approximate cost of a line held in a list on top of its text: the str header and the list slot.
+LINE_OVERHEAD = 64
+# Runs merged at once; more runs are merged in several passes.
+MAX_FAN_IN = 128
+WRITE_BATCH = 16384
+ENCODING = "utf-8"
+ERRORS = "surrogateescape"
+
+NUMBER = re.compile(r"\s*[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+class SortOptions:
+    """Ordering options shared by the parent and the workers (and picklable for them)."""
+
+    def __init__(self, numeric=False, field=None, separator=None, ignore_case=False, reverse=False, unique=False):
+        self.numeric = numeric
+        self.field = field
+        self.separator = separator
+        self.ignore_case = ignore_case
+        self.reverse = reverse
+        self.unique = unique
+
+    def key(self):
+        """Return the key function for these options, or None to compare whole lines."""
+        field, separator = self.field, self.separator
+        if field is not None and field < 1:
+            raise ValueError("Key fields are numbered from 1.")
+
+        def select(line):
+            parts = line.split(separator, field) if separator else line.split(None, field)
+            return parts[field - 1] if len(parts) >= field else ""
+
+        def number(text):
+            try:
+                return float(text)
+            except ValueError:
+                match = NUMBER.match(text)
+                return float(match.group()) if match else 0.0  # Like sort -n, non-numbers count as zero.
+
+        if self.numeric:
+            return (lambda line: number(select(line))) if field else number
+        if self.ignore_case:
+            return (lambda line: select(line).casefold()) if field else str.casefold
+        return select if field else None
+
+    def describe(self):
+        parts = ["numeric" if self.numeric else "ignoring case" if self.ignore_case else None,
+                 f"by field {self.field}" if self.field else None,
+                 "reversed" if self.reverse else None, "unique" if self.unique else None]
+        return ", ".join(part for part in parts if part)
+
+def line_ranges(file_path, parts):
+    """Split a file into up to ``parts`` byte ranges that each start at the beginning of a line."""
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, "rb") as file:
+        for index in range(1, parts):
+            file.seek(max(size * index // parts, bounds[-1]))
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def read_lines(file_path, start, end, block_size=BLOCK_SIZE):
+    """Yield lists of lines (without their newlines) from ``[start, end)`` of a file, one block at a time."""
+    pending = b""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            block = file.read(min(block_size, end - position))
+            if not block:
+                break
+            position += len(block)
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0 and position < end:
+                pending = block
+                continue
+            pending = block[cut:]
+            if cut:
+                yield block[:cut - 1].decode(ENCODING, ERRORS).split("\n")
+    if pending:
+        yield [pending.decode(ENCODING, ERRORS)]
+
+def unique_lines(lines, key):
+    """Drop lines whose key equals the previous line's key (the input must be sorted)."""
+    previous = object()
+    for line in lines:
+        current = key(line) if key else line
+        if current != previous:
+            previous = current
+            yield line
+
+def write_lines(lines, writer):
+    """Write lines with newlines in batches; returns the number of lines written."""
+    written = 0
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, WRITE_BATCH))
+        if not batch:
+            return written
+        writer.write("\n".join(batch))
+        writer.write("\n")
+        written += len(batch)
+
+def sort_in_memory(lines, options, key):
+    lines.sort(key=key, reverse=options.reverse)
+    return unique_lines(lines, key) if options.unique else lines
+
+def spill(lines, options, key, spill_dir):
+    """Sort ``lines`` and write them to a new run file; returns ``(path, lines written)``."""
+    handle, run_path = tempfile.mkstemp(prefix="run-", suffix=".txt", dir=spill_dir)
+    with open(handle, "w", encoding=ENCODING, errors=ERRORS, newline="") as run:
+        written = write_lines(sort_in_memory(lines, options, key), run)
+    return run_path, written
+
+def sort_range(file_path, start, end, options, memory, spill_dir):
+    """Sort ``[start, end)`` of a file into runs of at most ``memory`` bytes each.
+
+    The budget is checked line by line and blocks are read in a fraction of it,
+    so a run overshoots by at most one line; a single line longer than the
+    budget is still held whole. Returns ``(run paths, lines read)``.
+    """
+    key = options.key()
+    per_line = LINE_OVERHEAD * (2 if key else 1)
+    runs = []
+    lines = []
+    held = 0
+    total = 0
+    for block in read_lines(file_path, start, end, max(MIN_BLOCK_SIZE, min(BLOCK_SIZE, memory // 4))):
+        total += len(block)
+        sizes = list(accumulate(len(line) + per_line for line in block))
+        taken = 0
+        while taken < len(block):
+            base = sizes[taken - 1] if taken else 0
+            # The first line that brings the run up to the budget ends it.
+            cut = bisect_left(sizes, base + memory - held, taken) + 1
+            if cut > len(block):
+                lines.extend(block[taken:])
+                held += sizes[-1] - base
+                break
+            lines.extend(block[taken:cut])
+            runs.append(spill(lines, options, key, spill_dir)[0])
+            lines = []
+            held = 0
+            taken = cut
+    if lines or not runs:
+        runs.append(spill(lines, options, key, spill_dir)[0])
+    return runs, total
+
+def open_run(run_path, buffer_size):
+    with open(run_path, "r", encoding=ENCODING, errors=ERRORS, newline="", buffering=buffer_size) as run:
+        for line in run:
+            yield line[:-1]
+
+def merge_runs(run_paths, writer, options, key, buffer_size):
+    """Merge sorted runs into ``writer``; returns the number of lines written."""
+    merged = heapq.merge(*(open_run(run_path, buffer_size) for run_path in run_paths),
+                         key=key, reverse=options.reverse)
+    return write_lines(unique_lines(merged, key) if options.unique else merged, writer)
+
+def sort_file(file_path, options=None, output_path=None, memory=256 * 1024 * 1024, workers=None, temp_dir=None):
+    """Sort the lines of a file within roughly ``memory`` bytes, writing atomically to ``output_path``.
+
+    Returns statistics: lines read and written, runs spilled, bytes spilled,
+    merge passes, workers, seconds and MB/s.
+    """
+    options = options or SortOptions()
+    key = options.key()
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_path)
+    target = output_path or file_path
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = max(1, min(workers, size // (PARALLEL_THRESHOLD // 2))) if size >= PARALLEL_THRESHOLD else 1
+    stats = {"lines": 0, "lines_written": 0, "runs": 0, "spilled_bytes": 0, "merge_passes": 0, "workers": parts}
+
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", dir=os.path.dirname(os.path.abspath(target)))
+    spill_dir = None
+    try:
+        with open(handle, "w", encoding=ENCODING, errors=ERRORS, newline="") as writer:
+            # Text is held as str (about one byte per character for ASCII) plus per-line overhead.
+            if parts == 1 and size * 2 <= memory:
+                lines = [line for block in read_lines(file_path, 0, size) for line in block]
+                stats["lines"] = len(lines)
+                stats["lines_written"] = write_lines(sort_in_memory(lines, options, key), writer)
+            else:
+                spill_dir = tempfile.mkdtemp(prefix="uft-sort-", dir=temp_dir)
+                ranges = line_ranges(file_path, parts)
+                if len(ranges) == 1:
+                    results = [sort_range(file_path, 0, size, options, memory, spill_dir)]
+                else:
+                    share = memory // len(ranges)
+                    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                        results = list(executor.map(sort_range, [file_path] * len(ranges),
+                                                    [start for start, _ in ranges], [end for _, end in ranges],
+                                                    [options] * len(ranges), [share] * len(ranges),
+                                                    [spill_dir] * len(ranges)))
+                runs = [run_path for range_runs, _ in results for run_path in range_runs]
+                stats["lines"] = sum(total for _, total in results)
+                stats["runs"] = len(runs)
+                stats["spilled_bytes"] = sum(os.path.getsize(run_path) for run_path in runs)
+                buffer_size = max(64 * 1024, memory // (2 * MAX_FAN_IN))
+                # Merge groups of runs into longer runs until one pass can merge them all.
+                while len(runs) > MAX_FAN_IN:
+                    merged_runs = []
+                    for index in range(0, len(runs), MAX_FAN_IN):
+                        group = runs[index:index + MAX_FAN_IN]
+                        run_handle, run_path = tempfile.mkstemp(prefix="run-", suffix=".txt", dir=spill_dir)
+                        with open(run_handle, "w", encoding=ENCODING, errors=ERRORS, newline="") as run:
+                            merge_runs(group, run, options, key, buffer_size)
+                        for done in group:
+                            os.unlink(done)
+                        stats["spilled_bytes"] += os.path.getsize(run_path)
+                        merged_runs.append(run_path)
+                    runs = merged_runs
+                    stats["merge_passes"] += 1
+                stats["lines_written"] = merge_runs(runs, writer, options, key, buffer_size)
+                stats["merge_passes"] += 1
+            writer.flush()
+            os.fsync(writer.fileno())
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    finally:
+        if spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start_time
+    stats["seconds"] = elapsed
+    stats["mb_per_s"] = size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+    return stats
@@ -0,0 +1,161 @@
+"""Streaming file splitting by lines, by size or into equal parts.
+
+Splits by size and into N parts compute every boundary up front with a few
+small seeks (parts always end at a line end), then copy the byte ranges to
+the part files in parallel threads; file I/O and gzip compression both
+release the GIL. Splits by line count stream through the file once, unless
+a line-offset index of the file exists whose sampling interval divides the
+line count, in which case the boundaries come from the index and the parts
+are written in parallel too.
+"""
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import line_index
+
+BLOCK_SIZE = 4 * 1024 * 1024
+DEFAULT_TEMPLATE = "{stem}_part_{index}.txt"
+
+def part_path(file_path, index, template=DEFAULT_TEMPLATE, output_dir=None, compress=False):
+    """Return the path of part ``index`` (1-based) named by ``template``.
+
+    The template may use ``{stem}``, ``{ext}`` and ``{index}`` (with format
+    specs such as ``{index:04d}``); ``.gz`` is appended when compressing.
+    """
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    name = template.format(stem=stem, ext=ext, index=index) + (".gz" if compress else "")
+    return os.path.join(output_dir or os.path.dirname(file_path), name)
+
+def open_part(path, compress, level):
+    return gzip.open(path, "wb", compresslevel=level) if compress else open(path, "wb")
+
+def copy_range(file_path, start, end, output_path, compress=False, level=6):
+    """Copy bytes ``[start, end)`` of a file to a part file."""
+    with open(file_path, "rb") as source, open_part(output_path, compress, level) as part:
+        source.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = source.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            part.write(block)
+            remaining -= len(block)
+    return output_path
+
+def size_boundaries(file_path, bytes_per_file):
+    """Part boundaries for parts of at most ``bytes_per_file`` bytes ending at line ends.
+
+    A single line longer than the limit becomes a part of its own.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, "rb") as file:
+        while size - bounds[-1] > bytes_per_file:
+            start = bounds[-1]
+            limit = start + bytes_per_file
+            # Search backwards from the limit for the last line end inside the part.
+            cursor = limit
+            cut = -1
+            while cursor > start and cut < 0:
+                step = min(64 * 1024, cursor - start)
+                file.seek(cursor - step)
+                found = file.read(step).rfind(b"\n")
+                cursor -= step
+                cut = cursor + found + 1 if found >= 0 else -1
+            if cut < 0:
+                file.seek(limit)
+                cut = line_index.skip_lines(file, limit, 1)
+            bounds.append(cut)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return bounds
+
+def equal_boundaries(file_path, parts):
+    """Boundaries for ``parts`` parts of about equal size, moved forward to line starts."""
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    for index in range(1, parts):
+        offset = line_index.percent_offset(file_path, index * 100 / parts)
+        if bounds[-1] < offset < size:
+            bounds.append(offset)
+    if size:
+        bounds.append(size)
+    return bounds
+
+def line_boundaries(index, lines_per_file):
+    """Boundaries of parts of ``lines_per_file`` lines, read from a line-offset index."""
+    bounds = [index.line_offset(line) for line in range(0, index.line_count, lines_per_file)]
+    return bounds + [index.size] if bounds and index.size else []
+
+def split_lines_streaming(file_path, lines_per_file, path_for, compress=False, level=6):
+    """Split by line count in one pass; ``path_for(index)`` names the parts. Returns the part paths."""
+    written = []
+    part = None
+    remaining = lines_per_file
+    try:
+        with open(file_path, "rb") as source:
+            while True:
+                block = source.read(BLOCK_SIZE)
+                if not block:
+                    break
+                position = 0
+                while position < len(block):
+                    if part is None:
+                        written.append(path_for(len(written) + 1))
+                        part = open_part(written[-1], compress, level)
+                        remaining = lines_per_file
+                    newlines = block.count(b"\n", position)
+                    if newlines < remaining:
+                        part.write(block[position:])
+                        remaining -= newlines
+                        break
+                    cut = position
+                    for _ in range(remaining):
+                        cut = block.find(b"\n", cut) + 1
+                    part.write(block[position:cut])
+                    part.close()
+                    part = None
+                    position = cut
+    finally:
+        if part is not None:
+            part.close()
+    return written
+
+def split_file(file_path, lines_per_file=None, bytes_per_file=None, parts=None, template=DEFAULT_TEMPLATE,
+               output_dir=None, compress=False, level=6, workers=None):
+    """Split a file by line count, by size or into ``parts`` equal parts; exactly one mode must be given.
+
+    Returns statistics: the part paths, mode, whether they were written in
+    parallel, bytes, seconds and MB/s.
+    """
+    modes = [mode for mode, value in (("lines", lines_per_file), ("bytes", bytes_per_file), ("parts", parts))
+             if value is not None]
+    if len(modes) != 1:
+        raise ValueError("Give exactly one of lines_per_file, bytes_per_file or parts.")
+    if min(value for value in (lines_per_file, bytes_per_file, parts) if value is not None) < 1:
+        raise ValueError(f"The number of {modes[0]} per part must be positive.")
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_path)
+    bounds = None
+    if bytes_per_file is not None:
+        bounds = size_boundaries(file_path, bytes_per_file) if size else []
+    elif parts is not None:
+        bounds = equal_boundaries(file_path, parts)
+    else:
+        index = line_index.LineIndex.load(file_path)
+        if index is not None and lines_per_file % index.every == 0:
+            bounds = line_boundaries(index, lines_per_file)
+
+    if bounds is None:
+        output_paths = split_lines_streaming(
+            file_path, lines_per_file, lambda index: part_path(file_path, index, template, output_dir, compress),
+            compress, level)
+    else:
+        output_paths = [part_path(file_path, index, template, output_dir, compress) for index in range(1, len(bounds))]
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            list(executor.map(lambda item: copy_range(file_path, item[0], item[1], item[2], compress, level),
+                              zip(bounds, bounds[1:], output_paths)))
+    elapsed = time.perf_counter() - start_time
+    return {"output_paths": output_paths, "mode": modes[0], "parallel": bounds is not None, "bytes": size,
+            "seconds": elapsed, "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
@@ -0,0 +1,21 @@
+import argparse
+import pytest
+import batch
+import registry
+
+@pytest.mark.parametrize("operation", ["merge_files", "merge_json_files", "hash_directory"])
+def test_operations_not_taking_one_input_file_are_rejected(operation):
+    with pytest.raises(ValueError, match="cannot run once per file"):
+        registry.check_single_input(operation)
+
+@pytest.mark.parametrize("operation", ["count_lines", "convert_csv_to_json", "extract_sections_by_keyword"])
+def test_per_file_operations_are_accepted(operation):
+    registry.check_single_input(operation)
+
+def test_batch_rejects_list_operation_before_running(tmp_path, capsys):
+    (tmp_path / "a.txt").write_text("a\n")
+    args = argparse.Namespace(op="merge_files", param=[], inputs=[str(tmp_path / "a.txt")], file_list=None,
+                              recursive=False)
+    assert batch.run_batch(args) == 1
+    assert "takes a list of files" in capsys.readouterr().out
+    assert not (tmp_path / "merged_output.txt").exists()
@@ -0,0 +1,31 @@
+import os
+import cache
+
+def test_edited_keywords_file_invalidates_cached_result(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path / "cache"))
+    log = tmp_path / "app.log"
+    log.write_text("error one\nwarning two\ninfo three\n")
+    keywords = tmp_path / "keywords.txt"
+    keywords.write_text("error\n")
+    params = {"keywords_file": str(keywords), "output_path": str(tmp_path / "out.txt")}
+
+    result, hit = result_cache.run("extract_sections_by_keyword", str(log), params)
+    assert not hit and result.data["matches"] == 1
+    assert result_cache.run("extract_sections_by_keyword", str(log), params)[1]
+
+    keywords.write_text("warning\ninfo\n")
+    result, hit = result_cache.run("extract_sections_by_keyword", str(log), params)
+    assert not hit
+    assert result.data["matches"] == 2
+    assert (tmp_path / "out.txt").read_text() == "warning two\ninfo three\n"
+
+def test_output_path_does_not_change_the_key(tmp_path):
+    result_cache = cache.ResultCache(str(tmp_path / "cache"))
+    log = tmp_path / "app.log"
+    log.write_text("error one\n")
+    output = tmp_path / "out.txt"
+    params = {"keyword": "error", "output_path": str(output)}
+    key = result_cache.key("extract_sections_by_keyword", str(log), params)
+    output.write_text("anything")
+    assert result_cache.key("extract_sections_by_keyword", str(log), params) == key
+    os.remove(output)
@@ -0,0 +1,28 @@
+import json
+import pytest
+import concatenating
+
+@pytest.mark.parametrize("first", ["[]", "[" + " " * 5000 + "]", "[" + " \n" * 300000 + "]"])
+def test_empty_arrays_add_nothing(tmp_path, first):
+    paths = []
+    for index, content in enumerate([first, "[1, 2]", "[3]"]):
+        path = tmp_path / f"part{index}.json"
+        path.write_text(content)
+        paths.append(str(path))
+    output = tmp_path / "merged.json"
+    concatenating.concatenate_json_arrays(paths, str(output))
+    assert json.loads(output.read_text()) == [1, 2, 3]
+
+def test_item_after_long_whitespace(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_text("[" + " " * 9000 + '"x"]')
+    with open(path, "rb") as file:
+        start, end = concatenating.array_bounds(file.fileno(), path.stat().st_size)
+    assert start < end
+
+@pytest.mark.parametrize("content", ["[1, 2,]", "[, 1]", "[1, 2,\n  ]"])
+def test_stray_commas_are_rejected(tmp_path, content):
+    path = tmp_path / "bad.json"
+    path.write_text(content)
+    with open(path, "rb") as file, pytest.raises(ValueError):
+        concatenating.array_bounds(file.fileno(), path.stat().st_size)
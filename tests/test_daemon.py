@@ -0,0 +1,21 @@
+import argparse
+import pytest
+import daemon
+
+def submit_args(tmp_path, *extra):
+    (tmp_path / "a.txt").write_text("a\n")
+    parser = argparse.ArgumentParser()
+    daemon.add_submit_arguments(parser)
+    return parser.parse_args([str(tmp_path / "a.txt"), "--op", "count_lines", *extra])
+
+@pytest.mark.parametrize("extra", [[], ["--json"]])
+def test_response_without_known_id_counts_as_failure(tmp_path, monkeypatch, capsys, extra):
+    def send_requests(requests, socket_path=None):
+        yield {"id": None, "ok": False, "error": "Invalid request: bad JSON"}
+        yield {"id": 0, "ok": True, "latency_ms": 1.0, "result": {"message": "1 line"}}
+
+    monkeypatch.setattr(daemon, "send_requests", send_requests)
+    assert daemon.run_submit(submit_args(tmp_path, *extra)) == 1
+    out = capsys.readouterr().out
+    assert "Invalid request" in out
+    assert "a.txt" in out
@@ -0,0 +1,34 @@
+import pytest
+import text_handler
+import transforming
+
+@pytest.mark.parametrize("case, expected", [("upper", "µ MASS ÄRGER\n"), ("title", "µ Mass Ärger\n"),
+                                            ("lower", "µ mass ärger\n")])
+def test_convert_case_keeps_characters_cp1252_cannot_convert(tmp_path, case, expected):
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("µ mass Ärger\n".encode("cp1252"))
+    result = text_handler.convert_case(str(path), case)
+    assert result.data["encoding"] == "cp1252"
+    assert path.read_bytes() == expected.encode("cp1252")
+
+def test_convert_case_keeps_latin1_y_diaeresis(tmp_path):
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("ÿ über\n".encode("latin-1"))
+    text_handler.convert_case(str(path), "upper", encoding="latin-1")
+    assert path.read_bytes() == "ÿ ÜBER\n".encode("latin-1")
+
+def test_convert_case_in_parallel_ranges(tmp_path, monkeypatch):
+    monkeypatch.setattr(transforming, "PARALLEL_THRESHOLD", 1)
+    monkeypatch.setattr(transforming, "MIN_RANGE_SIZE", 1)
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("µ line é\n".encode("cp1252") * 100)
+    text_handler.convert_case(str(path), "upper", workers=3)
+    assert path.read_bytes() == "µ LINE É\n".encode("cp1252") * 100
+
+def test_unrepresentable_replacement_is_written_as_utf8(tmp_path):
+    path = tmp_path / "legacy.txt"
+    path.write_bytes("abc é\n".encode("cp1252"))
+    result = text_handler.find_and_replace(str(path), "b", "✓")
+    assert result.data["encoding"] == "utf-8"
+    assert "written as UTF-8" in result.message
+    assert path.read_bytes() == "a✓c é\n".encode("utf-8")
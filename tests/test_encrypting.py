@@ -0,0 +1,112 @@
+import os
+import pytest
+import encrypting
+import text_handler
+
+CHUNK = 16
+
+def encrypt(tmp_path, data, chunk_size=CHUNK):
+    source = tmp_path / "plain.bin"
+    source.write_bytes(data)
+    target = tmp_path / "sealed.bin"
+    stats = encrypting.encrypt_file(str(source), str(target), chunk_size=chunk_size)
+    return target, stats["key"]
+
+def decrypt(tmp_path, target, key, offset=0, length=None):
+    output = tmp_path / "opened.bin"
+    encrypting.decrypt_file(str(target), str(output), key, offset, length)
+    return output.read_bytes()
+
+def chunk_span(index):
+    start = encrypting.HEADER.size + index * (CHUNK + encrypting.TAG_SIZE)
+    return start, start + CHUNK + encrypting.TAG_SIZE
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 4 * CHUNK, 4 * CHUNK + 5])
+def test_round_trip(tmp_path, size):
+    data = os.urandom(size)
+    target, key = encrypt(tmp_path, data)
+    assert target.stat().st_size == encrypting.encrypted_size(size, CHUNK)
+    assert decrypt(tmp_path, target, key) == data
+
+def test_round_trip_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(encrypting, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(encrypting, "MIN_RANGE_SIZE", CHUNK)
+    data = os.urandom(40 * CHUNK + 3)
+    target, key = encrypt(tmp_path, data)
+    output = tmp_path / "opened.bin"
+    assert encrypting.decrypt_file(str(target), str(output), key, workers=4)["workers"] == 4
+    assert output.read_bytes() == data
+
+@pytest.mark.parametrize("offset, length", [(0, 5), (3, CHUNK), (CHUNK, CHUNK), (CHUNK - 1, 2 * CHUNK + 2),
+                                            (5 * CHUNK, None), (7 * CHUNK, 100), (1000, 10), (10, 0)])
+def test_decrypt_range(tmp_path, offset, length):
+    data = os.urandom(7 * CHUNK + 9)
+    target, key = encrypt(tmp_path, data)
+    expected = data[offset:] if length is None else data[offset:offset + length]
+    assert decrypt(tmp_path, target, key, offset, length) == expected
+
+def test_range_reads_only_the_chunks_it_needs(tmp_path):
+    data = os.urandom(4 * CHUNK)
+    target, key = encrypt(tmp_path, data)
+    sealed = bytearray(target.read_bytes())
+    start, _ = chunk_span(3)
+    sealed[start] ^= 1
+    target.write_bytes(sealed)
+    assert decrypt(tmp_path, target, key, CHUNK, CHUNK) == data[CHUNK:2 * CHUNK]
+
+def test_tampered_chunk_fails(tmp_path):
+    target, key = encrypt(tmp_path, os.urandom(3 * CHUNK))
+    sealed = bytearray(target.read_bytes())
+    start, _ = chunk_span(1)
+    sealed[start + 2] ^= 0x80
+    target.write_bytes(sealed)
+    with pytest.raises(ValueError, match="Chunk 1 failed authentication"):
+        decrypt(tmp_path, target, key)
+    assert not (tmp_path / "opened.bin").exists()
+
+def test_truncated_file_fails(tmp_path):
+    target, key = encrypt(tmp_path, os.urandom(3 * CHUNK))
+    start, _ = chunk_span(2)
+    sealed = target.read_bytes()[:start]
+    target.write_bytes(sealed)
+    with pytest.raises(ValueError, match="truncated"):
+        decrypt(tmp_path, target, key)
+    # Rewriting the header to match the shorter file does not help: the header is authenticated.
+    magic, chunk_size, _, prefix = encrypting.HEADER.unpack_from(sealed)
+    target.write_bytes(encrypting.HEADER.pack(magic, chunk_size, 2 * CHUNK, prefix) + sealed[encrypting.HEADER.size:])
+    with pytest.raises(ValueError, match="failed authentication"):
+        decrypt(tmp_path, target, key)
+
+def test_swapped_chunks_fail(tmp_path):
+    target, key = encrypt(tmp_path, os.urandom(3 * CHUNK))
+    sealed = target.read_bytes()
+    (a, b), (c, d) = chunk_span(0), chunk_span(1)
+    target.write_bytes(sealed[:a] + sealed[c:d] + sealed[a:b] + sealed[d:])
+    with pytest.raises(ValueError, match="Chunk 0 failed authentication"):
+        decrypt(tmp_path, target, key)
+
+def test_wrong_key_fails(tmp_path):
+    target, _ = encrypt(tmp_path, b"secret")
+    with pytest.raises(ValueError, match="failed authentication"):
+        decrypt(tmp_path, target, encrypting.generate_key())
+
+def test_handler_round_trip(tmp_path):
+    source = tmp_path / "notes.txt"
+    source.write_text("hello world\n" * 100)
+    encrypted = text_handler.aes_encrypt(str(source))
+    decrypted = text_handler.aes_decrypt(encrypted.output_paths[0], encrypted.data["key"],
+                                         str(tmp_path / "out.txt"), offset=6, length=5)
+    assert (tmp_path / "out.txt").read_text() == "world"
+    assert decrypted.data["bytes"] == 5
+
+def test_legacy_fernet_files_still_decrypt(tmp_path):
+    from cryptography.fernet import Fernet
+
+    key = Fernet.generate_key()
+    legacy = tmp_path / "legacy_encrypted.txt"
+    legacy.write_bytes(Fernet(key).encrypt(b"written by an older version"))
+    output = tmp_path / "legacy.txt"
+    text_handler.aes_decrypt(str(legacy), key.decode(), str(output))
+    assert output.read_bytes() == b"written by an older version"
+    text_handler.aes_decrypt(str(legacy), key.decode(), str(output), offset=8, length=5)
+    assert output.read_bytes() == b"by an"
@@ -0,0 +1,34 @@
+import pytest
+import grepping
+
+def grep(tmp_path, text, patterns, **options):
+    path = tmp_path / "input.txt"
+    path.write_bytes(text.encode("utf-8"))
+    output = tmp_path / "output.txt"
+    stats = grepping.grep_file(str(path), str(output), patterns, **options)
+    return output.read_bytes().decode("utf-8"), stats["counts"]
+
+def test_backreference(tmp_path):
+    lines, counts = grep(tmp_path, "aa one\nab\nxa\n", [r"(a)\1"], regex=True)
+    assert lines == "aa one\n"
+    assert counts == {r"(a)\1": 1}
+
+def test_backreferences_and_repeated_group_names(tmp_path):
+    patterns = [r"(?P<w>a)b", r"(?P<w>c)(?P=w)", r"(x)\1"]
+    lines, counts = grep(tmp_path, "aa\nab\ncc w\nxa\nxx\n", patterns, regex=True)
+    assert lines == "ab\ncc w\nxx\n"
+    assert counts == {r"(?P<w>a)b": 1, r"(?P<w>c)(?P=w)": 1, r"(x)\1": 1}
+
+def test_invalid_regex(tmp_path):
+    with pytest.raises(ValueError, match="Invalid regular expression"):
+        grep(tmp_path, "a\n", ["("], regex=True)
+
+def test_ignore_case_folds_non_ascii_keywords(tmp_path):
+    text = "Ärger hier\nkein\närger da\nÄRGER\n"
+    lines, counts = grep(tmp_path, text, ["ärger"], ignore_case=True)
+    assert lines == "Ärger hier\närger da\nÄRGER\n"
+    assert counts == {"ärger": 3}
+
+def test_ignore_case_non_ascii_prefers_longest_keyword(tmp_path):
+    _, counts = grep(tmp_path, "ÄRGER DA\närger\n", ["ärg", "Ärger da"], ignore_case=True)
+    assert counts == {"ärg": 1, "Ärger da": 1}
@@ -0,0 +1,30 @@
+import json
+import pytest
+import json_handler
+
+def write_inputs(tmp_path, *contents):
+    paths = []
+    for index, content in enumerate(contents):
+        path = tmp_path / f"input{index}.json"
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_merge(tmp_path, zero_copy):
+    paths = write_inputs(tmp_path, "[1, 2]", "[]", '[{"a": 3}]')
+    output = tmp_path / "merged.json"
+    json_handler.merge_json_files(paths, str(output), zero_copy=zero_copy)
+    assert json.loads(output.read_text()) == [1, 2, {"a": 3}]
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_malformed_input_is_rejected(tmp_path, zero_copy):
+    paths = write_inputs(tmp_path, "[3]", "[1, 2,]")
+    with pytest.raises(ValueError):
+        json_handler.merge_json_files(paths, str(tmp_path / "merged.json"), zero_copy=zero_copy)
+    assert not (tmp_path / "merged.json").exists()
+
+def test_malformed_items_are_rejected_by_default(tmp_path):
+    paths = write_inputs(tmp_path, "[1, 2 3]", "[4]")
+    with pytest.raises(ValueError):
+        json_handler.merge_json_files(paths, str(tmp_path / "merged.json"))
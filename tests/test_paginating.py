@@ -0,0 +1,25 @@
+import pytest
+import paginating
+
+@pytest.mark.parametrize("font", ["Courier", "Helvetica"])
+def test_rows_break_between_words(font):
+    layout = paginating.Layout(font=font)
+    text = "the quick brown fox jumps over the lazy dog " * 10
+    rows = layout.wrap(text)
+    assert len(rows) > 1
+    assert "".join(rows) == text
+    for row in rows[:-1]:
+        assert row.endswith(" ")
+    assert layout.row_count(text) == len(rows)
+
+@pytest.mark.parametrize("font", ["Courier", "Helvetica"])
+def test_words_longer_than_a_row_are_cut(font):
+    layout = paginating.Layout(font=font)
+    text = "x" * 300 + " tail"
+    rows = layout.wrap(text)
+    assert "".join(rows) == text
+    assert all(layout.string_width(row.rstrip()) <= layout.text_width for row in rows)
+    assert rows[0] == "x" * len(rows[0])
+
+def test_empty_line_takes_one_row():
+    assert paginating.Layout().wrap("") == [""]
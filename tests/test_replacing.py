@@ -0,0 +1,53 @@
+import io
+import re
+import pytest
+import replacing
+import text_handler
+
+def replace(tmp_path, text, pairs, **options):
+    path = tmp_path / "input.txt"
+    path.write_text(text, encoding="utf-8")
+    total, counts, _ = replacing.replace_in_file(str(path), pairs, **options)
+    return path.read_text(encoding="utf-8"), total, counts
+
+def test_backreference_in_table(tmp_path):
+    text, total, counts = replace(tmp_path, "aa x aax a", [(r"(a)\1", "D"), ("x", "Y")], regex=True)
+    assert text == "D Y DY a"
+    assert total == 4
+    assert counts == {r"(a)\1": 2, "x": 2}
+
+def test_repeated_group_names(tmp_path):
+    pairs = [(r"(?P<w>a)b", r"<\g<w>>"), (r"(?P<w>c)d", r"[\1]")]
+    assert replace(tmp_path, "ab cd abcd", pairs, regex=True)[0] == "<a> [c] <a>[c]"
+
+def test_numbered_groups_in_replacement(tmp_path):
+    text, _, _ = replace(tmp_path, "a1 zz b2", [(r"(\w)(\d)", r"\2\1"), ("zz", "Q")], regex=True)
+    assert text == "1a Q 2b"
+
+def test_earliest_pattern_wins_at_same_position(tmp_path):
+    pairs = [(r"(a)\1", "<pair>"), ("a", "<one>")]
+    assert replace(tmp_path, "aaa", pairs, regex=True)[0] == "<pair><one>"
+
+def test_literal_table_longest_first(tmp_path):
+    assert replace(tmp_path, "abab", [("a", "1"), ("ab", "2")])[0] == "22"
+
+@pytest.mark.parametrize("pairs", [[("(", "x")], [("(a)", r"\2")], [("(a)", r"\g<name>")]])
+def test_invalid_patterns_are_rejected_before_writing(tmp_path, pairs):
+    path = tmp_path / "input.txt"
+    path.write_text("abc", encoding="utf-8")
+    with pytest.raises(ValueError):
+        text_handler.find_and_replace(str(path), table=None, regex=True, find_text=pairs[0][0],
+                                      replace_text=pairs[0][1])
+    assert path.read_text(encoding="utf-8") == "abc"
+
+@pytest.mark.parametrize("pattern", ["$", r"\Z", "(?:)", "x*"])
+@pytest.mark.parametrize("text", ["abc", "a\nb\n", ""])
+def test_empty_matches_at_end_of_input(tmp_path, pattern, text):
+    expected = re.sub(pattern, "E", text, flags=re.MULTILINE)
+    assert replace(tmp_path, text, [(pattern, "E")], regex=True)[0] == expected
+
+def test_end_of_input_across_chunks():
+    replacer = replacing.Replacer([("$", "E")], regex=True)
+    output = io.StringIO()
+    replacer.stream(io.StringIO("ab\ncd\nef"), output, chunk_size=2, window=4)
+    assert output.getvalue() == "abE\ncdE\nefE"
@@ -0,0 +1,50 @@
+import os
+import random
+import pytest
+import sorting
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+
+@pytest.mark.parametrize("options", [sorting.SortOptions(), sorting.SortOptions(reverse=True),
+                                     sorting.SortOptions(ignore_case=True)])
+def test_tiny_budget_spills_and_matches_sorted(tmp_path, options):
+    rng = random.Random(7)
+    lines = ["".join(rng.choice("abcXYZ") for _ in range(rng.randint(0, 30))) for _ in range(3000)]
+    path = tmp_path / "lines.txt"
+    write_lines(path, lines)
+    stats = sorting.sort_file(str(path), options, str(tmp_path / "sorted.txt"), memory=2048)
+    assert stats["runs"] > 100
+    expected = sorted(lines, key=options.key(), reverse=options.reverse)
+    assert (tmp_path / "sorted.txt").read_text().splitlines() == expected
+
+def test_several_merge_passes_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(sorting, "PARALLEL_THRESHOLD", 1024)
+    monkeypatch.setattr(sorting, "MAX_FAN_IN", 4)
+    rng = random.Random(11)
+    lines = [str(rng.randint(-10 ** 6, 10 ** 6)) for _ in range(5000)]
+    path = tmp_path / "numbers.txt"
+    write_lines(path, lines)
+    stats = sorting.sort_file(str(path), sorting.SortOptions(numeric=True), str(tmp_path / "sorted.txt"),
+                              memory=8192, workers=3)
+    assert stats["workers"] == 3
+    assert stats["merge_passes"] > 1
+    assert (tmp_path / "sorted.txt").read_text().splitlines() == sorted(lines, key=int)
+
+def test_runs_stay_within_the_budget(tmp_path):
+    lines = ["x" * 10] * 500 + ["y" * 5000] + ["z" * 10] * 500
+    path = tmp_path / "lines.txt"
+    write_lines(path, lines)
+    spill_dir = tmp_path / "runs"
+    spill_dir.mkdir()
+    memory = 1024
+    runs, total = sorting.sort_range(str(path), 0, path.stat().st_size, sorting.SortOptions(), memory,
+                                     str(spill_dir))
+    assert total == len(lines)
+    for run in runs:
+        with open(run) as file:
+            held = [line[:-1] for line in file]
+        # Everything but the line that reached the budget fits under it.
+        sizes = [len(line) + sorting.LINE_OVERHEAD for line in held]
+        assert sum(sizes) - max(sizes) < memory
+    assert sum(os.path.getsize(run) for run in runs) == path.stat().st_size
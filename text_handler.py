@@ -1,207 +1,335 @@
 import os
-import hashlib
-from cryptography.fernet import Fernet
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+from typing import List, Optional
+from results import OperationResult
+import cache
+import concatenating
+import counting
+import decoding
+import deduplicating
+import encrypting
+import grepping
+import hashing
+import line_index
+import paginating
+import replacing
+import sorting
+import splitting
+import transforming
 
-def count_words(file_path):
+def encoding_note(source, written):
+    """A note for output that had to be written as UTF-8 because the file's encoding cannot represent it."""
+    if written == source.encoding:
+        return ""
+    return f"\nThe result cannot be represented in {source.encoding}, so it was written as UTF-8."
+
+def count_words(file_path: str, workers: Optional[int] = None, encoding: Optional[str] = None) -> OperationResult:
     """Count the number of words in a text file."""
-    try:
-        with open(file_path, "r") as file:
-            text = file.read()
-        word_count = len(text.split())
-        print(f"Word count: {word_count}")
-    except Exception as e:
-        print(f"Error counting words: {e}")
-
-def count_lines(file_path):
+    encoding, bom = decoding.resolve_encoding(file_path, encoding)
+    counts = counting.count_file(file_path, workers, encoding=encoding, skip=bom)
+    return OperationResult("count_words", file_path, data={"word_count": counts["words"],
+                                                            "mb_per_s": counts["mb_per_s"]},
+                           message=f"Word count: {counts['words']} ({counts['mb_per_s']:.1f} MB/s)")
+
+def count_lines(file_path: str, workers: Optional[int] = None, encoding: Optional[str] = None) -> OperationResult:
     """Count the number of lines in a text file."""
-    try:
-        with open(file_path, "r") as file:
-            line_count = sum(1 for line in file)
-        print(f"Line count: {line_count}")
-    except Exception as e:
-        print(f"Error counting lines: {e}")
-
-def find_and_replace(file_path):
-    """Find and replace text in a file."""
-    try:
-        find_text = input("Enter the text to find: ")
-        replace_text = input("Enter the text to replace with: ")
-        with open(file_path, "r") as file:
-            content = file.read()
-        content = content.replace(find_text, replace_text)
-        with open(file_path, "w") as file:
-            file.write(content)
-        print("Text replaced successfully.")
-    except Exception as e:
-        print(f"Error finding and replacing text: {e}")
-
-def convert_case(file_path):
-    """Convert text to uppercase or lowercase."""
-    try:
-        with open(file_path, "r") as file:
-            content = file.read()
-        print("1. Convert to UPPERCASE")
-        print("2. Convert to lowercase")
-        choice = input("Select option: ")
-        if choice == "1":
-            content = content.upper()
-        elif choice == "2":
-            content = content.lower()
-        else:
-            print("Invalid option selected.")
-            return
-        with open(file_path, "w") as file:
-            file.write(content)
-        print("Text case converted successfully.")
-    except Exception as e:
-        print(f"Error converting text case: {e}")
-
-def append_text(file_path):
-    """Append text to a file."""
-    try:
-        new_text = input("Enter text to append: ")
-        with open(file_path, "a") as file:
-            file.write(new_text)
-        print("Text appended successfully.")
-    except Exception as e:
-        print(f"Error appending text: {e}")
-
-def text_to_pdf(file_path):
-    """Convert a text file to a PDF."""
-    try:
-        pdf_path = os.path.splitext(file_path)[0] + ".pdf"
-        with open(file_path, "r") as file:
-            text = file.read()
-        c = canvas.Canvas(pdf_path, pagesize=letter)
-        c.drawString(72, 720, text)
-        c.save()
-        print(f"Text file converted to PDF successfully: {pdf_path}")
-    except Exception as e:
-        print(f"Error converting text to PDF: {e}")
-
-def calculate_hash(file_path, algorithm="sha256"):
-    """Calculate the hash of a file."""
-    try:
-        hash_function = getattr(hashlib, algorithm)
-        hasher = hash_function()
-        with open(file_path, "rb") as file:
-            while chunk := file.read(8192):
-                hasher.update(chunk)
-        hash_value = hasher.hexdigest()
-        print(f"{algorithm.upper()} hash of {file_path}: {hash_value}")
-    except Exception as e:
-        print(f"Error calculating hash: {e}")
-
-def aes_encrypt(file_path):
-    """Encrypt a text file using AES."""
-    try:
-        key = Fernet.generate_key()
-        cipher_suite = Fernet(key)
-        with open(file_path, "rb") as file:
-            file_data = file.read()
-        encrypted_data = cipher_suite.encrypt(file_data)
-        encrypted_file_path = os.path.splitext(file_path)[0] + "_encrypted.txt"
-        with open(encrypted_file_path, "wb") as file:
-            file.write(encrypted_data)
-        print(f"File encrypted successfully. Key: {key.decode()}")
-    except Exception as e:
-        print(f"Error encrypting file: {e}")
-
-def aes_decrypt(file_path, key):
-    """Decrypt a text file using AES."""
-    try:
+    encoding, bom = decoding.resolve_encoding(file_path, encoding)
+    counts = counting.count_file(file_path, workers, lines_only=True, encoding=encoding, skip=bom)
+    return OperationResult("count_lines", file_path, data={"line_count": counts["line_count"],
+                                                            "mb_per_s": counts["mb_per_s"]},
+                           message=f"Line count: {counts['line_count']} ({counts['mb_per_s']:.1f} MB/s)")
+
+def count_text(file_path: str, workers: Optional[int] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Count lines, words, characters and bytes in one pass, like wc.
+
+    Characters are counted in the file's encoding, without its BOM; ``bytes`` is the size of the file.
+    """
+    encoding, bom = decoding.resolve_encoding(file_path, encoding)
+    counts = counting.count_file(file_path, workers, encoding=encoding, skip=bom)
+    data = {key: counts[key] for key in ("lines", "words", "chars", "bytes", "mb_per_s", "workers")}
+    return OperationResult("count_text", file_path, data=data,
+                           message=f"Lines: {counts['lines']}, words: {counts['words']}, "
+                                   f"characters: {counts['chars']}, bytes: {counts['bytes']} "
+                                   f"({counts['seconds']:.2f}s, {counts['mb_per_s']:.1f} MB/s, "
+                                   f"{counts['workers']} worker(s))")
+
+def find_and_replace(file_path: str, find_text: str = "", replace_text: str = "", regex: bool = False,
+                     table: Optional[str] = None, ignore_case: bool = False,
+                     output_path: Optional[str] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Find and replace text in a file, streaming it through a temp file that replaces the target atomically.
+
+    ``table`` names a file of replacement pairs (JSON object or ``find<TAB>replace`` lines)
+    applied together with ``find_text`` in a single pass; with ``regex`` the patterns are
+    regular expressions.
+    """
+    pairs = [(find_text, replace_text)] if find_text else []
+    if table:
+        pairs.extend(replacing.load_table(table))
+    output_path = output_path or file_path
+    size = os.path.getsize(file_path)
+    with decoding.TextSource(file_path, encoding) as source:
+        replacements, counts, seconds = replacing.replace_in_file(source.path, pairs, regex, ignore_case,
+                                                                  source.output(output_path))
+        written = source.finish(output_path)
+    mb_per_s = size / (1024 * 1024) / seconds if seconds > 0 else 0.0
+    message = f"Text replaced successfully: {replacements} replacements ({mb_per_s:.1f} MB/s)."
+    if len(counts) > 1:
+        message += "\n" + "\n".join(f"    {pattern!r}: {count}" for pattern, count in counts.items())
+    return OperationResult("find_and_replace", file_path, [output_path],
+                           {"replacements": replacements, "counts": counts, "mb_per_s": mb_per_s,
+                            "encoding": written}, message + encoding_note(source, written))
+
+def convert_case(file_path: str, case: str, output_path: Optional[str] = None,
+                 workers: Optional[int] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Convert text to upper, lower or title case, streaming it through a temp file that replaces the target.
+
+    Characters whose converted form the file's encoding cannot represent are left unchanged.
+    """
+    output_path = output_path or file_path
+    with decoding.TextSource(file_path, encoding) as source:
+        stats = transforming.convert_case(source.path, case, source.output(output_path), workers,
+                                          source.encoding if source.transcoded else None)
+        written = source.finish(output_path)
+    return OperationResult("convert_case", file_path, [output_path],
+                           {"case": case, "mb_per_s": stats["mb_per_s"], "encoding": written},
+                           f"Text case converted successfully ({stats['mb_per_s']:.1f} MB/s)."
+                           + encoding_note(source, written))
+
+def append_text(file_path: str, new_text: str, encoding: Optional[str] = None) -> OperationResult:
+    """Append text to a file, encoded like the text already in it (UTF-8 for a new file)."""
+    if os.path.exists(file_path):
+        encoding = decoding.resolve_encoding(file_path, encoding)[0]
+    with open(file_path, "ab") as file:
+        file.write(new_text.encode(encoding or "utf-8"))
+    return OperationResult("append_text", file_path, [file_path], message="Text appended successfully.")
+
+def text_to_pdf(file_path: str, output_path: Optional[str] = None, font: str = "Courier", font_size: float = 10.0,
+                margin: float = 54.0, page_size: str = "letter", landscape: bool = False,
+                workers: Optional[int] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Convert a text file to a PDF, wrapping long lines and starting new pages as they fill.
+
+    Lines are streamed, so memory use does not grow with the number of pages;
+    large files are rendered in page ranges on several cores.
+    """
+    pdf_path = output_path or os.path.splitext(file_path)[0] + ".pdf"
+    layout = paginating.Layout(font, font_size, margin, page_size, landscape)
+    with decoding.TextSource(file_path, encoding) as source:
+        stats = paginating.render_file(source.path, pdf_path, layout, workers)
+    return OperationResult("text_to_pdf", file_path, [pdf_path],
+                           {"pages": stats["pages"], "pages_per_s": stats["pages_per_s"], "workers": stats["workers"]},
+                           f"Text file converted to PDF successfully: {pdf_path} "
+                           f"({stats['pages']} pages, {stats['pages_per_s']:.0f} pages/s)")
+
+def calculate_hash(file_path: str, algorithm: str = "sha256") -> OperationResult:
+    """Calculate the hash of a file; several comma-separated algorithms (or "all") share one read pass."""
+    algorithms = hashing.parse_algorithms(algorithm)
+    hashes = hashing.hash_file(file_path, algorithms)
+    message = "\n".join(f"{name.upper()} hash of {file_path}: {value}" for name, value in hashes.items())
+    return OperationResult("calculate_hash", file_path,
+                           data={"algorithm": algorithms[0], "hash": hashes[algorithms[0]], "hashes": hashes},
+                           message=message)
+
+def hash_directory(directory: str, algorithm: str = "sha256", manifest_path: Optional[str] = None,
+                   workers: Optional[int] = None, force: bool = False) -> OperationResult:
+    """Hash every file in a directory tree into a manifest, skipping files unchanged since the last run."""
+    stats = hashing.hash_tree(directory, hashing.parse_algorithms(algorithm), manifest_path, workers, force)
+    return OperationResult("hash_directory", directory, [stats["manifest_path"]], data=stats,
+                           message=f"Hashed {stats['hashed']} files, {stats['skipped']} unchanged "
+                                   f"({stats['mb_per_s']:.1f} MB/s). Manifest saved to {stats['manifest_path']}")
+
+def verify_directory(directory: str, manifest_path: Optional[str] = None,
+                     workers: Optional[int] = None) -> OperationResult:
+    """Re-hash a directory tree and report files that differ from its manifest."""
+    stats = hashing.verify_tree(directory, manifest_path, workers=workers)
+    return OperationResult("verify_directory", directory, data=stats,
+                           message=f"{stats['ok']} files match, {len(stats['modified'])} modified, "
+                                   f"{len(stats['missing'])} missing, {len(stats['added'])} added")
+
+def aes_encrypt(file_path: str, output_path: Optional[str] = None, key: Optional[str] = None,
+                workers: Optional[int] = None) -> OperationResult:
+    """Encrypt a file with AES-256-GCM in independently authenticated chunks.
+
+    The file is streamed with constant memory and large files are encrypted on
+    several cores. A new key is generated unless ``key`` is given.
+    """
+    encrypted_file_path = output_path or os.path.splitext(file_path)[0] + "_encrypted.txt"
+    stats = encrypting.encrypt_file(file_path, encrypted_file_path, key, workers=workers)
+    return OperationResult("aes_encrypt", file_path, [encrypted_file_path],
+                           {"key": stats["key"], "chunks": stats["chunks"], "mb_per_s": stats["mb_per_s"]},
+                           f"File encrypted successfully. Key: {stats['key']}")
+
+def aes_decrypt(file_path: str, key: str, output_path: Optional[str] = None, offset: int = 0,
+                length: Optional[int] = None, workers: Optional[int] = None) -> OperationResult:
+    """Decrypt a file written by ``aes_encrypt``, or only ``length`` bytes from ``offset``.
+
+    Files encrypted with Fernet by older versions are still decrypted (as a
+    whole, in memory).
+    """
+    decrypted_file_path = output_path or os.path.splitext(file_path)[0] + "_decrypted.txt"
+    if not encrypting.is_container(file_path):
+        from cryptography.fernet import Fernet
+
         cipher_suite = Fernet(key.encode())
         with open(file_path, "rb") as file:
-            encrypted_data = file.read()
-        decrypted_data = cipher_suite.decrypt(encrypted_data)
-        decrypted_file_path = os.path.splitext(file_path)[0] + "_decrypted.txt"
+            decrypted_data = cipher_suite.decrypt(file.read())[offset:None if length is None else offset + length]
         with open(decrypted_file_path, "wb") as file:
             file.write(decrypted_data)
-        print("File decrypted successfully.")
-    except Exception as e:
-        print(f"Error decrypting file: {e}")
-
-def split_file(file_path):
-    """Split a text file into multiple smaller files based on a specified number of lines."""
-    try:
-        lines_per_file = int(input("Enter the number of lines per file: "))
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-        
-        for i in range(0, len(lines), lines_per_file):
-            with open(f"{os.path.splitext(file_path)[0]}_part_{i // lines_per_file + 1}.txt", "w") as output_file:
-                output_file.writelines(lines[i:i + lines_per_file])
-        
-        print("File split successfully.")
-    except Exception as e:
-        print(f"Error splitting file: {e}")
-
-def sort_lines(file_path):
-    """Sort the lines in a text file."""
-    try:
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-        lines.sort()
-        with open(file_path, "w") as file:
-            file.writelines(lines)
-        print("Lines sorted successfully.")
-    except Exception as e:
-        print(f"Error sorting lines: {e}")
-
-def reverse_content(file_path):
-    """Reverse the content of a text file."""
-    try:
-        with open(file_path, "r") as file:
-            content = file.read()
-        reversed_content = content[::-1]
-        with open(file_path, "w") as file:
-            file.write(reversed_content)
-        print("Content reversed successfully.")
-    except Exception as e:
-        print(f"Error reversing content: {e}")
-
-def merge_files(file_paths):
-    """Merge multiple text files into one."""
-    try:
-        merged_file_path = "merged_file.txt"
-        with open(merged_file_path, "w") as merged_file:
-            for file_path in file_paths:
-                with open(file_path, "r") as file:
-                    merged_file.write(file.read() + "\n")
-        print(f"Files merged successfully into: {merged_file_path}")
-    except Exception as e:
-        print(f"Error merging files: {e}")
-
-def remove_duplicates(file_path):
-    """Remove duplicate lines from a text file."""
-    try:
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-        unique_lines = list(set(lines))
-        with open(file_path, "w") as file:
-            file.writelines(unique_lines)
-        print("Duplicate lines removed successfully.")
-    except Exception as e:
-        print(f"Error removing duplicates: {e}")
-
-def extract_sections_by_keyword(file_path):
-    """Extract sections of text based on a keyword."""
-    try:
-        keyword = input("Enter the keyword to search for: ")
-        output_path = os.path.splitext(file_path)[0] + "_extracted.txt"
-        with open(file_path, "r") as file:
-            lines = file.readlines()
-        
-        extracted_lines = [line for line in lines if keyword in line]
-        
-        with open(output_path, "w") as output_file:
-            output_file.writelines(extracted_lines)
-        
-        print(f"Extracted sections containing '{keyword}' successfully: {output_path}")
-    except Exception as e:
-        print(f"Error extracting sections: {e}")
+        return OperationResult("aes_decrypt", file_path, [decrypted_file_path], {"bytes": len(decrypted_data)},
+                               "File decrypted successfully.")
+    stats = encrypting.decrypt_file(file_path, decrypted_file_path, key, offset, length, workers)
+    return OperationResult("aes_decrypt", file_path, [decrypted_file_path],
+                           {"bytes": stats["bytes"], "mb_per_s": stats["mb_per_s"]},
+                           f"File decrypted successfully ({stats['bytes']} bytes).")
+
+def split_file(file_path: str, lines_per_file: Optional[int] = None, bytes_per_file: Optional[str] = None,
+               parts: Optional[int] = None, name_template: str = splitting.DEFAULT_TEMPLATE, compress: bool = False,
+               output_dir: Optional[str] = None, workers: Optional[int] = None,
+               encoding: Optional[str] = None) -> OperationResult:
+    """Split a text file by number of lines, by size (such as ``64M``, cut at line ends) or into equal parts.
+
+    Parts are named by ``name_template`` (``{stem}``, ``{ext}``, ``{index}``) and gzip-compressed
+    with ``compress``. They keep the file's encoding; sizes are measured in UTF-8 for files that
+    are not ASCII-compatible (such as UTF-16).
+    """
+    output_dir = output_dir or os.path.dirname(file_path)
+    with decoding.TextSource(file_path, encoding, raw=True) as source:
+        stats = splitting.split_file(source.path, lines_per_file,
+                                     cache.parse_size(bytes_per_file) if bytes_per_file else None, parts,
+                                     name_template, source.output_dir(output_dir), compress, workers=workers)
+        output_paths = [os.path.join(output_dir, os.path.basename(path)) for path in stats.pop("output_paths")]
+        for path in output_paths:
+            source.finish(path, compress)
+    return OperationResult("split_file", file_path, output_paths, dict(stats, parts=len(output_paths)),
+                           f"File split successfully into {len(output_paths)} parts ({stats['mb_per_s']:.1f} MB/s).")
+
+def sort_lines(file_path: str, numeric: bool = False, key_field: Optional[int] = None,
+               separator: Optional[str] = None, ignore_case: bool = False, reverse: bool = False,
+               unique: bool = False, max_memory: str = "256M", workers: Optional[int] = None,
+               output_path: Optional[str] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Sort the lines in a text file, spilling sorted runs to disk when it does not fit in ``max_memory``.
+
+    ``key_field`` (numbered from 1) sorts on one field split by ``separator`` (whitespace by default).
+    """
+    options = sorting.SortOptions(numeric, key_field, separator, ignore_case, reverse, unique)
+    output_path = output_path or file_path
+    with decoding.TextSource(file_path, encoding) as source:
+        stats = sorting.sort_file(source.path, options, source.output(output_path), cache.parse_size(max_memory),
+                                  workers)
+        source.finish(output_path)
+    order = options.describe()
+    message = f"Lines sorted successfully{f' ({order})' if order else ''}: {stats['lines_written']} lines, " \
+              f"{stats['mb_per_s']:.1f} MB/s."
+    if stats["runs"]:
+        message += f" Spilled {stats['runs']} runs ({stats['spilled_bytes'] / (1024 * 1024):.1f} MB), " \
+                   f"{stats['merge_passes']} merge passes."
+    return OperationResult("sort_lines", file_path, [output_path], dict(stats, line_count=stats["lines_written"]),
+                           message)
+
+def reverse_content(file_path: str, mode: str = "characters", output_path: Optional[str] = None,
+                    encoding: Optional[str] = None) -> OperationResult:
+    """Reverse the characters of a text file, or the order of its lines with ``mode="lines"`` (like tac)."""
+    output_path = output_path or file_path
+    with decoding.TextSource(file_path, encoding, raw=mode == "lines") as source:
+        stats = transforming.reverse_file(source.path, mode, source.output(output_path))
+        source.finish(output_path)
+    return OperationResult("reverse_content", file_path, [output_path], {"mode": mode, "mb_per_s": stats["mb_per_s"]},
+                           f"Content reversed successfully ({stats['mb_per_s']:.1f} MB/s).")
+
+def merge_files(file_paths: List[str], output_path: str = "merged_file.txt", separator: str = "\n",
+                ensure_newline: bool = False) -> OperationResult:
+    """Merge multiple text files into one, writing ``separator`` after each.
+
+    The bytes are copied by the kernel and never read into Python. With ``ensure_newline``,
+    files that do not end with a newline get one before the separator.
+    """
+    size, methods = concatenating.concatenate(file_paths, output_path, separator.encode("utf-8"), ensure_newline)
+    return OperationResult("merge_files", ",".join(file_paths), [output_path],
+                           {"files": len(file_paths), "bytes": size, "copy_methods": methods},
+                           f"Files merged successfully into: {output_path}")
+
+def remove_duplicates(file_path: str, approximate: bool = False, error_rate: float = 0.001,
+                      max_memory: str = "256M", output_path: Optional[str] = None,
+                      encoding: Optional[str] = None) -> OperationResult:
+    """Remove duplicate lines from a text file, keeping the first occurrence of each in order.
+
+    Beyond ``max_memory`` of line digests the rest of the file is deduplicated through disk
+    partitions; ``approximate`` uses a Bloom filter instead, which may also drop a unique line
+    with probability ``error_rate``.
+    """
+    output_path = output_path or file_path
+    with decoding.TextSource(file_path, encoding, raw=True) as source:
+        stats = deduplicating.deduplicate_file(source.path, source.output(output_path), cache.parse_size(max_memory),
+                                               approximate, error_rate)
+        source.finish(output_path)
+    message = f"Duplicate lines removed successfully: {stats['duplicates_removed']} of {stats['lines']} lines " \
+              f"({stats['mode']}, {stats['memory_bytes'] / (1024 * 1024):.1f} MB of digests, " \
+              f"{stats['mb_per_s']:.1f} MB/s)."
+    if stats["partitions"]:
+        message += f" Spilled {stats['spilled_bytes'] / (1024 * 1024):.1f} MB to {stats['partitions']} partitions."
+    return OperationResult("remove_duplicates", file_path, [output_path], stats, message)
+
+def extract_sections_by_keyword(file_path: str, keyword: str = "", keywords_file: Optional[str] = None,
+                                regex: bool = False, ignore_case: bool = False, before: int = 0, after: int = 0,
+                                line_numbers: bool = False, workers: Optional[int] = None,
+                                output_path: Optional[str] = None, encoding: Optional[str] = None) -> OperationResult:
+    """Extract the lines matching a keyword, or any of the keywords listed in ``keywords_file``.
+
+    ``before`` and ``after`` add context lines around each match; with ``regex`` the keywords
+    are regular expressions. ``ignore_case`` matches keywords in any case; for regular
+    expressions it only folds ASCII letters.
+    """
+    output_path = output_path or os.path.splitext(file_path)[0] + "_extracted.txt"
+    keywords = [keyword] if keyword else []
+    if keywords_file:
+        keywords.extend(grepping.load_keywords(keywords_file))
+    # Plain ASCII keywords are found in the raw bytes of any ASCII-compatible file.
+    raw = not regex and all(keyword.isascii() for keyword in keywords)
+    with decoding.TextSource(file_path, encoding, raw) as source:
+        stats = grepping.grep_file(source.path, source.output(output_path), keywords, regex, ignore_case, before,
+                                   after, line_numbers, workers)
+        source.finish(output_path)
+    if len(stats["counts"]) == 1:
+        searched = f"'{keywords[0]}'"
+    else:
+        searched = f"{len(stats['counts'])} keywords"
+    message = f"Extracted {stats['matched_lines']} lines containing {searched} successfully " \
+              f"({stats['mb_per_s']:.1f} MB/s): {output_path}"
+    if len(stats["counts"]) > 1:
+        message += "\n" + "\n".join(f"    {pattern}: {count}" for pattern, count in stats["counts"].items())
+    return OperationResult("extract_sections_by_keyword", file_path, [output_path],
+                           {"matches": stats["matched_lines"], "counts": stats["counts"],
+                            "mb_per_s": stats["mb_per_s"], "workers": stats["workers"]}, message)
+
+def view_lines(file_path: str, start: Optional[int] = None, count: int = 10, tail: bool = False,
+               percent: Optional[float] = None, use_index: bool = True,
+               encoding: Optional[str] = None) -> OperationResult:
+    """Show ``count`` lines from line ``start`` (1-based), from the end with ``tail``, or from ``percent`` of the file.
+
+    Large files get a sidecar line-offset index (``<file>.lineidx``) on first use, so later
+    lookups seek straight to the line instead of reading up to it. Files that are not
+    ASCII-compatible (such as UTF-16) are read through a UTF-8 copy and not indexed.
+    """
+    with decoding.TextSource(file_path, encoding, raw=True) as source:
+        index = line_index.get_index(source.path) if use_index and not source.transcoded else None
+        if tail:
+            offset = line_index.tail_offset(source.path, count)
+        elif percent is not None:
+            offset = line_index.percent_offset(source.path, percent)
+        else:
+            offset = line_index.line_start_offset(source.path, max((start or 1) - 1, 0), index)
+        lines = [line.decode(source.output_encoding, "replace").rstrip("\r\n")
+                 for line in line_index.read_from(source.path, offset, count)]
+    if start is not None and not tail and percent is None:
+        first_line = start
+    elif index is not None:
+        first_line = index.line_at(offset) + 1
+    else:
+        first_line = None
+    width = len(str((first_line or 0) + len(lines)))
+    message = "\n".join(f"{first_line + number:>{width}}: {line}" if first_line else line
+                         for number, line in enumerate(lines)) or "No lines to show."
+    return OperationResult("view_lines", file_path,
+                           data={"lines": lines, "first_line": first_line, "offset": offset,
+                                 "indexed": index is not None}, message=message)
 
 def handle_text(file_path):
     print("1. Count Words")
@@ -219,48 +347,147 @@ def handle_text(file_path):
     print("13. Merge Multiple Files")
     print("14. Remove Duplicate Lines")
     print("15. Extract Sections by Keyword")
-    
+    print("16. Count Lines, Words and Characters")
+    print("17. View Lines (by number, tail or percentage)")
+
     choice = input("Select option: ")
     if choice == "1":
-        count_words(file_path)
+        try:
+            print(count_words(file_path).message)
+        except Exception as e:
+            print(f"Error counting words: {e}")
     elif choice == "2":
-        count_lines(file_path)
+        try:
+            print(count_lines(file_path).message)
+        except Exception as e:
+            print(f"Error counting lines: {e}")
     elif choice == "3":
-        find_and_replace(file_path)
+        try:
+            regex = input("Treat the search text as a regular expression? (y/n): ").strip().lower() == "y"
+            find_text = input("Enter the text to find: ")
+            replace_text = input("Enter the text to replace with: ")
+            table = input("Replacement table file to apply as well (leave empty for none): ").strip() or None
+            print(find_and_replace(file_path, find_text, replace_text, regex, table).message)
+        except Exception as e:
+            print(f"Error finding and replacing text: {e}")
     elif choice == "4":
-        convert_case(file_path)
+        print("1. Convert to UPPERCASE")
+        print("2. Convert to lowercase")
+        print("3. Convert to Title Case")
+        case = {"1": "upper", "2": "lower", "3": "title"}.get(input("Select option: "))
+        if case is None:
+            print("Invalid option selected.")
+            return
+        try:
+            print(convert_case(file_path, case).message)
+        except Exception as e:
+            print(f"Error converting text case: {e}")
     elif choice == "5":
-        append_text(file_path)
+        try:
+            new_text = input("Enter text to append: ")
+            print(append_text(file_path, new_text).message)
+        except Exception as e:
+            print(f"Error appending text: {e}")
     elif choice == "6":
-        text_to_pdf(file_path)
+        try:
+            print(text_to_pdf(file_path).message)
+        except Exception as e:
+            print(f"Error converting text to PDF: {e}")
     elif choice == "7":
-        print("1. SHA-256\n2. SHA-1\n3. MD5")
-        hash_choice = input("Select hashing algorithm: ")
-        if hash_choice == "1":
-            calculate_hash(file_path, "sha256")
-        elif hash_choice == "2":
-            calculate_hash(file_path, "sha1")
-        elif hash_choice == "3":
-            calculate_hash(file_path, "md5")
-        else:
+        print("1. SHA-256\n2. SHA-1\n3. MD5\n4. BLAKE2b\n5. All of them (one pass)")
+        algorithm = {"1": "sha256", "2": "sha1", "3": "md5", "4": "blake2b",
+                     "5": "all"}.get(input("Select hashing algorithm: "))
+        if algorithm is None:
             print("Invalid option selected.")
+            return
+        try:
+            print(calculate_hash(file_path, algorithm).message)
+        except Exception as e:
+            print(f"Error calculating hash: {e}")
     elif choice == "8":
-        aes_encrypt(file_path)
+        try:
+            print(aes_encrypt(file_path).message)
+        except Exception as e:
+            print(f"Error encrypting file: {e}")
     elif choice == "9":
-        key = input("Enter the AES decryption key: ")
-        aes_decrypt(file_path, key)
+        try:
+            key = input("Enter the AES decryption key: ")
+            print(aes_decrypt(file_path, key).message)
+        except Exception as e:
+            print(f"Error decrypting file: {e}")
     elif choice == "10":
-        split_file(file_path)
+        try:
+            mode = input("Split by (1) number of lines, (2) size or (3) into equal parts? ").strip()
+            if mode == "2":
+                print(split_file(file_path, bytes_per_file=input("Enter the maximum part size (e.g. 64M): ")).message)
+            elif mode == "3":
+                print(split_file(file_path, parts=int(input("Enter the number of parts: "))).message)
+            else:
+                lines_per_file = int(input("Enter the number of lines per file: "))
+                print(split_file(file_path, lines_per_file).message)
+        except Exception as e:
+            print(f"Error splitting file: {e}")
     elif choice == "11":
-        sort_lines(file_path)
+        try:
+            numeric = input("Sort numerically? (y/n): ").strip().lower() == "y"
+            ignore_case = not numeric and input("Ignore case? (y/n): ").strip().lower() == "y"
+            key_field = input("Field to sort by (leave empty for the whole line): ").strip()
+            reverse = input("Reverse order? (y/n): ").strip().lower() == "y"
+            unique = input("Keep only unique lines? (y/n): ").strip().lower() == "y"
+            print(sort_lines(file_path, numeric, int(key_field) if key_field else None, None, ignore_case,
+                             reverse, unique).message)
+        except Exception as e:
+            print(f"Error sorting lines: {e}")
     elif choice == "12":
-        reverse_content(file_path)
+        print("1. Reverse characters")
+        print("2. Reverse line order")
+        mode = {"1": "characters", "2": "lines"}.get(input("Select option: "))
+        if mode is None:
+            print("Invalid option selected.")
+            return
+        try:
+            print(reverse_content(file_path, mode).message)
+        except Exception as e:
+            print(f"Error reversing content: {e}")
     elif choice == "13":
-        file_paths = input("Enter the paths of the files to merge (comma-separated): ").split(",")
-        merge_files([f.strip() for f in file_paths])
+        try:
+            file_paths = input("Enter the paths of the files to merge (comma-separated): ").split(",")
+            print(merge_files([f.strip() for f in file_paths]).message)
+        except Exception as e:
+            print(f"Error merging files: {e}")
     elif choice == "14":
-        remove_duplicates(file_path)
+        try:
+            approximate = input("Use approximate mode for very large files (may drop rare unique lines)? (y/n): ")
+            print(remove_duplicates(file_path, approximate.strip().lower() == "y").message)
+        except Exception as e:
+            print(f"Error removing duplicates: {e}")
     elif choice == "15":
-        extract_sections_by_keyword(file_path)
+        try:
+            keyword = input("Enter the keyword to search for (leave empty to use a keyword file): ")
+            keywords_file = None if keyword else input("Enter the path of the file with one keyword per line: ")
+            context = input("Number of context lines around each match (default 0): ").strip()
+            context = int(context) if context else 0
+            print(extract_sections_by_keyword(file_path, keyword, keywords_file, before=context,
+                                              after=context).message)
+        except Exception as e:
+            print(f"Error extracting sections: {e}")
+    elif choice == "16":
+        try:
+            print(count_text(file_path).message)
+        except Exception as e:
+            print(f"Error counting text: {e}")
+    elif choice == "17":
+        try:
+            position = input("Enter a line number, 'tail', or a percentage such as 50%: ").strip().lower()
+            count = input("Number of lines to show (default 10): ").strip()
+            count = int(count) if count else 10
+            if position == "tail":
+                print(view_lines(file_path, count=count, tail=True).message)
+            elif position.endswith("%"):
+                print(view_lines(file_path, count=count, percent=float(position[:-1])).message)
+            else:
+                print(view_lines(file_path, int(position), count).message)
+        except Exception as e:
+            print(f"Error viewing lines: {e}")
     else:
         print("Invalid option selected.")
@@ -0,0 +1,199 @@
+"""Phase-level tracing and profiling for operations.
+
+Tracing is off by default and ``phase`` is then a cheap no-op, so handlers can
+mark their decode, transform, encode and I/O phases unconditionally:
+
+    with tracing.phase("decode"):
+        img.load()
+
+When a tracer is active, every operation and phase is recorded with its wall
+time, bytes read and written, and peak memory, and the events can be saved in
+Chrome trace-event format (open them in chrome://tracing or Perfetto).
+"""
+import contextlib
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+
+_tracer = None
+
+def read_io():
+    """Bytes this process has read and written so far, or (None, None) where unavailable."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as io_file:
+            counters = dict(line.split(":") for line in io_file)
+        return int(counters["rchar"]), int(counters["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+def reset_peak_memory():
+    """Reset the peak RSS counter so the next reading covers only what follows (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_memory():
+    """Peak resident set size in bytes, since the last reset where supported."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class Tracer:
+    """Collects complete ("X") trace events from any thread of this process."""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def add(self, name, category, start_ns, end_ns, args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            # Monotonic microseconds, so events from worker processes line up.
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def summary(self):
+        """Total time, calls and bytes per (category, name)."""
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault((event["cat"], event["name"]), {"calls": 0, "ms": 0.0, "read": 0, "written": 0})
+            entry["calls"] += 1
+            entry["ms"] += event["dur"] / 1000
+            entry["read"] += event["args"].get("bytes_read") or 0
+            entry["written"] += event["args"].get("bytes_written") or 0
+        return totals
+
+def start():
+    """Start recording events in this process and return the tracer."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+def stop():
+    """Stop recording and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+def active():
+    return _tracer is not None
+
+def finish(tracer, name, category, start_ns, io_before, args):
+    """Add an event ending now, with the I/O done and peak memory reached since it started."""
+    end_ns = time.monotonic_ns()
+    read_after, written_after = read_io()
+    if io_before[0] is not None:
+        args["bytes_read"] = read_after - io_before[0]
+        args["bytes_written"] = written_after - io_before[1]
+    args["peak_rss_mb"] = round(peak_memory() / (1024 * 1024), 2)
+    tracer.add(name, category, start_ns, end_ns, args)
+
+@contextlib.contextmanager
+def phase(name, **args):
+    """Mark a phase of an operation (decode, transform, encode, io, ...).
+
+    Yields the event's argument dictionary so callers can attach details.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+    io_before = read_io()
+    start_ns = time.monotonic_ns()
+    try:
+        yield args
+    finally:
+        finish(tracer, name, "phase", start_ns, io_before, args)
+
+def traced(function):
+    """Wrap an operation so each call is recorded while a tracer is active."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return function(*args, **kwargs)
+        tracer = _tracer
+        reset_peak_memory()
+        details = {"input": str(args[0])} if args else {}
+        io_before = read_io()
+        start_ns = time.monotonic_ns()
+        details["ok"] = False
+        try:
+            result = function(*args, **kwargs)
+            details["ok"] = True
+            return result
+        finally:
+            finish(tracer, function.__name__, "operation", start_ns, io_before, details)
+    wrapper.traced = True
+    return wrapper
+
+def instrument(module, names):
+    """Replace a handler module's operations with traced versions, so its menu records them too."""
+    for name in names:
+        function = getattr(module, name)
+        if not getattr(function, "traced", False):
+            setattr(module, name, traced(function))
+
+def save_trace(path, events):
+    """Write events as a Chrome trace-event JSON file."""
+    with open(path, "w", encoding="utf-8") as trace_file:
+        json.dump({"traceEvents": sorted(events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"},
+                  trace_file)
+
+def print_summary(tracer):
+    """Print time and bytes per operation and phase."""
+    print(f"{'':<10}{'name':<30}{'calls':>6}{'total ms':>12}{'read MB':>10}{'written MB':>12}")
+    for (category, name), entry in sorted(tracer.summary().items(), key=lambda item: -item[1]["ms"]):
+        print(f"{category:<10}{name:<30}{entry['calls']:>6}{entry['ms']:>12.1f}"
+              f"{entry['read'] / (1024 * 1024):>10.2f}{entry['written'] / (1024 * 1024):>12.2f}")
+
+@contextlib.contextmanager
+def profiled(path):
+    """Run the enclosed code under cProfile and dump the stats to ``path``."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+def merge_profiles(paths, output_path):
+    """Merge several cProfile dumps into one and remove the parts."""
+    import pstats
+
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return
+    pstats.Stats(*paths).dump_stats(output_path)
+    for path in paths:
+        os.unlink(path)
+
+def add_trace_arguments(parser):
+    """Register the shared --trace and --profile options on an argument parser."""
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record per-operation phase timings, bytes read/written and peak memory "
+                             "to a Chrome trace-event JSON file")
+    parser.add_argument("--profile", metavar="FILE", help="Write a cProfile dump of the operations to FILE")
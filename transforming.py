@@ -0,0 +1,226 @@
+"""Chunked text transforms: case conversion, line reversal and character reversal.
+
+Every transform reads the file in large blocks and writes a temporary file
+next to the target that atomically replaces it once complete, so memory use
+is constant and an interrupted run never leaves a half-written file.
+
+Case conversion only depends on the text around each character within a
+line, so blocks are cut at line ends (or, inside a very long line, at a
+space) and large files are converted in line-aligned ranges on several
+cores, each into its own part file; the parts are then joined by the kernel.
+Blocks of pure ASCII are converted as bytes without decoding. A file that is
+written back in a legacy encoding keeps any character whose upper or lower
+case that encoding cannot represent (``µ`` in Windows-1252, whose upper case
+is the Greek ``Μ``).
+
+Line reversal (like ``tac``) and character reversal read the file backwards
+from the end with seeks. The whole file is needed before the first output
+byte is known, so they run in one process.
+"""
+import codecs
+import functools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import concatenating
+import sorting
+
+BLOCK_SIZE = 4 * 1024 * 1024
+# Files smaller than this are converted in-process; starting workers costs more than it saves.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+MIN_RANGE_SIZE = 32 * 1024 * 1024
+CASES = ("upper", "lower", "title")
+ENCODING = "utf-8"
+# Undecodable bytes survive the round trip unchanged.
+ERRORS = "surrogateescape"
+
+def representable(char, encoding):
+    try:
+        char.encode(encoding)
+        return True
+    except UnicodeEncodeError:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def kept_characters(case, encoding):
+    """Return ``(converted, original)`` pairs for characters of ``encoding`` whose converted form it cannot represent."""
+    kept = {}
+    for code in range(0x80, 0x10000):
+        char = chr(code)
+        # In title case a letter becomes its title case at the start of a word and its lower case elsewhere.
+        results = (char.title(), char.lower()) if case == "title" else (getattr(char, case)(),)
+        for result in results:
+            if len(result) == 1 and result != char and not representable(result, encoding) \
+                    and representable(char, encoding):
+                kept.setdefault(result, char)
+    return tuple(kept.items())
+
+def convert_block(block, case, encoding=None):
+    """Convert the case of a block that starts and ends at a line end or a space.
+
+    With ``encoding``, characters whose converted form it cannot represent are kept as they are.
+    """
+    if block.isascii():
+        return block.upper() if case == "upper" else block.lower() if case == "lower" else block.title()
+    text = block.decode(ENCODING, ERRORS)
+    converted = text.upper() if case == "upper" else text.lower() if case == "lower" else text.title()
+    if encoding is not None:
+        for result, original in kept_characters(case, encoding):
+            if result in converted:
+                converted = converted.replace(result, original)
+    return converted.encode(ENCODING, ERRORS)
+
+def block_cut(block):
+    """Where to end a block so the rest can be converted with the next one: after the last newline or space.
+
+    Without either, the block is cut at the last UTF-8 character boundary.
+    """
+    cut = block.rfind(b"\n") + 1 or block.rfind(b" ") + 1
+    if cut:
+        return cut
+    cut = len(block)
+    while cut > 0 and len(block) - cut < 4 and 0x80 <= block[cut - 1] < 0xC0:
+        cut -= 1
+    return cut - 1 if cut > 0 and block[cut - 1] >= 0xC0 else len(block)
+
+def convert_range(file_path, start, end, output, case, encoding=None):
+    """Convert ``[start, end)`` of a file (starting at a line start) and write it to an open binary file."""
+    pending = b""
+    with open(file_path, "rb") as source:
+        source.seek(start)
+        position = start
+        while position < end:
+            block = source.read(min(BLOCK_SIZE, end - position))
+            if not block:
+                break
+            position += len(block)
+            block = pending + block
+            cut = block_cut(block) if position < end else len(block)
+            output.write(convert_block(block[:cut], case, encoding))
+            pending = block[cut:]
+    output.write(convert_block(pending, case, encoding))
+
+def convert_range_to_file(file_path, start, end, part_path, case, encoding):
+    with open(part_path, "wb") as part:
+        convert_range(file_path, start, end, part, case, encoding)
+    return part_path
+
+def write_atomically(file_path, target, write):
+    """Call ``write(temp_file)`` on a temporary file next to ``target``, then move it over ``target``.
+
+    The result keeps the permissions of ``file_path``; returns what ``write`` returns.
+    """
+    handle, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.",
+                                         dir=os.path.dirname(os.path.abspath(target)))
+    try:
+        with open(handle, "wb") as temp_file:
+            result = write(temp_file)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return result
+
+def convert_case(file_path, case, output_path=None, workers=None, encoding=None):
+    """Convert a file to upper, lower or title case; in place unless ``output_path`` is given.
+
+    ``encoding`` is the encoding the (UTF-8) result will be written back in, if
+    any; characters whose converted form it cannot represent are left unchanged.
+    Returns statistics: bytes, workers, seconds and MB/s.
+    """
+    if case not in CASES:
+        raise ValueError(f"Unsupported case: {case} (expected one of: {', '.join(CASES)})")
+    # Any UTF encoding can represent every case mapping.
+    if encoding is not None and codecs.lookup(encoding).name.startswith("utf"):
+        encoding = None
+    start_time = time.perf_counter()
+    target = output_path or file_path
+    size = os.path.getsize(file_path)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = max(1, min(workers, size // MIN_RANGE_SIZE)) if size >= PARALLEL_THRESHOLD else 1
+    ranges = sorting.line_ranges(file_path, parts) if parts > 1 else [(0, size)]
+
+    def write(output):
+        if len(ranges) == 1:
+            convert_range(file_path, 0, size, output, case, encoding)
+            return
+        part_dir = tempfile.mkdtemp(prefix=".uft-case-", dir=os.path.dirname(os.path.abspath(target)))
+        try:
+            part_paths = [os.path.join(part_dir, f"part{index}") for index in range(len(ranges))]
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(convert_range_to_file, file_path, start, end, part_path, case, encoding)
+                           for (start, end), part_path in zip(ranges, part_paths)]
+                for future in futures:
+                    future.result()
+            copier = concatenating.Copier()
+            output.flush()
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    copier.copy(part.fileno(), output.fileno(), 0, os.fstat(part.fileno()).st_size)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    write_atomically(file_path, target, write)
+    elapsed = time.perf_counter() - start_time
+    return {"bytes": size, "workers": len(ranges), "seconds": elapsed,
+            "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
+
+def read_backwards(file, end):
+    """Yield the blocks of ``[0, end)`` of an open file from the last to the first."""
+    position = end
+    while position > 0:
+        step = min(BLOCK_SIZE, position)
+        position -= step
+        file.seek(position)
+        yield file.read(step)
+
+def reverse_lines(source, output, size):
+    """Write the lines of ``source`` in reverse order, like ``tac``.
+
+    A file that ends with a newline gives output that ends with one; a last
+    line without a newline becomes the first output line.
+    """
+    source.seek(max(size - 1, 0))
+    trailing = size > 0 and source.read(1) == b"\n"
+    carry = b""
+    for block in read_backwards(source, size - trailing):
+        lines = (block + carry).split(b"\n")
+        carry = lines[0]
+        if len(lines) > 1:
+            output.write(b"\n".join(reversed(lines[1:])) + b"\n")
+    output.write(carry + (b"\n" if trailing else b""))
+
+def reverse_characters(source, output, size):
+    """Write the characters of ``source`` in reverse order, keeping multi-byte UTF-8 characters intact."""
+    carry = b""
+    for block in read_backwards(source, size):
+        block += carry
+        # Hold back continuation bytes at the start; their lead byte is in the previous block.
+        start = 0
+        while start < min(3, len(block)) and 0x80 <= block[start] < 0xC0:
+            start += 1
+        carry, block = block[:start], block[start:]
+        output.write(block.decode(ENCODING, ERRORS)[::-1].encode(ENCODING, ERRORS))
+    output.write(carry.decode(ENCODING, ERRORS)[::-1].encode(ENCODING, ERRORS))
+
+def reverse_file(file_path, mode="characters", output_path=None):
+    """Reverse a file's ``lines`` or ``characters``, in place unless ``output_path`` is given.
+
+    Returns statistics: bytes, seconds and MB/s.
+    """
+    reversers = {"lines": reverse_lines, "characters": reverse_characters}
+    if mode not in reversers:
+        raise ValueError(f"Unsupported reverse mode: {mode} (expected 'lines' or 'characters')")
+    start_time = time.perf_counter()
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as source:
+        write_atomically(file_path, output_path or file_path, lambda output: reversers[mode](source, output, size))
+    elapsed = time.perf_counter() - start_time
+    return {"bytes": size, "seconds": elapsed, "mb_per_s": size / (1024 * 1024) / elapsed if elapsed > 0 else 0.0}
@@ -1,4 +1,146 @@
-from moviepy.editor import TextClip, CompositeVideoClip, vfx, AudioFileClip
+import os
+import time
+from typing import List, Optional
+from moviepy.editor import (VideoFileClip, TextClip, CompositeVideoClip, AudioFileClip,
+                            concatenate_videoclips, vfx)
+from results import OperationResult
+import tracing
+
+def open_video(file_path):
+    """Open a video clip; probing the container is traced as the decode phase."""
+    with tracing.phase("decode", step="open"):
+        return VideoFileClip(file_path)
+
+def write_video(clip, output_path):
+    """Render a clip to a file.
+
+    moviepy decodes, applies effects and encodes frame by frame, so when tracing
+    the time spent producing frames is measured apart from the time spent encoding.
+    """
+    if not tracing.active():
+        clip.write_videofile(output_path)
+        return
+    frames = {"count": 0, "ns": 0}
+
+    def timed_frame(get_frame, t):
+        start = time.perf_counter_ns()
+        frame = get_frame(t)
+        frames["ns"] += time.perf_counter_ns() - start
+        frames["count"] += 1
+        return frame
+
+    with tracing.phase("render") as details:
+        render_start = time.perf_counter_ns()
+        clip.fl(timed_frame).write_videofile(output_path)
+        render_ns = time.perf_counter_ns() - render_start
+        details["frames"] = frames["count"]
+        details["decode_transform_ms"] = round(frames["ns"] / 1e6, 2)
+        details["encode_ms"] = round((render_ns - frames["ns"]) / 1e6, 2)
+
+def get_video_duration(file_path: str) -> OperationResult:
+    """Get the duration of a video in seconds."""
+    with open_video(file_path) as video:
+        duration = video.duration
+    return OperationResult("get_video_duration", file_path, data={"duration": duration},
+                           message=f"Video duration: {duration} seconds")
+
+def extract_audio(file_path: str, output_path: Optional[str] = None) -> OperationResult:
+    """Extract the audio track of a video to an MP3 file."""
+    audio_path = output_path or os.path.splitext(file_path)[0] + "_audio.mp3"
+    with open_video(file_path) as video:
+        if video.audio is None:
+            raise ValueError("The video has no audio track.")
+        with tracing.phase("encode"):
+            video.audio.write_audiofile(audio_path)
+    return OperationResult("extract_audio", file_path, [audio_path],
+                           message=f"Audio extracted successfully: {audio_path}")
+
+def concatenate_videos(video_files: List[str], output_path: str = "concatenated_video.mp4") -> OperationResult:
+    """Concatenate several videos into one."""
+    clips = [open_video(v.strip()) for v in video_files]
+    try:
+        final_clip = concatenate_videoclips(clips)
+        write_video(final_clip, output_path)
+    finally:
+        for clip in clips:
+            clip.close()
+    return OperationResult("concatenate_videos", ",".join(video_files), [output_path], {"files": len(clips)},
+                           f"Videos concatenated successfully: {output_path}")
+
+def resize_video(file_path: str, width: int, height: int, output_path: Optional[str] = None) -> OperationResult:
+    """Resize a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_resized.mp4"
+    with open_video(file_path) as video:
+        resized_video = video.resize(newsize=(width, height))
+        write_video(resized_video, output_path)
+    return OperationResult("resize_video", file_path, [output_path], {"size": [width, height]},
+                           f"Video resized successfully: {output_path}")
+
+def add_text_to_video(file_path: str, text: str, fontsize: int = 50, color: str = "white",
+                      output_path: Optional[str] = None) -> OperationResult:
+    """Overlay centred text on a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_text_added.mp4"
+    with open_video(file_path) as video:
+        text_clip = TextClip(text, fontsize=fontsize, color=color)
+        text_clip = text_clip.set_position('center').set_duration(video.duration)
+        final_video = CompositeVideoClip([video, text_clip])
+        write_video(final_video, output_path)
+    return OperationResult("add_text_to_video", file_path, [output_path],
+                           message=f"Text added successfully: {output_path}")
+
+def change_video_speed(file_path: str, speed_factor: float, output_path: Optional[str] = None) -> OperationResult:
+    """Change the playback speed of a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_speed_changed.mp4"
+    with open_video(file_path) as video:
+        sped_up_video = video.fx(vfx.speedx, speed_factor)
+        write_video(sped_up_video, output_path)
+    return OperationResult("change_video_speed", file_path, [output_path], {"speed_factor": speed_factor},
+                           f"Video speed changed successfully: {output_path}")
+
+def fade_in_video(file_path: str, fade_duration: float, output_path: Optional[str] = None) -> OperationResult:
+    """Apply a fade-in effect to a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_fade_in.mp4"
+    with open_video(file_path) as video:
+        faded_video = video.fx(vfx.fadein, fade_duration)
+        write_video(faded_video, output_path)
+    return OperationResult("fade_in_video", file_path, [output_path], {"fade_duration": fade_duration},
+                           f"Fade-in effect applied successfully: {output_path}")
+
+def add_background_music(file_path: str, music_path: str, output_path: Optional[str] = None) -> OperationResult:
+    """Replace the audio track of a video with a music file."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_with_music.mp4"
+    with open_video(file_path) as video, AudioFileClip(music_path) as audio:
+        final_video = video.set_audio(audio)
+        write_video(final_video, output_path)
+    return OperationResult("add_background_music", file_path, [output_path],
+                           message=f"Background music added successfully: {output_path}")
+
+def trim_video(file_path: str, start_time: float, end_time: float, output_path: Optional[str] = None) -> OperationResult:
+    """Trim a video to the given time range in seconds."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_trimmed.mp4"
+    with open_video(file_path) as video:
+        trimmed_video = video.subclip(start_time, end_time)
+        write_video(trimmed_video, output_path)
+    return OperationResult("trim_video", file_path, [output_path], {"start_time": start_time, "end_time": end_time},
+                           f"Video trimmed successfully: {output_path}")
+
+def rotate_video(file_path: str, rotation_angle: int, output_path: Optional[str] = None) -> OperationResult:
+    """Rotate a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_rotated.mp4"
+    with open_video(file_path) as video:
+        rotated_video = video.rotate(rotation_angle)
+        write_video(rotated_video, output_path)
+    return OperationResult("rotate_video", file_path, [output_path], {"angle": rotation_angle},
+                           f"Video rotated successfully: {output_path}")
+
+def fade_out_video(file_path: str, fade_duration: float, output_path: Optional[str] = None) -> OperationResult:
+    """Apply a fade-out effect to a video."""
+    output_path = output_path or os.path.splitext(file_path)[0] + "_fade_out.mp4"
+    with open_video(file_path) as video:
+        faded_video = video.fx(vfx.fadeout, fade_duration)
+        write_video(faded_video, output_path)
+    return OperationResult("fade_out_video", file_path, [output_path], {"fade_duration": fade_duration},
+                           f"Fade-out effect applied successfully: {output_path}")
 
 def video_operations(file_path):
     """Perform basic video operations."""
@@ -17,123 +159,80 @@ def video_operations(file_path):
 
     if choice == "1":
         try:
-            video = VideoFileClip(file_path)
-            print(f"Video duration: {video.duration} seconds")
+            print(get_video_duration(file_path).message)
         except Exception as e:
             print(f"Error getting video duration: {e}")
 
     elif choice == "2":
         try:
-            video = VideoFileClip(file_path)
-            audio_path = os.path.splitext(file_path)[0] + "_audio.mp3"
-            video.audio.write_audiofile(audio_path)
-            print(f"Audio extracted successfully: {audio_path}")
+            print(extract_audio(file_path).message)
         except Exception as e:
             print(f"Error extracting audio: {e}")
 
     elif choice == "3":
         try:
             video_files = input("Enter video files to concatenate (comma-separated): ").split(",")
-            clips = [VideoFileClip(v.strip()) for v in video_files]
-            final_clip = concatenate_videoclips(clips)
-            output_path = "concatenated_video.mp4"
-            final_clip.write_videofile(output_path)
-            print(f"Videos concatenated successfully: {output_path}")
+            print(concatenate_videos(video_files).message)
         except Exception as e:
             print(f"Error concatenating videos: {e}")
 
     elif choice == "4":
         try:
-            video = VideoFileClip(file_path)
             width = int(input("Enter new width: "))
             height = int(input("Enter new height: "))
-            resized_video = video.resize(newsize=(width, height))
-            output_path = os.path.splitext(file_path)[0] + "_resized.mp4"
-            resized_video.write_videofile(output_path)
-            print(f"Video resized successfully: {output_path}")
+            print(resize_video(file_path, width, height).message)
         except Exception as e:
             print(f"Error resizing video: {e}")
 
     elif choice == "5":
         try:
-            video = VideoFileClip(file_path)
             text = input("Enter text to add to video: ")
             fontsize = int(input("Enter font size: "))
             color = input("Enter text color (e.g., 'white', 'red'): ")
-            text_clip = TextClip(text, fontsize=fontsize, color=color)
-            text_clip = text_clip.set_position('center').set_duration(video.duration)
-            final_video = CompositeVideoClip([video, text_clip])
-            output_path = os.path.splitext(file_path)[0] + "_text_added.mp4"
-            final_video.write_videofile(output_path)
-            print(f"Text added successfully: {output_path}")
+            print(add_text_to_video(file_path, text, fontsize, color).message)
         except Exception as e:
             print(f"Error adding text to video: {e}")
 
     elif choice == "6":
         try:
-            video = VideoFileClip(file_path)
             speed_factor = float(input("Enter speed factor (e.g., 2 for double speed, 0.5 for half speed): "))
-            sped_up_video = video.fx(vfx.speedx, speed_factor)
-            output_path = os.path.splitext(file_path)[0] + "_speed_changed.mp4"
-            sped_up_video.write_videofile(output_path)
-            print(f"Video speed changed successfully: {output_path}")
+            print(change_video_speed(file_path, speed_factor).message)
         except Exception as e:
             print(f"Error changing video speed: {e}")
 
     elif choice == "7":
         try:
-            video = VideoFileClip(file_path)
             fade_duration = float(input("Enter fade-in duration in seconds: "))
-            faded_video = video.fx(vfx.fadein, fade_duration)
-            output_path = os.path.splitext(file_path)[0] + "_fade_in.mp4"
-            faded_video.write_videofile(output_path)
-            print(f"Fade-in effect applied successfully: {output_path}")
+            print(fade_in_video(file_path, fade_duration).message)
         except Exception as e:
             print(f"Error applying fade-in effect: {e}")
 
     elif choice == "8":
         try:
-            video = VideoFileClip(file_path)
             music_path = input("Enter the path to the background music file: ")
-            audio = AudioFileClip(music_path)
-            final_video = video.set_audio(audio)
-            output_path = os.path.splitext(file_path)[0] + "_with_music.mp4"
-            final_video.write_videofile(output_path)
-            print(f"Background music added successfully: {output_path}")
+            print(add_background_music(file_path, music_path).message)
         except Exception as e:
             print(f"Error adding background music: {e}")
 
     elif choice == "9":
         try:
-            video = VideoFileClip(file_path)
             start_time = float(input("Enter start time for trimming (in seconds): "))
             end_time = float(input("Enter end time for trimming (in seconds): "))
-            trimmed_video = video.subclip(start_time, end_time)
-            output_path = os.path.splitext(file_path)[0] + "_trimmed.mp4"
-            trimmed_video.write_videofile(output_path)
-            print(f"Video trimmed successfully: {output_path}")
+            print(trim_video(file_path, start_time, end_time).message)
         except Exception as e:
             print(f"Error trimming video: {e}")
 
     elif choice == "10":
         try:
-            video = VideoFileClip(file_path)
             rotation_angle = int(input("Enter rotation angle (90, 180, 270): "))
-            rotated_video = video.rotate(rotation_angle)
-            output_path = os.path.splitext(file_path)[0] + "_rotated.mp4"
-            rotated_video.write_videofile(output_path)
-            print(f"Video rotated successfully: {output_path}")
+            print(rotate_video(file_path, rotation_angle).message)
         except Exception as e:
             print(f"Error rotating video: {e}")
 
     elif choice == "11":
         try:
-            video = VideoFileClip(file_path)
             fade_duration = float(input("Enter fade-out duration in seconds: "))
-            faded_video = video.fx(vfx.fadeout, fade_duration)
-            output_path = os.path.splitext(file_path)[0] + "_fade_out.mp4"
-            faded_video.write_videofile(output_path)
-            print(f"Fade-out effect applied successfully: {output_path}")
+            print(fade_out_video(file_path, fade_duration).message)
         except Exception as e:
             print(f"Error applying fade-out effect: {e}")
 